@@ -1,3 +1,4 @@
+import asyncio
 from typing import Any
 
 from strawberry.permission import BasePermission
@@ -6,12 +7,34 @@ from strawberry.types import Info
 from api.views import Context
 
 
-class IsAuthenticated(BasePermission):
-    message = "User is not authenticated"
+class RequestPermission(BasePermission):
+    """A permission that only depends on the request, and not on the object
+    or the arguments of the field.
+
+    It is checked once per request, so list fields don't check it again for
+    every item.
+    """
+
+    async def has_request_permission(self, info: Info[Context, None]) -> bool:
+        raise NotImplementedError
 
     async def has_permission(
         self, source: Any, info: Info[Context, None], **kwargs
     ) -> bool:
+        permissions = info.context["permissions"]
+
+        if type(self) not in permissions:
+            permissions[type(self)] = asyncio.ensure_future(
+                self.has_request_permission(info)
+            )
+
+        return await permissions[type(self)]
+
+
+class IsAuthenticated(RequestPermission):
+    message = "User is not authenticated"
+
+    async def has_request_permission(self, info: Info[Context, None]) -> bool:
         user = await info.context["request"].get_user()
 
         return user.is_authenticated
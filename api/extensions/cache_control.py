@@ -0,0 +1,216 @@
+from dataclasses import dataclass
+from enum import Enum
+from typing import Any, Dict, Iterator, Mapping, Optional
+
+from graphql import (
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLNamedType,
+    GraphQLSchema,
+    InlineFragmentNode,
+    OperationType,
+    SelectionSetNode,
+    get_named_type,
+)
+
+import strawberry
+from strawberry.extensions import SchemaExtension
+from strawberry.extensions.utils import is_introspection_key
+from strawberry.field import StrawberryField
+from strawberry.schema.schema_converter import GraphQLCoreConverter
+from strawberry.schema_directive import Location
+
+from .utils import get_operation, should_include
+
+
+@strawberry.enum
+class CacheScope(Enum):
+    PUBLIC = "public"
+    # only cached by the client, not by shared caches like CDNs
+    PRIVATE = "private"
+
+
+@strawberry.schema_directive(locations=[Location.FIELD_DEFINITION, Location.OBJECT])
+class CacheControl:
+    """How long the value of a field (or of all the fields returning a type)
+    can be cached, in seconds."""
+
+    max_age: int
+    scope: CacheScope = CacheScope.PUBLIC
+
+
+@dataclass
+class CachePolicy:
+    # None until a field sets it
+    max_age: Optional[int] = None
+    scope: CacheScope = CacheScope.PUBLIC
+
+    def restrict(
+        self, max_age: Optional[int] = None, scope: Optional[CacheScope] = None
+    ) -> None:
+        if max_age is not None:
+            self.max_age = (
+                max_age if self.max_age is None else min(self.max_age, max_age)
+            )
+
+        if scope is CacheScope.PRIVATE:
+            self.scope = CacheScope.PRIVATE
+
+    @property
+    def header(self) -> str:
+        if not self.max_age:
+            return "no-store"
+
+        return f"{self.scope.value}, max-age={self.max_age}"
+
+
+def _get_hint(definition: Any) -> Optional[CacheControl]:
+    directives = getattr(definition, "directives", None) or ()
+
+    return next(
+        (directive for directive in directives if isinstance(directive, CacheControl)),
+        None,
+    )
+
+
+class CachePolicyCalculator:
+    """Finds the cache policy of an operation from the `CacheControl` hints
+    of the fields it selects, the one of a field taking precedence over the
+    one of its type.
+
+    The operation can be cached for as long as the field with the lowest
+    `max_age`, and it's private if any field is private or has permission
+    classes. Root fields without a hint can't be cached, other fields
+    without a hint don't change the policy.
+    """
+
+    def __init__(
+        self,
+        schema: GraphQLSchema,
+        fragments: Mapping[str, FragmentDefinitionNode],
+        variables: Dict[str, Any],
+    ):
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables
+
+    def get_policy(
+        self, selection_set: SelectionSetNode, root_type: GraphQLNamedType
+    ) -> CachePolicy:
+        policy = CachePolicy()
+
+        self._visit(selection_set, root_type, policy, is_root=True)
+
+        return policy
+
+    def _visit(
+        self,
+        selection_set: SelectionSetNode,
+        parent_type: GraphQLNamedType,
+        policy: CachePolicy,
+        is_root: bool,
+    ) -> None:
+        for selection in selection_set.selections:
+            if not should_include(selection, self.variables):
+                continue
+
+            if isinstance(selection, FieldNode):
+                self._visit_field(selection, parent_type, policy, is_root)
+            elif isinstance(selection, InlineFragmentNode):
+                type_ = parent_type
+
+                # validation rejects fragments on unknown types
+                if selection.type_condition is not None:
+                    type_ = (
+                        self.schema.get_type(selection.type_condition.name.value)
+                        or parent_type
+                    )
+
+                self._visit(selection.selection_set, type_, policy, is_root)
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = self.fragments[selection.name.value]
+                type_ = (
+                    self.schema.get_type(fragment.type_condition.name.value)
+                    or parent_type
+                )
+
+                self._visit(fragment.selection_set, type_, policy, is_root)
+
+    def _visit_field(
+        self,
+        node: FieldNode,
+        parent_type: GraphQLNamedType,
+        policy: CachePolicy,
+        is_root: bool,
+    ) -> None:
+        name = node.name.value
+        field = getattr(parent_type, "fields", {}).get(name)
+
+        if is_introspection_key(name) or field is None:
+            return
+
+        type_ = get_named_type(field.type)
+        definition: Optional[StrawberryField] = field.extensions.get(
+            GraphQLCoreConverter.DEFINITION_BACKREF
+        )
+        hint = _get_hint(definition) or _get_hint(
+            type_.extensions.get(GraphQLCoreConverter.DEFINITION_BACKREF)
+        )
+
+        if hint is not None:
+            policy.restrict(hint.max_age, hint.scope)
+        elif is_root:
+            policy.restrict(max_age=0)
+
+        if definition is not None and definition.permission_classes:
+            policy.restrict(scope=CacheScope.PRIVATE)
+
+        if node.selection_set is not None:
+            self._visit(node.selection_set, type_, policy, is_root=False)
+
+
+class ResponseCacheControl(SchemaExtension):
+    """Sets the `Cache-Control` header of the response from the cache hints
+    of the fields in the operation.
+
+    Mutations and responses with errors are never cached, and responses
+    that depend on the session (for example on the current user) are
+    private.
+    """
+
+    def on_operation(self) -> Iterator[None]:
+        yield
+
+        context = self.execution_context.context
+
+        if isinstance(context, dict) and "response" in context:
+            context["response"]["Cache-Control"] = self.get_policy().header
+
+    def get_policy(self) -> CachePolicy:
+        execution_context = self.execution_context
+
+        if execution_context.errors:
+            return CachePolicy(max_age=0)
+
+        operation = get_operation(execution_context)
+
+        if operation is None or operation.node.operation != OperationType.QUERY:
+            return CachePolicy(max_age=0)
+
+        calculator = CachePolicyCalculator(
+            execution_context.schema._schema,
+            fragments=operation.fragments,
+            variables=operation.variables,
+        )
+        policy = calculator.get_policy(
+            operation.node.selection_set, operation.root_type
+        )
+
+        # the session is only loaded when a resolver needs it
+        session = getattr(execution_context.context["request"], "session", None)
+
+        if session is not None and session.accessed:
+            policy.restrict(scope=CacheScope.PRIVATE)
+
+        return policy
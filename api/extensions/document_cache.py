@@ -0,0 +1,69 @@
+from dataclasses import dataclass
+from typing import Iterator, List, Optional, Tuple, Type
+
+from graphql import DocumentNode, GraphQLError
+from graphql.validation import ASTValidationRule
+
+from django.conf import settings
+
+from strawberry.extensions import SchemaExtension
+
+from db.cache import LRUCache
+
+
+@dataclass
+class CachedDocument:
+    document: DocumentNode
+    # the rules the document was validated with, and their errors
+    validation_rules: Optional[Tuple[Type[ASTValidationRule], ...]] = None
+    errors: Optional[List[GraphQLError]] = None
+
+
+document_cache: LRUCache[str, CachedDocument] = LRUCache(
+    settings.GRAPHQL_DOCUMENT_CACHE_SIZE
+)
+
+
+class DocumentCache(SchemaExtension):
+    """Caches the parsed documents and their validation errors by query, so
+    repeated queries skip both parsing and validation."""
+
+    cached_document: Optional[CachedDocument] = None
+
+    def on_parse(self) -> Iterator[None]:
+        query = self.execution_context.query
+
+        if query is not None:
+            self.cached_document = document_cache.get(query)
+
+        if self.cached_document is not None:
+            # strawberry doesn't parse queries that already have a document
+            self.execution_context.graphql_document = self.cached_document.document
+
+        yield
+
+        document = self.execution_context.graphql_document
+
+        if self.cached_document is None and query is not None and document:
+            self.cached_document = CachedDocument(document=document)
+            document_cache.set(query, self.cached_document)
+
+    def on_validate(self) -> Iterator[None]:
+        cached_document = self.cached_document
+        validation_rules = tuple(self.execution_context.validation_rules)
+
+        if (
+            cached_document is not None
+            and cached_document.validation_rules == validation_rules
+        ):
+            # and it doesn't validate them when there are errors already
+            self.execution_context.errors = cached_document.errors
+
+        yield
+
+        if (
+            cached_document is not None
+            and cached_document.validation_rules != validation_rules
+        ):
+            cached_document.validation_rules = validation_rules
+            cached_document.errors = self.execution_context.errors or []
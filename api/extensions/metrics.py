@@ -0,0 +1,21 @@
+from typing import Iterator
+
+from strawberry.extensions import SchemaExtension
+
+from api.metrics import current_request_metrics, get_operation_label
+
+
+class OperationMetrics(SchemaExtension):
+    """Tells `api.metrics.MetricsMiddleware` the name of the operation and
+    the number of errors, so it can record the metrics of the request."""
+
+    def on_operation(self) -> Iterator[None]:
+        yield
+
+        metrics = current_request_metrics.get()
+
+        if metrics is None:
+            return
+
+        metrics.operation = get_operation_label(self.execution_context.operation_name)
+        metrics.errors += len(self.execution_context.errors or [])
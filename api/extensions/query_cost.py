@@ -0,0 +1,192 @@
+from typing import Any, Dict, Iterator, Mapping, Optional, Type
+
+from graphql import (
+    ExecutionResult as GraphQLExecutionResult,
+    FieldNode,
+    FragmentDefinitionNode,
+    FragmentSpreadNode,
+    GraphQLError,
+    GraphQLField,
+    GraphQLNamedType,
+    GraphQLObjectType,
+    GraphQLSchema,
+    InlineFragmentNode,
+    SelectionSetNode,
+    get_named_type,
+    is_composite_type,
+    is_leaf_type,
+)
+from graphql.execution.values import get_argument_values
+
+from strawberry.extensions import SchemaExtension
+from strawberry.extensions.utils import is_introspection_key
+
+from .utils import get_operation, should_include
+
+
+# arguments that limit how many items a field returns
+MULTIPLIER_ARGUMENTS = ("first", "last")
+
+
+class QueryCostCalculator:
+    """Estimates the cost of an operation before running it.
+
+    Every field returning an object costs 1 (scalars are free), unless it's
+    in `field_costs` (as "Type.field"), and fields with a `first` or `last`
+    argument multiply the cost of their selections by it. For example:
+
+        podcasts(first: 10) {     # 1 + 10 * 3
+            title                 # 0
+            episodes(first: 2) {  # 1 + 2 * 1
+                podcast {         # 1
+                    title         # 0
+                }
+            }
+        }
+    """
+
+    def __init__(
+        self,
+        schema: GraphQLSchema,
+        fragments: Mapping[str, FragmentDefinitionNode],
+        variables: Dict[str, Any],
+        field_costs: Mapping[str, int],
+    ):
+        self.schema = schema
+        self.fragments = fragments
+        self.variables = variables
+        self.field_costs = field_costs
+
+    def selection_set_cost(
+        self, selection_set: SelectionSetNode, parent_type: GraphQLNamedType
+    ) -> int:
+        cost = 0
+
+        # fragments on different types of a union are added up, even if only
+        # one of them can match, so this is an upper bound
+        for selection in selection_set.selections:
+            if not should_include(selection, self.variables):
+                continue
+
+            if isinstance(selection, FieldNode):
+                cost += self.field_cost(selection, parent_type)
+            elif isinstance(selection, InlineFragmentNode):
+                type_ = parent_type
+
+                # validation rejects fragments on unknown types
+                if selection.type_condition is not None:
+                    type_ = (
+                        self.schema.get_type(selection.type_condition.name.value)
+                        or parent_type
+                    )
+
+                cost += self.selection_set_cost(selection.selection_set, type_)
+            elif isinstance(selection, FragmentSpreadNode):
+                fragment = self.fragments[selection.name.value]
+                type_ = (
+                    self.schema.get_type(fragment.type_condition.name.value)
+                    or parent_type
+                )
+
+                cost += self.selection_set_cost(fragment.selection_set, type_)
+
+        return cost
+
+    def field_cost(self, node: FieldNode, parent_type: GraphQLNamedType) -> int:
+        name = node.name.value
+
+        if is_introspection_key(name) or not isinstance(parent_type, GraphQLObjectType):
+            return 0
+
+        field: Optional[GraphQLField] = parent_type.fields.get(name)
+
+        if field is None:
+            return 0
+
+        type_ = get_named_type(field.type)
+        cost = self.field_costs.get(
+            f"{parent_type.name}.{name}", 0 if is_leaf_type(type_) else 1
+        )
+
+        if node.selection_set is None or not is_composite_type(type_):
+            return cost
+
+        arguments = get_argument_values(field, node, self.variables)
+        multiplier = next(
+            (
+                arguments[argument]
+                for argument in MULTIPLIER_ARGUMENTS
+                if arguments.get(argument) is not None
+            ),
+            1,
+        )
+
+        # negative limits are rejected by the resolvers, but they would make
+        # the cost negative and hide the cost of the other fields
+        return cost + max(multiplier, 0) * self.selection_set_cost(
+            node.selection_set, type_
+        )
+
+
+class QueryCostLimiter(SchemaExtension):
+    """Rejects operations that cost more than `max_cost`, before running any
+    resolver, and reports the cost in the response extensions.
+
+    Use `create_query_cost_limiter` to configure it.
+    """
+
+    max_cost: int
+    field_costs: Mapping[str, int] = {}
+
+    cost: Optional[int] = None
+
+    def on_execute(self) -> Iterator[None]:
+        execution_context = self.execution_context
+        self.cost = self.get_cost()
+
+        if self.cost is not None and self.cost > self.max_cost:
+            error = GraphQLError(
+                f"Query cost {self.cost} exceeds the maximum cost of {self.max_cost}",
+                extensions={"code": "QUERY_TOO_EXPENSIVE"},
+            )
+
+            # strawberry doesn't execute operations that already have a result
+            execution_context.result = GraphQLExecutionResult(data=None, errors=[error])
+            execution_context.errors = [error]
+
+        yield
+
+    def get_cost(self) -> Optional[int]:
+        operation = get_operation(self.execution_context)
+
+        if operation is None:
+            return None
+
+        calculator = QueryCostCalculator(
+            self.execution_context.schema._schema,
+            fragments=operation.fragments,
+            variables=operation.variables,
+            field_costs=self.field_costs,
+        )
+
+        return calculator.selection_set_cost(
+            operation.node.selection_set, operation.root_type
+        )
+
+    def get_results(self) -> Dict[str, Any]:
+        if self.cost is None:
+            return {}
+
+        return {"cost": {"requested": self.cost, "maximum": self.max_cost}}
+
+
+def create_query_cost_limiter(
+    max_cost: int, field_costs: Optional[Mapping[str, int]] = None
+) -> Type[QueryCostLimiter]:
+    # extensions are created for each request, so the options are stored
+    # on a subclass rather than on an instance
+    return type(
+        "QueryCostLimiter",
+        (QueryCostLimiter,),
+        {"max_cost": max_cost, "field_costs": field_costs or {}},
+    )
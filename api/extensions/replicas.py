@@ -0,0 +1,17 @@
+from typing import Iterator
+
+from strawberry.extensions import SchemaExtension
+from strawberry.types.graphql import OperationType
+
+from db.replicas import use_primary
+
+
+class PrimaryForMutations(SchemaExtension):
+    """Sends the reads of mutations to the default database, so they see the
+    data they are about to change, see `db.replicas.ReplicaRouter`."""
+
+    def on_execute(self) -> Iterator[None]:
+        if self.execution_context.operation_type == OperationType.MUTATION:
+            use_primary()
+
+        yield
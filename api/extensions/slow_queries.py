@@ -0,0 +1,47 @@
+from inspect import isawaitable
+from typing import Any, Awaitable, Iterator
+
+from graphql import GraphQLResolveInfo
+from graphql.pyutils import Path
+
+from strawberry.extensions import SchemaExtension
+from strawberry.utils.await_maybe import AwaitableOrValue
+
+from db.slow_queries import current_operation, current_path
+
+
+async def _resolve_with_path(result: Awaitable[Any], path: Path) -> Any:
+    # async resolvers run when they're awaited, not when they're called
+    token = current_path.set(path)
+
+    try:
+        return await result
+    finally:
+        current_path.reset(token)
+
+
+class SlowQueryContext(SchemaExtension):
+    """Tells `db.slow_queries` which operation and field are running, so
+    they're logged with the SQL queries they run."""
+
+    def on_execute(self) -> Iterator[None]:
+        token = current_operation.set(self.execution_context.operation_name)
+
+        yield
+
+        current_operation.reset(token)
+
+    def resolve(
+        self, _next, root, info: GraphQLResolveInfo, *args, **kwargs
+    ) -> AwaitableOrValue[object]:
+        token = current_path.set(info.path)
+
+        try:
+            result = _next(root, info, *args, **kwargs)
+        finally:
+            current_path.reset(token)
+
+        if isawaitable(result):
+            return _resolve_with_path(result, info.path)
+
+        return result
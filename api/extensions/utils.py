@@ -0,0 +1,78 @@
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from graphql import (
+    FragmentDefinitionNode,
+    GraphQLIncludeDirective,
+    GraphQLObjectType,
+    GraphQLSkipDirective,
+    OperationDefinitionNode,
+    get_operation_ast,
+)
+from graphql.execution.values import get_directive_values, get_variable_values
+
+from strawberry.types import ExecutionContext
+
+
+@dataclass
+class Operation:
+    node: OperationDefinitionNode
+    root_type: GraphQLObjectType
+    fragments: Dict[str, FragmentDefinitionNode]
+    variables: Dict[str, Any]
+
+
+def get_operation(execution_context: ExecutionContext) -> Optional[Operation]:
+    """The operation that is going to be executed, with its variables, or
+    None if it can't be executed."""
+
+    document = execution_context.graphql_document
+    schema = execution_context.schema._schema
+
+    if document is None:
+        return None
+
+    operation = get_operation_ast(document, execution_context.operation_name)
+
+    if operation is None:
+        return None
+
+    variables = get_variable_values(
+        schema,
+        operation.variable_definitions or [],
+        execution_context.variables or {},
+    )
+
+    # invalid variables are reported when executing the operation
+    if isinstance(variables, list):
+        return None
+
+    root_type = schema.get_root_type(operation.operation)
+
+    if root_type is None:
+        return None
+
+    return Operation(
+        node=operation,
+        root_type=root_type,
+        fragments={
+            definition.name.value: definition
+            for definition in document.definitions
+            if isinstance(definition, FragmentDefinitionNode)
+        },
+        variables=variables,
+    )
+
+
+def should_include(node: Any, variables: Dict[str, Any]) -> bool:
+    """Whether a selection is included by its @skip and @include
+    directives."""
+
+    skip = get_directive_values(GraphQLSkipDirective, node, variables)
+
+    if skip is not None and skip["if"]:
+        return False
+
+    include = get_directive_values(GraphQLIncludeDirective, node, variables)
+
+    return include is None or include["if"]
@@ -0,0 +1,247 @@
+import secrets
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterator, Optional, Set
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+from prometheus_client.registry import Collector
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpRequest, HttpResponse, HttpResponseForbidden
+
+from api.extensions.document_cache import document_cache
+from db.data import result_cache
+from db.thread_hops import ThreadHops, current_thread_hops
+
+
+# operation names come from the clients, to keep the number of time series
+# bounded only the first `GRAPHQL_METRICS_MAX_OPERATIONS` names are used
+ANONYMOUS_OPERATION = "anonymous"
+OTHER_OPERATION = "other"
+
+OPERATION_DURATION = Histogram(
+    "graphql_operation_duration_seconds",
+    "Time spent handling GraphQL requests, by operation",
+    ["operation"],
+)
+OPERATION_SQL_QUERIES = Histogram(
+    "graphql_operation_sql_queries",
+    "SQL queries run by GraphQL requests, by operation",
+    ["operation"],
+    buckets=(0, 1, 2, 5, 10, 20, 50, 100, 200, float("inf")),
+)
+OPERATION_SQL_DURATION = Histogram(
+    "graphql_operation_sql_duration_seconds",
+    "Time spent running SQL queries in GraphQL requests, by operation",
+    ["operation"],
+)
+OPERATION_SYNC_TO_ASYNC_DURATION = Histogram(
+    "graphql_operation_sync_to_async_duration_seconds",
+    "Time spent waiting for sync_to_async calls in GraphQL requests, by operation",
+    ["operation"],
+)
+OPERATION_RESPONSE_SIZE = Histogram(
+    "graphql_operation_response_size_bytes",
+    "Size of the responses to GraphQL requests, by operation",
+    ["operation"],
+    buckets=(100, 1_000, 10_000, 100_000, 1_000_000, float("inf")),
+)
+OPERATION_ERRORS = Counter(
+    "graphql_operation_errors",
+    "Errors returned by GraphQL requests, by operation",
+    ["operation"],
+)
+
+
+@dataclass
+class RequestMetrics:
+    # the label of the operation, see `get_operation_label`
+    operation: Optional[str] = None
+    errors: int = 0
+    sql_queries: int = 0
+    sql_duration: float = 0.0
+    # recorded by the functions of `db.data` and `api.views.get_user`, see
+    # `db.thread_hops`
+    thread_hops: ThreadHops = field(default_factory=ThreadHops)
+
+
+current_request_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar(
+    "current_request_metrics", default=None
+)
+
+_operation_names: Set[str] = set()
+
+
+def get_operation_label(operation_name: Optional[str]) -> str:
+    if not operation_name:
+        return ANONYMOUS_OPERATION
+
+    if operation_name not in _operation_names:
+        if len(_operation_names) >= settings.GRAPHQL_METRICS_MAX_OPERATIONS:
+            return OTHER_OPERATION
+
+        _operation_names.add(operation_name)
+
+    return operation_name
+
+
+def _record_query(execute: Callable, sql: str, params: Any, many: bool, context):
+    metrics = current_request_metrics.get()
+
+    if metrics is None:
+        return execute(sql, params, many, context)
+
+    start = time.perf_counter()
+
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.sql_queries += 1
+        metrics.sql_duration += time.perf_counter() - start
+
+
+def _add_query_recorder(connection, **kwargs) -> None:
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def install_instrumentation() -> None:
+    # database connections are created per thread, so the recorder is added
+    # to each new connection (and to the ones of this thread)
+    connection_created.connect(_add_query_recorder, dispatch_uid="api.metrics")
+
+    for connection in connections.all(initialized_only=True):
+        _add_query_recorder(connection)
+
+
+def observe(metrics: RequestMetrics, duration: float, response: HttpResponse) -> None:
+    operation = metrics.operation
+
+    # not a GraphQL request
+    if operation is None:
+        return
+
+    OPERATION_DURATION.labels(operation).observe(duration)
+    OPERATION_SQL_QUERIES.labels(operation).observe(metrics.sql_queries)
+    OPERATION_SQL_DURATION.labels(operation).observe(metrics.sql_duration)
+    OPERATION_SYNC_TO_ASYNC_DURATION.labels(operation).observe(
+        metrics.thread_hops.duration
+    )
+    OPERATION_RESPONSE_SIZE.labels(operation).observe(
+        0 if response.streaming else len(response.content)
+    )
+
+    if metrics.errors:
+        OPERATION_ERRORS.labels(operation).inc(metrics.errors)
+
+
+class MetricsMiddleware:
+    """Records the metrics of GraphQL requests, the operation is set by
+    `api.extensions.metrics.OperationMetrics`."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+        install_instrumentation()
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        metrics = RequestMetrics()
+        token = current_request_metrics.set(metrics)
+        thread_hops_token = current_thread_hops.set(metrics.thread_hops)
+        start = time.perf_counter()
+
+        try:
+            response = self.get_response(request)
+        finally:
+            current_thread_hops.reset(thread_hops_token)
+            current_request_metrics.reset(token)
+
+        observe(metrics, time.perf_counter() - start, response)
+
+        return response
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        metrics = RequestMetrics()
+        token = current_request_metrics.set(metrics)
+        thread_hops_token = current_thread_hops.set(metrics.thread_hops)
+        start = time.perf_counter()
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_thread_hops.reset(thread_hops_token)
+            current_request_metrics.reset(token)
+
+        observe(metrics, time.perf_counter() - start, response)
+
+        return response
+
+
+class CacheCollector(Collector):
+    """Exports the hits and misses of the result and document caches."""
+
+    def collect(self) -> Iterator[Any]:
+        stats = result_cache.stats()
+
+        hits = CounterMetricFamily(
+            "graphql_cache_hits", "Cache hits, by cache", labels=["cache"]
+        )
+        misses = CounterMetricFamily(
+            "graphql_cache_misses", "Cache misses, by cache", labels=["cache"]
+        )
+        entries = GaugeMetricFamily(
+            "graphql_cache_entries", "Entries in the cache, by cache", labels=["cache"]
+        )
+
+        hits.add_metric(["result"], stats["hits"])
+        misses.add_metric(["result"], stats["misses"])
+        entries.add_metric(["result"], stats["entries"])
+
+        hits.add_metric(["document"], document_cache.hits)
+        misses.add_metric(["document"], document_cache.misses)
+        entries.add_metric(["document"], len(document_cache))
+
+        yield hits
+        yield misses
+        yield entries
+
+
+REGISTRY.register(CacheCollector())
+
+
+def _can_read_metrics(request: HttpRequest) -> bool:
+    if getattr(request.user, "is_superuser", False):
+        return True
+
+    token = settings.METRICS_TOKEN
+    authorization = request.headers.get("Authorization", "")
+
+    return bool(token) and secrets.compare_digest(authorization, f"Bearer {token}")
+
+
+def metrics_view(request: HttpRequest) -> HttpResponse:
+    # operation names and timings are only for us
+    if not _can_read_metrics(request):
+        return HttpResponseForbidden()
+
+    return HttpResponse(generate_latest(REGISTRY), content_type=CONTENT_TYPE_LATEST)
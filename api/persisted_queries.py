@@ -0,0 +1,140 @@
+import hashlib
+from typing import Any, Dict, Optional
+
+from graphql import GraphQLError, parse, validate
+
+from django.conf import settings
+
+from db import data
+from db.cache import LRUCache
+
+
+class PersistedQueryError(Exception):
+    message: str
+    code: str
+
+    def as_graphql_error(self) -> GraphQLError:
+        return GraphQLError(self.message, extensions={"code": self.code})
+
+
+class PersistedQueryNotFound(PersistedQueryError):
+    # clients handle this error by sending the hash again, with the query
+    message = "PersistedQueryNotFound"
+    code = "PERSISTED_QUERY_NOT_FOUND"
+
+
+class PersistedQueryNotAllowed(PersistedQueryError):
+    message = "PersistedQueryNotAllowed"
+    code = "PERSISTED_QUERY_NOT_ALLOWED"
+
+
+class InvalidPersistedQuery(PersistedQueryError):
+    code = "BAD_REQUEST"
+
+    def __init__(self, message: str):
+        super().__init__(message)
+
+        self.message = message
+
+
+def _is_valid(query: str) -> bool:
+    # the schema imports the views, which import this module
+    from api.schema import schema
+
+    try:
+        document = parse(query)
+    except GraphQLError:
+        return False
+
+    return not validate(schema._schema, document)
+
+
+class PersistedQueryStore:
+    """Implements automatic persisted queries[1], clients can send the sha256
+    hash of a query instead of the whole document, once the query has been
+    sent together with its hash.
+
+    Queries are kept in a LRU cache, and optionally in the database so they
+    are shared across processes. Only valid queries are stored in the
+    database, up to `PERSISTED_QUERIES_DATABASE_MAX_SIZE` of them, after that
+    new queries are only kept in the LRU cache. When
+    `PERSISTED_QUERIES_ALLOWLIST_ONLY` is set only queries that are already
+    in the database can run, they can be added with
+    `python cli.py persist-queries` (which isn't limited).
+
+    [1] https://www.apollographql.com/docs/apollo-server/performance/apq/
+    """
+
+    def __init__(self, max_size: int):
+        self.cache: LRUCache[str, str] = LRUCache(max_size)
+
+    @property
+    def allowlist_only(self) -> bool:
+        return settings.PERSISTED_QUERIES_ALLOWLIST_ONLY
+
+    @property
+    def use_database(self) -> bool:
+        return settings.PERSISTED_QUERIES_DATABASE or self.allowlist_only
+
+    async def get(self, hash: str) -> Optional[str]:
+        query = self.cache.get(hash)
+
+        if query is None and self.use_database:
+            query = await data.find_persisted_query(hash)
+
+            if query is not None:
+                self.cache.set(hash, query)
+
+        return query
+
+    async def save(self, hash: str, query: str) -> None:
+        self.cache.set(hash, query)
+
+        # any client can send queries, only the ones that can run are shared
+        if self.use_database and _is_valid(query):
+            await data.save_persisted_query(
+                hash, query, max_size=settings.PERSISTED_QUERIES_DATABASE_MAX_SIZE
+            )
+
+    async def resolve(
+        self, query: Optional[str], extensions: Optional[Dict[str, Any]]
+    ) -> Optional[str]:
+        """Returns the query to run for a request with `query` and
+        `extensions`, persisting it when needed."""
+
+        persisted_query = (extensions or {}).get("persistedQuery")
+
+        if persisted_query is None:
+            if self.allowlist_only and query is not None:
+                raise PersistedQueryNotAllowed()
+
+            return query
+
+        if not isinstance(persisted_query, dict) or persisted_query.get("version") != 1:
+            raise InvalidPersistedQuery("Unsupported persisted query")
+
+        if not isinstance(hash := persisted_query.get("sha256Hash"), str):
+            raise InvalidPersistedQuery("Missing sha256Hash")
+
+        if query is None:
+            if (query := await self.get(hash)) is None:
+                raise PersistedQueryNotFound()
+
+            return query
+
+        if hashlib.sha256(query.encode()).hexdigest() != hash:
+            raise InvalidPersistedQuery("provided sha does not match query")
+
+        if hash in self.cache:
+            return query
+
+        if self.allowlist_only:
+            if await self.get(hash) is None:
+                raise PersistedQueryNotAllowed()
+        else:
+            await self.save(hash, query)
+
+        return query
+
+
+persisted_queries = PersistedQueryStore(settings.PERSISTED_QUERIES_CACHE_SIZE)
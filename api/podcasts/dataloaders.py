@@ -0,0 +1,79 @@
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from strawberry.dataloader import DataLoader
+
+from db import data, models
+from db.pagination import PaginatedData
+from users.models import User
+
+
+PodcastLoader = DataLoader[str, Optional[models.Podcast]]
+
+# keys are (podcast id, number of episodes, episode fields to load)
+FirstEpisodesKey = Tuple[str, int, Tuple[str, ...]]
+FirstEpisodesLoader = DataLoader[FirstEpisodesKey, PaginatedData[models.Episode]]
+
+# keys are podcast ids, values tell if the current user is subscribed to them
+IsSubscribedLoader = DataLoader[str, bool]
+
+
+async def load_podcasts(ids: List[str]) -> List[Optional[models.Podcast]]:
+    # the same id can be requested more than once when the loader is used
+    # without its cache, we only need to fetch it once
+    unique_ids = list(dict.fromkeys(ids))
+
+    db_podcasts = await data.find_podcasts_by_ids(unique_ids)
+    podcasts_by_id = {str(podcast.id): podcast for podcast in db_podcasts}
+
+    # the database doesn't guarantee any ordering and skips missing ids,
+    # but dataloaders need one result per key, in the same order as the keys
+    return [podcasts_by_id.get(id) for id in ids]
+
+
+async def load_first_episodes(
+    keys: List[FirstEpisodesKey],
+) -> List[PaginatedData[models.Episode]]:
+    podcast_ids_by_page: Dict[Tuple[int, Tuple[str, ...]], List[str]] = defaultdict(
+        list
+    )
+
+    for podcast_id, first, fields in dict.fromkeys(keys):
+        podcast_ids_by_page[first, fields].append(podcast_id)
+
+    # usually all the podcasts in a page ask for the same number of
+    # episodes (and the same fields), so this ends up being a single query
+    pages: Dict[FirstEpisodesKey, PaginatedData[models.Episode]] = {}
+
+    for (first, fields), podcast_ids in podcast_ids_by_page.items():
+        episodes = await data.find_first_episodes_for_podcasts(
+            podcast_ids, first, fields
+        )
+
+        pages.update(
+            ((podcast_id, first, fields), page) for podcast_id, page in episodes.items()
+        )
+
+    return [pages[key] for key in keys]
+
+
+def create_podcast_loader() -> PodcastLoader:
+    return DataLoader(load_fn=load_podcasts)
+
+
+def create_first_episodes_loader() -> FirstEpisodesLoader:
+    return DataLoader(load_fn=load_first_episodes)
+
+
+def create_is_subscribed_loader(
+    get_user: Callable[[], Awaitable[User]]
+) -> IsSubscribedLoader:
+    async def load_is_subscribed(podcast_ids: List[str]) -> List[bool]:
+        user = await get_user()
+        subscribed = await data.find_subscribed_podcast_ids(
+            user, list(dict.fromkeys(podcast_ids))
+        )
+
+        return [podcast_id in subscribed for podcast_id in podcast_ids]
+
+    return DataLoader(load_fn=load_is_subscribed)
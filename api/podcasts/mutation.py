@@ -1,6 +1,116 @@
+import uuid
+from typing import List, Optional
+
 import strawberry
+from strawberry.types import Info
+
+from api.authentication.permissions import IsAuthenticated
+from api.views import Context
+from db import data
+
+from .types import Podcast
+
+
+# podcasts a user can subscribe to with one `subscribeToPodcasts`
+MAX_SUBSCRIPTIONS_PER_REQUEST = 100
+
+
+@strawberry.interface
+class Error:
+    message: str
+
+
+@strawberry.type
+class PodcastDoesNotExistError(Error):
+    message: str = "Podcast does not exist"
+
+
+@strawberry.type
+class AlreadySubscribedToPodcastError(Error):
+    message: str = "You are already subscribed to this podcast"
+
+
+@strawberry.type
+class SubscribeToPodcastSuccess:
+    podcast: Podcast
+
+
+SubscribeToPodcastResponse = strawberry.union(
+    "SubscribeToPodcastResponse",
+    (
+        SubscribeToPodcastSuccess,
+        PodcastDoesNotExistError,
+        AlreadySubscribedToPodcastError,
+    ),
+)
+
+
+def _parse_id(id: strawberry.ID) -> Optional[str]:
+    try:
+        return str(uuid.UUID(id))
+    except ValueError:
+        return None
+
+
+async def _subscribe(
+    info: Info[Context, None], ids: List[strawberry.ID]
+) -> List[SubscribeToPodcastResponse]:
+    user = await info.context["request"].get_user()
+    podcast_ids = [_parse_id(id) for id in ids]
+
+    db_podcasts = {
+        str(db_podcast.id): db_podcast
+        for db_podcast in await data.find_podcasts_by_ids(
+            [id for id in podcast_ids if id is not None]
+        )
+    }
+    subscribed = await data.subscribe_to_podcasts(user, list(db_podcasts))
+
+    responses: List[SubscribeToPodcastResponse] = []
+
+    for podcast_id in podcast_ids:
+        if podcast_id not in db_podcasts:
+            responses.append(PodcastDoesNotExistError())
+        elif podcast_id not in subscribed:
+            responses.append(AlreadySubscribedToPodcastError())
+        else:
+            # repeated ids were only subscribed to once, by the first of them
+            subscribed.remove(podcast_id)
+
+            # the podcast was fetched before subscribing
+            db_podcasts[podcast_id].subscriber_count += 1
+
+            responses.append(
+                SubscribeToPodcastSuccess(
+                    podcast=Podcast.from_db(db_podcasts[podcast_id])
+                )
+            )
+
+    return responses
 
 
 @strawberry.type
 class PodcastsMutation:
-    ...
+    @strawberry.mutation(permission_classes=[IsAuthenticated])
+    async def subscribe_to_podcast(
+        self, info: Info[Context, None], id: strawberry.ID
+    ) -> SubscribeToPodcastResponse:
+        (response,) = await _subscribe(info, [id])
+
+        return response
+
+    @strawberry.mutation(
+        permission_classes=[IsAuthenticated],
+        description="Subscribes to many podcasts at once, the responses are in "
+        "the same order as the ids",
+    )
+    async def subscribe_to_podcasts(
+        self, info: Info[Context, None], ids: List[strawberry.ID]
+    ) -> List[SubscribeToPodcastResponse]:
+        if len(ids) > MAX_SUBSCRIPTIONS_PER_REQUEST:
+            raise ValueError(
+                f"Can't subscribe to more than {MAX_SUBSCRIPTIONS_PER_REQUEST} "
+                "podcasts at once"
+            )
+
+        return await _subscribe(info, ids)
@@ -1,6 +1,63 @@
+from typing import List, Optional
+
 import strawberry
+from strawberry.types import Info
+
+from api.extensions.cache_control import CacheControl
+from api.pagination.types import Connection, Edge, PageInfo
+from api.projection import get_model_fields
+from db import data, models
+
+from .types import Episode, Podcast, PodcastOrder
 
 
 @strawberry.type
 class PodcastsQuery:
-    ...
+    @strawberry.field
+    async def podcast(self, id: strawberry.ID) -> Optional[Podcast]:
+        db_podcast = await data.find_podcast_by_id(id)
+
+        if db_podcast:
+            return Podcast.from_db(db_podcast)
+
+        return None
+
+    @strawberry.field(directives=[CacheControl(max_age=300)])
+    async def find_podcasts(
+        self,
+        info: Info,
+        query: str,
+        first: int = 10,
+        after: Optional[strawberry.ID] = None,
+        order_by: PodcastOrder = PodcastOrder.TITLE,
+    ) -> Connection[Podcast]:
+        if not 0 <= first <= 50:
+            raise ValueError("first must be between 0 and 50")
+
+        paginated_podcasts = await data.find_podcasts(
+            query=query,
+            first=first,
+            after=str(after) if after is not None else None,
+            by_relevance=order_by == PodcastOrder.RELEVANCE,
+            fields=get_model_fields(info, models.Podcast, ("edges", "node")),
+        )
+
+        return Connection(
+            page_info=PageInfo.from_db(paginated_podcasts.page_info),
+            edges=[
+                Edge(node=Podcast.from_db(edge.node), cursor=edge.cursor)
+                for edge in paginated_podcasts.edges
+            ],
+        )
+
+    # new episodes are imported all the time
+    @strawberry.field(directives=[CacheControl(max_age=60)])
+    async def latest_episodes(self, info: Info, last: int = 5) -> List[Episode]:
+        if not 0 <= last <= 50:
+            raise ValueError("last must be between 0 and 50")
+
+        episodes = await data.find_latest_episodes(
+            last=last, fields=get_model_fields(info, models.Episode, always=["podcast"])
+        )
+
+        return [Episode.from_db(episode) for episode in episodes]
@@ -0,0 +1,117 @@
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+
+from django.db.models import Model
+
+import strawberry
+from strawberry.types import Info
+
+from api.authentication.permissions import IsAuthenticated
+from api.extensions.cache_control import CacheControl
+from api.pagination.types import Connection, Edge, PageInfo
+from api.projection import get_model_fields
+from api.views import Context
+from db import data, models
+from db.pagination import PaginatedData
+
+
+@strawberry.enum
+class PodcastOrder(Enum):
+    TITLE = "title"
+    RELEVANCE = "relevance"
+
+
+def _loaded_values(db_object: Model, defaults: Dict[str, Any]) -> Dict[str, Any]:
+    # fields that weren't loaded weren't selected either (see
+    # `api.projection.get_model_fields`), so the defaults are never returned
+    deferred = db_object.get_deferred_fields()
+
+    return {
+        name: default if name in deferred else getattr(db_object, name)
+        for name, default in defaults.items()
+    }
+
+
+@strawberry.type(directives=[CacheControl(max_age=300)])
+class Episode:
+    id: strawberry.ID
+    title: str
+    notes: str
+    published_at: datetime
+
+    podcast_id: strawberry.Private[str]
+
+    @strawberry.field
+    async def podcast(self, info: Info[Context, None]) -> "Podcast":
+        db_podcast = await info.context["podcast_loader"].load(self.podcast_id)
+
+        assert db_podcast is not None
+
+        return Podcast.from_db(db_podcast)
+
+    @classmethod
+    def from_db(cls, db_episode: models.Episode) -> "Episode":
+        return cls(
+            id=strawberry.ID(str(db_episode.id)),
+            podcast_id=str(db_episode.podcast_id),  # type: ignore
+            **_loaded_values(
+                db_episode, {"title": "", "notes": "", "published_at": None}
+            ),
+        )
+
+
+@strawberry.type(directives=[CacheControl(max_age=300)])
+class Podcast:
+    id: strawberry.ID
+    title: str
+    description: str
+    subscriber_count: int
+
+    @strawberry.field(permission_classes=[IsAuthenticated])
+    async def is_subscribed(self, info: Info[Context, None]) -> bool:
+        # the podcasts in the response are checked with a single query
+        return await info.context["is_subscribed_loader"].load(str(self.id))
+
+    @strawberry.field
+    async def episodes(
+        self,
+        info: Info[Context, None],
+        first: int = 10,
+        after: Optional[strawberry.ID] = None,
+    ) -> Connection[Episode]:
+        if not 0 <= first <= 50:
+            raise ValueError("first must be between 0 and 50")
+
+        paginated_episodes: PaginatedData[models.Episode]
+        fields = get_model_fields(
+            info, models.Episode, ("edges", "node"), always=["podcast"]
+        )
+
+        if after is None:
+            # the first page of every podcast in the response is fetched
+            # in a single query
+            paginated_episodes = await info.context["first_episodes_loader"].load(
+                (str(self.id), first, tuple(fields))
+            )
+        else:
+            paginated_episodes = await data.get_episodes_for_podcast(
+                str(self.id), first=first, after=str(after), fields=fields
+            )
+
+        return Connection(
+            page_info=PageInfo.from_db(paginated_episodes.page_info),
+            edges=[
+                Edge(node=Episode.from_db(edge.node), cursor=edge.cursor)
+                for edge in paginated_episodes.edges
+            ],
+        )
+
+    @classmethod
+    def from_db(cls, db_podcast: models.Podcast) -> "Podcast":
+        return cls(
+            id=strawberry.ID(str(db_podcast.id)),
+            **_loaded_values(
+                db_podcast, {"title": "", "description": "", "subscriber_count": 0}
+            ),
+        )
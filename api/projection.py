@@ -0,0 +1,68 @@
+from typing import Iterable, Iterator, List, Sequence, Type
+
+from django.db.models import Model
+
+from strawberry.types import Info
+from strawberry.types.nodes import SelectedField, Selection
+from strawberry.utils.str_converters import to_camel_case
+
+
+def _is_included(selection: Selection) -> bool:
+    # the arguments of the directives have the values of the variables
+    directives = selection.directives
+
+    return not directives.get("skip", {}).get("if", False) and directives.get(
+        "include", {}
+    ).get("if", True)
+
+
+def _fields(selections: Iterable[Selection]) -> Iterator[SelectedField]:
+    for selection in selections:
+        if not _is_included(selection):
+            continue
+
+        if isinstance(selection, SelectedField):
+            yield selection
+        else:
+            # fragments are always on the same type, the fields returning
+            # models aren't unions or interfaces
+            yield from _fields(selection.selections)
+
+
+def get_model_fields(
+    info: Info,
+    model: Type[Model],
+    path: Sequence[str] = (),
+    always: Iterable[str] = (),
+) -> List[str]:
+    """Returns the fields of `model` selected by the client, to load only
+    these columns. `path` leads from the current field to the type backed by
+    the model, for example ("edges", "node") for connections, and `always`
+    are fields the resolvers need even when they aren't selected.
+
+    GraphQL fields are matched to the model fields with the same name (in
+    camel case), the others (like fields with a resolver) are ignored."""
+
+    selections: List[SelectedField] = [
+        field for field in info.selected_fields if isinstance(field, SelectedField)
+    ]
+
+    for name in path:
+        selections = [
+            field
+            for selection in selections
+            for field in _fields(selection.selections)
+            if field.name == name
+        ]
+
+    names = {
+        to_camel_case(field.name): field.name for field in model._meta.concrete_fields
+    }
+    selected = {
+        names[field.name]
+        for selection in selections
+        for field in _fields(selection.selections)
+        if field.name in names
+    }
+
+    return sorted(selected | set(always))
@@ -1,13 +1,23 @@
+from django.conf import settings
+
 import strawberry
 
 from .authentication.mutation import AuthenticationMutation
+from .extensions.cache_control import CacheControl, ResponseCacheControl
+from .extensions.document_cache import DocumentCache
+from .extensions.metrics import OperationMetrics
+from .extensions.query_cost import create_query_cost_limiter
+from .extensions.replicas import PrimaryForMutations
+from .extensions.slow_queries import SlowQueryContext
 from .podcasts.mutation import PodcastsMutation
 from .podcasts.query import PodcastsQuery
 
 
 @strawberry.type
 class Query(PodcastsQuery):
-    hello: str = strawberry.field(resolver=lambda: "Hello World!")
+    hello: str = strawberry.field(
+        resolver=lambda: "Hello World!", directives=[CacheControl(max_age=3600)]
+    )
 
 
 @strawberry.type
@@ -18,4 +28,18 @@ class Mutation(AuthenticationMutation, PodcastsMutation):
 schema = strawberry.Schema(
     query=Query,
     mutation=Mutation,
+    extensions=[
+        OperationMetrics,
+        SlowQueryContext,
+        PrimaryForMutations,
+        DocumentCache,
+        ResponseCacheControl,
+        create_query_cost_limiter(
+            max_cost=settings.GRAPHQL_MAX_QUERY_COST,
+            field_costs={
+                # full text search is more expensive than fetching by id
+                "Query.findPodcasts": 5,
+            },
+        ),
+    ],
 )
@@ -1,6 +1,7 @@
 from django.urls import path
 from django.views.generic.base import RedirectView
 
+from api.metrics import metrics_view
 from api.schema import schema
 
 from .views import PodcastGraphQLView
@@ -8,5 +9,6 @@ from .views import PodcastGraphQLView
 
 urlpatterns = [
     path("graphql", PodcastGraphQLView.as_view(schema=schema)),
+    path("metrics", metrics_view),
     path("", RedirectView.as_view(url="/graphql")),
 ]
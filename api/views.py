@@ -1,12 +1,47 @@
+import asyncio
+import json
 from functools import partial
-from typing import Protocol, TypedDict, cast
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Optional,
+    Protocol,
+    Type,
+    TypedDict,
+    TypeVar,
+    cast,
+)
 
 from asgiref.sync import sync_to_async
 
 from django.contrib.auth.middleware import get_user
 from django.http import HttpRequest, HttpResponse
+from django.utils.cache import get_conditional_response, set_response_etag
 
 from strawberry.django.views import AsyncGraphQLView
+from strawberry.http import GraphQLRequestData
+from strawberry.http.async_base_view import AsyncHTTPRequestAdapter
+from strawberry.http.base import BaseRequestProtocol
+from strawberry.http.exceptions import HTTPException
+from strawberry.permission import BasePermission
+from strawberry.types import ExecutionResult
+from strawberry.unset import UNSET
+
+from api.persisted_queries import PersistedQueryError, persisted_queries
+from api.podcasts.dataloaders import (
+    FirstEpisodesLoader,
+    IsSubscribedLoader,
+    PodcastLoader,
+    create_first_episodes_loader,
+    create_is_subscribed_loader,
+    create_podcast_loader,
+)
+from db.thread_hops import record_thread_hops
+
+
+T = TypeVar("T")
 
 
 # See https://github.com/python/mypy/issues/10750
@@ -22,15 +57,119 @@ class HttpRequestWithAsyncGetUser(HttpRequest):
 class Context(TypedDict):
     request: HttpRequestWithAsyncGetUser
     response: HttpResponse
+    podcast_loader: PodcastLoader
+    first_episodes_loader: FirstEpisodesLoader
+    is_subscribed_loader: IsSubscribedLoader
+    # results of the permissions checked once per request, see
+    # `api.authentication.permissions.RequestPermission`
+    permissions: Dict[Type[BasePermission], "asyncio.Future[bool]"]
+
+
+def _once(func: Callable[[], Awaitable[T]]) -> Callable[[], "asyncio.Future[T]"]:
+    # the first call runs `func`, the following ones (including the ones
+    # made while it is still running) wait for the same result
+    future: Optional[asyncio.Future[T]] = None
+
+    def wrapper() -> "asyncio.Future[T]":
+        nonlocal future
+
+        if future is None:
+            future = asyncio.ensure_future(func())
+
+        return future
+
+    return wrapper
 
 
 class PodcastGraphQLView(AsyncGraphQLView):
     async def get_context(
         self, request: HttpRequest, response: HttpResponse
     ) -> Context:
-        request.get_user = sync_to_async(partial(get_user, request))  # type: ignore
+        # the user is fetched at most once per request, and only if needed
+        request.get_user = _once(  # type: ignore
+            record_thread_hops(sync_to_async(partial(get_user, request)))
+        )
+        request = cast(HttpRequestWithAsyncGetUser, request)
 
         return {
-            "request": cast(HttpRequestWithAsyncGetUser, request),
+            "request": request,
             "response": response,
+            "podcast_loader": create_podcast_loader(),
+            "first_episodes_loader": create_first_episodes_loader(),
+            "is_subscribed_loader": create_is_subscribed_loader(request.get_user),
+            "permissions": {},
         }
+
+    async def run(
+        self,
+        request: HttpRequest,
+        context: Optional[Context] = UNSET,
+        root_value: Any = UNSET,
+    ) -> HttpResponse:
+        response = await super().run(request, context, root_value)
+
+        # only GET requests can be cached, and only responses that have a
+        # `Cache-Control` header set by `ResponseCacheControl` are queries
+        if (
+            request.method != "GET"
+            or response.status_code != 200
+            or response.get("Cache-Control", "no-store") == "no-store"
+        ):
+            return response
+
+        set_response_etag(response)
+
+        # returns a 304 when the ETag matches the If-None-Match header
+        return get_conditional_response(
+            request, etag=response["ETag"], response=response
+        )
+
+    def should_render_graphiql(self, request: BaseRequestProtocol) -> bool:
+        # GET requests with persisted queries don't have a query
+        return "extensions" not in request.query_params and (
+            super().should_render_graphiql(request)
+        )
+
+    async def parse_http_body(
+        self, request: AsyncHTTPRequestAdapter
+    ) -> GraphQLRequestData:
+        content_type = request.content_type or ""
+
+        # same as strawberry's, but we also need the extensions
+        if "application/json" in content_type:
+            data = self.parse_json(await request.get_body())
+        elif content_type.startswith("multipart/form-data"):
+            data = await self.parse_multipart(request)
+        elif request.method == "GET":
+            data = self.parse_query_params(request.query_params)
+        else:
+            raise HTTPException(400, "Unsupported content type")
+
+        return GraphQLRequestData(
+            query=await persisted_queries.resolve(
+                data.get("query"), self._parse_extensions(data.get("extensions"))
+            ),
+            variables=data.get("variables"),  # type: ignore
+            operation_name=data.get("operationName"),
+        )
+
+    def _parse_extensions(self, extensions: Any) -> Optional[dict]:
+        # extensions are sent as JSON in the query string of GET requests
+        if isinstance(extensions, list):
+            extensions = extensions[0]
+
+        if isinstance(extensions, str):
+            try:
+                extensions = json.loads(extensions)
+            except json.JSONDecodeError as e:
+                raise HTTPException(400, "Unable to parse extensions as JSON") from e
+
+        return extensions if isinstance(extensions, dict) else None
+
+    async def execute_operation(
+        self, request: HttpRequest, context: Context, root_value: Any
+    ) -> ExecutionResult:
+        try:
+            return await super().execute_operation(request, context, root_value)
+        except PersistedQueryError as e:
+            return ExecutionResult(data=None, errors=[e.as_graphql_error()])
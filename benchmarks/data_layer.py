@@ -0,0 +1,75 @@
+"""Measures how the async data layer scales with concurrent requests.
+
+Every simulated request runs inside its own `ThreadSensitiveContext`, like
+Django's ASGI handler does, and calls a few functions from `db.data`.
+
+    python -m benchmarks.data_layer --requests 400 --podcasts 200
+"""
+
+import asyncio
+
+import rich
+import typer
+from asgiref.sync import ThreadSensitiveContext
+
+from benchmarks.utils import setup_django, timer
+
+
+def seed(podcasts: int, episodes_per_podcast: int) -> None:
+    from db.models import Episode, Podcast
+
+    db_podcasts = Podcast.objects.bulk_create(
+        Podcast(title=f"Podcast {i}", hosted_by=f"Host {i}") for i in range(podcasts)
+    )
+    Episode.objects.bulk_create(
+        Episode(podcast=podcast, title=f"Episode {i}")
+        for podcast in db_podcasts
+        for i in range(episodes_per_podcast)
+    )
+
+
+async def simulate_request(podcast_id: str) -> None:
+    from db import data
+
+    async with ThreadSensitiveContext():
+        await data.find_podcasts(query="Podcast 1", first=10)
+        await data.get_episodes_for_podcast(podcast_id, first=10)
+        await data.find_latest_episodes(last=5)
+
+
+async def run(podcast_ids: list[str], requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(podcast_id: str) -> None:
+        async with semaphore:
+            await simulate_request(podcast_id)
+
+    with timer() as elapsed:
+        await asyncio.gather(
+            *(limited(podcast_ids[i % len(podcast_ids)]) for i in range(requests))
+        )
+
+    return requests / elapsed[0]
+
+
+def main(
+    requests: int = 400,
+    podcasts: int = 200,
+    episodes_per_podcast: int = 20,
+    concurrency: list[int] = typer.Option([1, 2, 4, 8, 16]),
+):
+    setup_django()
+    seed(podcasts, episodes_per_podcast)
+
+    from db.models import Podcast
+
+    podcast_ids = [str(id) for id in Podcast.objects.values_list("id", flat=True)]
+
+    for level in concurrency:
+        throughput = asyncio.run(run(podcast_ids, requests, level))
+
+        rich.print(f"concurrency={level:<3} {throughput:8.1f} requests/sec")
+
+
+if __name__ == "__main__":
+    typer.run(main)
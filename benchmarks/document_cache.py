@@ -0,0 +1,96 @@
+"""Compares requests/sec of a few small queries with and without the
+`DocumentCache` schema extension.
+
+Requests go through the whole Django stack with an `AsyncClient`, so the
+numbers include everything else a request does (including the database).
+
+    python -m benchmarks.document_cache --requests 2000
+"""
+
+import asyncio
+
+import rich
+import typer
+
+from benchmarks.utils import setup_django, timer
+
+
+QUERIES = {
+    "hello": "query { hello }",
+    "latestEpisodes": """
+        query LatestEpisodes {
+            latestEpisodes(last: 5) {
+                id
+                title
+                notes
+                publishedAt
+                podcast {
+                    id
+                    title
+                }
+            }
+        }
+    """,
+}
+
+
+def seed(podcasts: int) -> None:
+    from db.models import Episode, Podcast
+
+    db_podcasts = Podcast.objects.bulk_create(
+        Podcast(title=f"Podcast {i}", hosted_by=f"Host {i}") for i in range(podcasts)
+    )
+    Episode.objects.bulk_create(
+        Episode(podcast=podcast, title=f"Episode {i}")
+        for podcast in db_podcasts
+        for i in range(5)
+    )
+
+
+async def run(query: str, requests: int) -> float:
+    from django.test import AsyncClient
+
+    client = AsyncClient()
+
+    with timer() as elapsed:
+        for _ in range(requests):
+            response = await client.post(
+                "/graphql", {"query": query}, content_type="application/json"
+            )
+
+            assert "errors" not in response.json(), response.json()
+
+    return requests / elapsed[0]
+
+
+def main(requests: int = 2000, podcasts: int = 10):
+    setup_django()
+    seed(podcasts)
+
+    from django.test.utils import setup_test_environment
+
+    # allows the test client's host
+    setup_test_environment()
+
+    from api.extensions.document_cache import DocumentCache, document_cache
+    from api.schema import schema
+
+    configurations: dict[str, list] = {"no cache": [], "cache": [DocumentCache]}
+
+    for name, query in QUERIES.items():
+        for label, extensions in configurations.items():
+            schema.extensions = extensions
+            document_cache.clear()
+
+            throughput = asyncio.run(run(query, requests))
+
+            rich.print(f"{name:<16} {label:<10} {throughput:8.1f} requests/sec")
+
+        rich.print(
+            f"{'':<16} {'':<10} hits={document_cache.hits} "
+            f"misses={document_cache.misses}"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,104 @@
+"""Compares importing a feed one episode at a time (what `_import_feed` used
+to do) with the batched upsert.
+
+    python -m benchmarks.import_episodes --episodes 2000
+"""
+
+import contextlib
+import io
+import time
+from datetime import datetime
+from email.utils import format_datetime
+from typing import Callable
+
+import rich
+import typer
+
+from benchmarks.utils import setup_django
+
+
+def build_feed(title: str, episodes: int) -> bytes:
+    def published(i: int) -> str:
+        return format_datetime(datetime.fromtimestamp(1_600_000_000 + i * 3600))
+
+    items = "".join(
+        f"""
+        <item>
+            <title>Episode {i}</title>
+            <guid isPermaLink="false">{title}-{i}</guid>
+            <pubDate>{published(i)}</pubDate>
+            <description>Notes for episode {i}</description>
+            <enclosure
+                url="https://example.com/{i}.mp3" length="100" type="audio/mpeg"
+            />
+        </item>"""
+        for i in range(episodes)
+    )
+
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+        <rss version="2.0"><channel><title>{title}</title>{items}</channel></rss>
+    """.encode()
+
+
+def legacy_import_feed(feed_url: str, content: bytes) -> None:
+    import podcastparser
+
+    from django.utils import timezone
+
+    from db.models import Episode, Podcast
+
+    current_timezone = timezone.get_current_timezone()
+    podcast = podcastparser.parse(feed_url, io.BytesIO(content))
+    episodes = podcast.pop("episodes")
+
+    db_podcast, _ = Podcast.objects.update_or_create(title=podcast["title"])
+
+    for episode in episodes:
+        published_at = datetime.fromtimestamp(
+            episode["published"], tz=current_timezone
+        ).isoformat()
+
+        Episode.objects.update_or_create(
+            podcast=db_podcast,
+            title=episode["title"],
+            defaults={
+                "notes": episode.get("description", ""),
+                "published_at": published_at,
+                "total_time": episode.get("total_time", 0),
+            },
+        )
+
+
+def measure(import_feed: Callable[[str, bytes], None], content: bytes) -> float:
+    # the importer prints progress, which we don't want to measure
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        import_feed("https://example.com/feed", content)
+
+        return time.perf_counter() - start
+
+
+def main(episodes: int = 2000):
+    setup_django()
+
+    from cli import _import_feed
+
+    implementations: dict[str, Callable] = {
+        "update_or_create": legacy_import_feed,
+        "bulk upsert": _import_feed,
+    }
+
+    for label, import_feed in implementations.items():
+        content = build_feed(label, episodes)
+
+        for run in ("insert", "update"):
+            elapsed = measure(import_feed, content)
+
+            rich.print(
+                f"{label:<18} {run:<8} {episodes / elapsed:10.0f} rows/sec "
+                f"({elapsed:.2f}s)"
+            )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,425 @@
+"""Load test for the GraphQL API: seeds a dataset, then sends requests to
+the ASGI application in-process from concurrent clients, and reports the
+latency percentiles, requests/sec and SQL queries per request of each
+scenario, and the peak memory of the process (which runs all of them).
+
+Results can be saved as JSON and compared with a previous run, failing when
+a scenario got slower than the threshold:
+
+    python -m benchmarks.load --output before.json
+    python -m benchmarks.load --baseline before.json --threshold 0.2
+"""
+
+import asyncio
+import json
+import random
+import resource
+import statistics
+import sys
+import time
+from dataclasses import asdict, dataclass
+from http.cookies import SimpleCookie
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import rich
+import typer
+from rich.table import Table
+
+from benchmarks.utils import setup_django
+
+
+FIND_PODCASTS_QUERY = """
+    query FindPodcasts($query: String!) {
+        findPodcasts(query: $query, first: 10) {
+            edges {
+                node {
+                    id
+                    title
+                }
+            }
+        }
+    }
+"""
+
+PODCAST_EPISODES_QUERY = """
+    query PodcastEpisodes($id: ID!) {
+        podcast(id: $id) {
+            title
+            episodes(first: 10) {
+                edges {
+                    node {
+                        title
+                        publishedAt
+                    }
+                }
+            }
+        }
+    }
+"""
+
+LATEST_EPISODES_QUERY = """
+    query LatestEpisodes {
+        latestEpisodes(last: 10) {
+            title
+            podcast {
+                title
+            }
+        }
+    }
+"""
+
+SUBSCRIBE_TO_PODCAST_MUTATION = """
+    mutation SubscribeToPodcast($id: ID!) {
+        subscribeToPodcast(id: $id) {
+            __typename
+        }
+    }
+"""
+
+
+@dataclass
+class Dataset:
+    podcast_ids: List[str]
+    # session cookies of the seeded users
+    sessions: List[str]
+
+
+# (operation, variables, session) for the n-th request
+RequestFactory = Callable[[Dataset, int], Tuple[str, Dict[str, Any], Optional[str]]]
+
+
+@dataclass
+class Scenario:
+    name: str
+    make_request: RequestFactory
+
+
+SCENARIOS = [
+    Scenario(
+        "FindPodcasts",
+        lambda dataset, n: (FIND_PODCASTS_QUERY, {"query": f"Podcast {n % 10}"}, None),
+    ),
+    Scenario(
+        "PodcastEpisodes",
+        lambda dataset, n: (
+            PODCAST_EPISODES_QUERY,
+            {"id": dataset.podcast_ids[n % len(dataset.podcast_ids)]},
+            None,
+        ),
+    ),
+    Scenario(
+        "LatestEpisodes",
+        lambda dataset, n: (LATEST_EPISODES_QUERY, {}, None),
+    ),
+    Scenario(
+        "SubscribeToPodcast",
+        lambda dataset, n: (
+            SUBSCRIBE_TO_PODCAST_MUTATION,
+            {"id": random.choice(dataset.podcast_ids)},
+            dataset.sessions[n % len(dataset.sessions)],
+        ),
+    ),
+]
+
+
+@dataclass
+class Result:
+    requests: int
+    errors: int
+    requests_per_second: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    sql_queries_per_request: float
+
+
+def seed(
+    podcasts: int, episodes_per_podcast: int, users: int, subscriptions: int
+) -> Dataset:
+    from django.conf import settings
+    from django.test import Client
+
+    from db.models import Episode, Podcast
+    from users.models import User
+
+    db_podcasts = Podcast.objects.bulk_create(
+        Podcast(title=f"Podcast {i}", description=f"Description {i}")
+        for i in range(podcasts)
+    )
+    Episode.objects.bulk_create(
+        (
+            Episode(podcast=podcast, title=f"Episode {i}", guid=f"{podcast.id}-{i}")
+            for podcast in db_podcasts
+            for i in range(episodes_per_podcast)
+        ),
+        batch_size=10_000,
+    )
+
+    db_users = [
+        User.objects.create_user(
+            email=f"user-{i}@example.com", password="password", name=f"User {i}"
+        )
+        for i in range(users)
+    ]
+    Podcast.subscribers.through.objects.bulk_create(
+        Podcast.subscribers.through(podcast=podcast, user=user)
+        for user in db_users
+        for podcast in random.sample(db_podcasts, min(subscriptions, podcasts))
+    )
+
+    sessions = []
+
+    for user in db_users:
+        # logging in with a client that has a session ends that session
+        client = Client()
+        client.force_login(user)
+        sessions.append(client.cookies[settings.SESSION_COOKIE_NAME].value)
+
+    return Dataset(
+        podcast_ids=[str(podcast.id) for podcast in db_podcasts], sessions=sessions
+    )
+
+
+async def post(application, body: bytes, session: Optional[str]) -> Tuple[int, bytes]:
+    from django.conf import settings
+
+    headers = [
+        (b"host", b"localhost"),
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+
+    if session is not None:
+        cookie: SimpleCookie = SimpleCookie({settings.SESSION_COOKIE_NAME: session})
+        headers.append((b"cookie", cookie.output(header="", sep=";").encode()))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/graphql",
+        "raw_path": b"/graphql",
+        "query_string": b"",
+        "headers": headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 80),
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    status = 0
+    response_body = b""
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+
+        # the request is over, Django waits for a disconnect in the background
+        await asyncio.Future()
+
+    async def send(message):
+        nonlocal status, response_body
+
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            response_body += message.get("body", b"")
+
+    await application(scope, receive, send)
+
+    return status, response_body
+
+
+def sql_queries(operation: str) -> Tuple[float, float]:
+    # recorded by `api.metrics.MetricsMiddleware`
+    from prometheus_client import REGISTRY
+
+    labels = {"operation": operation}
+
+    return (
+        REGISTRY.get_sample_value("graphql_operation_sql_queries_sum", labels) or 0,
+        REGISTRY.get_sample_value("graphql_operation_sql_queries_count", labels) or 0,
+    )
+
+
+def peak_memory_mb() -> float:
+    # kilobytes on Linux, bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+async def run(
+    application,
+    scenario: Scenario,
+    dataset: Dataset,
+    requests: int,
+    concurrency: int,
+) -> Result:
+    latencies: List[float] = []
+    errors = 0
+    next_request = 0
+
+    async def client():
+        nonlocal errors, next_request
+
+        while next_request < requests:
+            n = next_request
+            next_request += 1
+
+            query, variables, session = scenario.make_request(dataset, n)
+            body = json.dumps({"query": query, "variables": variables}).encode()
+
+            start = time.perf_counter()
+            status, response = await post(application, body, session)
+            latencies.append(time.perf_counter() - start)
+
+            if status != 200 or "errors" in json.loads(response):
+                errors += 1
+
+    queries_before, count_before = sql_queries(scenario.name)
+    start = time.perf_counter()
+
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+
+    elapsed = time.perf_counter() - start
+    queries_after, count_after = sql_queries(scenario.name)
+    percentiles = statistics.quantiles(latencies, n=100, method="inclusive")
+
+    return Result(
+        requests=requests,
+        errors=errors,
+        requests_per_second=requests / elapsed,
+        p50_ms=percentiles[49] * 1000,
+        p95_ms=percentiles[94] * 1000,
+        p99_ms=percentiles[98] * 1000,
+        sql_queries_per_request=(queries_after - queries_before)
+        / max(count_after - count_before, 1),
+    )
+
+
+def find_regressions(
+    results: Dict[str, Result], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    regressions = []
+
+    for name, result in results.items():
+        previous = baseline["scenarios"].get(name)
+
+        if previous is None:
+            continue
+
+        if result.p95_ms > previous["p95_ms"] * (1 + threshold):
+            regressions.append(
+                f"{name}: p95 went from {previous['p95_ms']:.1f}ms "
+                f"to {result.p95_ms:.1f}ms"
+            )
+
+        if result.requests_per_second < previous["requests_per_second"] * (
+            1 - threshold
+        ):
+            regressions.append(
+                f"{name}: requests/sec went from "
+                f"{previous['requests_per_second']:.1f} "
+                f"to {result.requests_per_second:.1f}"
+            )
+
+        # cached results make the average vary a bit between runs
+        if result.sql_queries_per_request > previous["sql_queries_per_request"] * (
+            1 + threshold
+        ):
+            regressions.append(
+                f"{name}: SQL queries per request went from "
+                f"{previous['sql_queries_per_request']:.1f} "
+                f"to {result.sql_queries_per_request:.1f}"
+            )
+
+    return regressions
+
+
+def print_results(results: Dict[str, Result]) -> None:
+    table = Table("scenario", "req/s", "p50", "p95", "p99", "SQL/req", "errors")
+
+    for name, result in results.items():
+        table.add_row(
+            name,
+            f"{result.requests_per_second:.1f}",
+            f"{result.p50_ms:.1f}ms",
+            f"{result.p95_ms:.1f}ms",
+            f"{result.p99_ms:.1f}ms",
+            f"{result.sql_queries_per_request:.1f}",
+            str(result.errors),
+        )
+
+    rich.print(table)
+    rich.print(f"Peak memory usage of the process: {peak_memory_mb():.1f} MB")
+
+
+def main(
+    requests: int = 500,
+    concurrency: int = 10,
+    podcasts: int = 200,
+    episodes_per_podcast: int = 20,
+    users: int = 50,
+    subscriptions: int = 10,
+    scenario: List[str] = typer.Option([], help="Scenarios to run, all by default"),
+    seed_value: int = typer.Option(0, "--seed", help="Seed of the random data"),
+    output: Optional[Path] = typer.Option(None, help="Save the results as JSON"),
+    baseline: Optional[Path] = typer.Option(None, help="Results to compare with"),
+    threshold: float = typer.Option(
+        0.2, help="Slowdown compared to the baseline that fails the run"
+    ),
+):
+    random.seed(seed_value)
+
+    setup_django()
+    dataset = seed(podcasts, episodes_per_podcast, users, subscriptions)
+
+    # `get_asgi_application` would set up Django again, and the logging with it
+    from django.core.handlers.asgi import ASGIHandler
+
+    application = ASGIHandler()
+    results: Dict[str, Result] = {}
+
+    for current in SCENARIOS:
+        if scenario and current.name not in scenario:
+            continue
+
+        results[current.name] = asyncio.run(
+            run(application, current, dataset, requests, concurrency)
+        )
+
+    print_results(results)
+
+    report = {
+        "config": {
+            "requests": requests,
+            "concurrency": concurrency,
+            "podcasts": podcasts,
+            "episodes_per_podcast": episodes_per_podcast,
+            "users": users,
+            "subscriptions": subscriptions,
+            "seed": seed_value,
+        },
+        "scenarios": {name: asdict(result) for name, result in results.items()},
+        "peak_memory_mb": peak_memory_mb(),
+    }
+
+    if output is not None:
+        output.write_text(json.dumps(report, indent=2))
+
+    if baseline is not None:
+        regressions = find_regressions(
+            results, json.loads(baseline.read_text()), threshold
+        )
+
+        for regression in regressions:
+            rich.print(f"[red]{regression}")
+
+        if regressions:
+            raise typer.Exit(1)
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,121 @@
+"""Measures the overhead of recording metrics, comparing requests/sec with
+and without the `MetricsMiddleware` and the `OperationMetrics` extension.
+
+Requests go through the whole Django stack with an `AsyncClient`, so the
+overhead is relative to everything else a request does.
+
+    python -m benchmarks.metrics --requests 2000
+"""
+
+import asyncio
+
+import rich
+import typer
+
+from benchmarks.utils import setup_django, timer
+
+
+QUERIES = {
+    "hello": "query Hello { hello }",
+    # not cached, runs a few SQL queries
+    "findPodcasts": """
+        query FindPodcasts {
+            findPodcasts(query: "Podcast", first: 10) {
+                edges {
+                    node {
+                        title
+                        episodes(first: 5) {
+                            edges {
+                                node {
+                                    title
+                                }
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    """,
+}
+
+
+def seed(podcasts: int) -> None:
+    from db.models import Episode, Podcast
+
+    db_podcasts = Podcast.objects.bulk_create(
+        Podcast(title=f"Podcast {i}", hosted_by=f"Host {i}") for i in range(podcasts)
+    )
+    Episode.objects.bulk_create(
+        Episode(podcast=podcast, title=f"Episode {i}")
+        for podcast in db_podcasts
+        for i in range(5)
+    )
+
+
+async def run(query: str, requests: int) -> float:
+    from django.test import AsyncClient
+
+    # the middleware is loaded by each client
+    client = AsyncClient()
+
+    with timer() as elapsed:
+        for _ in range(requests):
+            response = await client.post(
+                "/graphql", {"query": query}, content_type="application/json"
+            )
+
+            assert "errors" not in response.json(), response.json()
+
+    return requests / elapsed[0]
+
+
+def main(requests: int = 2000, podcasts: int = 10):
+    setup_django()
+    seed(podcasts)
+
+    from django.conf import settings
+    from django.test.utils import override_settings, setup_test_environment
+
+    # allows the test client's host
+    setup_test_environment()
+
+    from api.extensions.metrics import OperationMetrics
+    from api.schema import schema
+
+    with_metrics = (settings.MIDDLEWARE, schema.extensions)
+    without_metrics = (
+        [
+            middleware
+            for middleware in settings.MIDDLEWARE
+            if middleware != "api.metrics.MetricsMiddleware"
+        ],
+        [
+            extension
+            for extension in schema.extensions
+            if extension is not OperationMetrics
+        ],
+    )
+
+    for name, query in QUERIES.items():
+        results = {}
+
+        # without metrics first, as the instrumentation stays installed once
+        # the middleware is loaded
+        for label, (middleware, extensions) in (
+            ("no metrics", without_metrics),
+            ("metrics", with_metrics),
+        ):
+            schema.extensions = extensions
+
+            with override_settings(MIDDLEWARE=middleware):
+                results[label] = asyncio.run(run(query, requests))
+
+            rich.print(f"{name:<16} {label:<12} {results[label]:8.1f} requests/sec")
+
+        overhead = 1 - results["metrics"] / results["no metrics"]
+
+        rich.print(f"{'':<16} {'overhead':<12} {overhead:8.1%}")
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,111 @@
+"""Compares the keyset paginator in `db.pagination` with the previous
+implementation based on `django-cursor-pagination`.
+
+    python -m benchmarks.pagination --episodes 1000000
+"""
+
+import statistics
+import time
+from typing import Callable, Optional
+
+import rich
+import typer
+
+from benchmarks.utils import setup_django
+
+
+def seed(episodes: int, podcasts: int, batch_size: int = 10_000) -> None:
+    from db.models import Episode, Podcast
+
+    db_podcasts = Podcast.objects.bulk_create(
+        Podcast(title=f"Podcast {i}") for i in range(podcasts)
+    )
+
+    for start in range(0, episodes, batch_size):
+        Episode.objects.bulk_create(
+            Episode(
+                podcast=db_podcasts[i % podcasts],
+                title=f"Episode {i % 5_000}",
+            )
+            for i in range(start, min(start + batch_size, episodes))
+        )
+
+
+def legacy_paginate(queryset, ordering, first: int = 10, after: Optional[str] = None):
+    # the implementation `db.pagination.paginate` used to have
+    from cursor_pagination import CursorPaginator
+
+    from db.pagination import Edge, PageInfo, PaginatedData
+
+    paginator = CursorPaginator(queryset, ordering=ordering)
+    page = paginator.page(first=first, after=after)
+    has_items = len(page) > 0
+
+    page_info = PageInfo(
+        has_next_page=page.has_next,
+        has_previous_page=page.has_previous,
+        start_cursor=paginator.cursor(page[0]) if has_items else None,
+        end_cursor=paginator.cursor(page[-1]) if has_items else None,
+    )
+
+    return PaginatedData(
+        edges=[Edge(node=item, cursor=paginator.cursor(item)) for item in page],
+        page_info=page_info,
+    )
+
+
+def walk(paginate: Callable, queryset, pages: int, first: int) -> list[float]:
+    timings = []
+    after = None
+
+    for _ in range(pages):
+        start = time.perf_counter()
+        paginated_data = paginate(
+            queryset, ordering=("title", "-id"), first=first, after=after
+        )
+        timings.append(time.perf_counter() - start)
+
+        after = paginated_data.page_info.end_cursor
+
+    return timings
+
+
+def main(
+    episodes: int = 1_000_000,
+    podcasts: int = 1_000,
+    pages: int = 50,
+    first: int = 10,
+):
+    setup_django()
+
+    rich.print(f"Seeding {episodes} episodes...")
+    seed(episodes, podcasts)
+
+    from db.models import Episode, Podcast
+    from db.pagination import paginate
+
+    podcast = Podcast.objects.first()
+
+    scenarios = {
+        "all episodes": Episode.objects.all(),
+        "episodes of a podcast": Episode.objects.filter(podcast=podcast),
+    }
+
+    implementations: dict[str, Callable] = {
+        "cursor-pagination": legacy_paginate,
+        "keyset": paginate,
+    }
+
+    for name, queryset in scenarios.items():
+        for label, implementation in implementations.items():
+            timings = walk(implementation, queryset, pages, first)
+
+            rich.print(
+                f"{name:<24} {label:<18} "
+                f"median {statistics.median(timings) * 1000:8.2f}ms "
+                f"max {max(timings) * 1000:8.2f}ms"
+            )
+
+
+if __name__ == "__main__":
+    typer.run(main)
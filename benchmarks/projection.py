@@ -0,0 +1,105 @@
+"""Compares loading whole episodes with loading only the columns selected by
+a GraphQL query (see `api.projection`), on episodes with long notes.
+
+    python -m benchmarks.projection --episodes 100000
+"""
+
+import asyncio
+import statistics
+import time
+import tracemalloc
+from typing import Tuple
+
+import rich
+import typer
+
+from benchmarks.utils import setup_django
+
+
+def seed(episodes: int, podcasts: int, notes_size: int, batch_size: int = 10_000):
+    from db.models import Episode, Podcast
+
+    db_podcasts = Podcast.objects.bulk_create(
+        Podcast(title=f"Podcast {i}", description="description " * 100)
+        for i in range(podcasts)
+    )
+    notes = "x" * notes_size
+
+    for start in range(0, episodes, batch_size):
+        Episode.objects.bulk_create(
+            Episode(
+                podcast=db_podcasts[i % podcasts],
+                title=f"Episode {i % 5_000}",
+                notes=notes,
+            )
+            for i in range(start, min(start + batch_size, episodes))
+        )
+
+    return [str(podcast.id) for podcast in db_podcasts]
+
+
+def measure(fetch, runs: int) -> Tuple[float, float]:
+    """Returns the median time in ms and the peak memory in KiB of `fetch`."""
+
+    from db.data import result_cache
+
+    timings = []
+
+    for _ in range(runs):
+        result_cache.clear()
+
+        start = time.perf_counter()
+        asyncio.run(fetch())
+        timings.append(time.perf_counter() - start)
+
+    result_cache.clear()
+
+    tracemalloc.start()
+    asyncio.run(fetch())
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return statistics.median(timings) * 1000, peak / 1024
+
+
+def main(
+    episodes: int = 100_000,
+    podcasts: int = 100,
+    notes_size: int = 10_000,
+    first: int = 50,
+    runs: int = 20,
+):
+    setup_django()
+
+    rich.print(f"Seeding {episodes} episodes with {notes_size} bytes of notes...")
+    podcast_ids = seed(episodes, podcasts, notes_size)
+
+    from db import data
+
+    # the fields of the load test's PodcastEpisodes query
+    fields = ["podcast", "title", "published_at"]
+
+    scenarios = {
+        "latest episodes": lambda fields: data.find_latest_episodes(
+            last=first, fields=fields
+        ),
+        "episodes of a podcast": lambda fields: data.get_episodes_for_podcast(
+            podcast_ids[0], first=first, fields=fields
+        ),
+        "first episodes of podcasts": lambda fields: (
+            data.find_first_episodes_for_podcasts(podcast_ids, first, fields)
+        ),
+    }
+
+    for name, fetch in scenarios.items():
+        for label, selected in (("all columns", None), ("selected", fields)):
+            duration, peak = measure(lambda: fetch(selected), runs)
+
+            rich.print(
+                f"{name:<28} {label:<12} "
+                f"median {duration:8.2f}ms peak memory {peak:10.1f}KiB"
+            )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,55 @@
+"""Measures searching podcasts when most of them match, ordered by title and
+by relevance.
+
+    python -m benchmarks.search --podcasts 20000
+"""
+
+import asyncio
+import statistics
+
+import rich
+import typer
+
+from benchmarks.utils import setup_django, timer
+
+
+def seed(podcasts: int, batch_size: int = 10_000) -> None:
+    from db.models import Podcast
+
+    for start in range(0, podcasts, batch_size):
+        Podcast.objects.bulk_create(
+            Podcast(title=f"Python {i}", description="python " * (i % 7))
+            for i in range(start, min(start + batch_size, podcasts))
+        )
+
+
+def main(podcasts: int = 20_000, runs: int = 10, query: str = "python"):
+    setup_django()
+
+    rich.print(f"Seeding {podcasts} podcasts...")
+    seed(podcasts)
+
+    from db import data
+
+    for by_relevance in (False, True):
+        timings = []
+
+        for _ in range(runs):
+            data.result_cache.clear()
+
+            with timer() as elapsed:
+                asyncio.run(
+                    data.find_podcasts(query, first=10, by_relevance=by_relevance)
+                )
+
+            timings.extend(elapsed)
+
+        rich.print(
+            f"{'by relevance' if by_relevance else 'by title':<14} "
+            f"median {statistics.median(timings) * 1000:8.2f}ms "
+            f"max {max(timings) * 1000:8.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    typer.run(main)
@@ -0,0 +1,43 @@
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+import django
+
+
+def setup_django(database_path: str | None = None) -> str:
+    """Configure Django to use a throwaway SQLite database and migrate it.
+
+    Benchmarks never touch the development database, and sampled SQL
+    queries aren't logged as they would add noise to the output.
+    """
+
+    if database_path is None:
+        database_path = os.path.join(tempfile.mkdtemp(), "benchmark.sqlite3")
+
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "podcast.settings")
+    os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+
+    django.setup()
+
+    logging.getLogger("db.slow_queries").setLevel(logging.WARNING)
+
+    from django.core.management import call_command
+
+    call_command("migrate", verbosity=0)
+
+    return database_path
+
+
+@contextmanager
+def timer() -> Iterator[list[float]]:
+    elapsed: list[float] = []
+    start = time.perf_counter()
+
+    try:
+        yield elapsed
+    finally:
+        elapsed.append(time.perf_counter() - start)
@@ -1,16 +1,31 @@
-import urllib.request
+import asyncio
+import hashlib
+import io
+import json
+import resource
+import sys
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional, cast
+from typing import IO, Dict, List, Optional, Tuple, cast
 
 import podcastparser
 import rich
 import typer
-from rich.progress import track
+from asgiref.sync import sync_to_async
+from rich.progress import Progress, track
 from typing_extensions import Required, TypedDict
 
+from django.conf import settings
+from django.db import transaction
 from django.utils import timezone
 
-from db.models import Episode, Podcast
+from db.models import Episode, Feed, PersistedQuery, Podcast
+from db.signals import invalidate
+
+from .fetch import FeedFetcher, FetchedFeed, FetchOptions
+from .seed import SeedOptions, count_rows, seed as seed_database
+from .stream import READ_SIZE, parse_in_chunks
 
 
 app = typer.Typer()
@@ -56,16 +71,89 @@ class ParsedPodcast(TypedDict, total=False):
     type: str
 
 
-def _import_feed(feed_url: str) -> None:
+def _episode_guid(episode: ParsedEpisode) -> str:
+    return episode.get("guid") or episode["title"]
+
+
+def _adopt_legacy_episodes(db_podcast: Podcast, episodes: List[ParsedEpisode]) -> None:
+    # episodes imported before we stored guids were matched by title, we
+    # give them their guid so they get updated instead of duplicated
+    legacy_episodes = {
+        episode.title: episode
+        for episode in Episode.objects.filter(podcast=db_podcast, guid__isnull=True)
+    }
+
+    if not legacy_episodes:
+        return
+
+    adopted = []
+
+    for episode in episodes:
+        if (legacy_episode := legacy_episodes.pop(episode["title"], None)) is not None:
+            legacy_episode.guid = _episode_guid(episode)
+            adopted.append(legacy_episode)
+
+    Episode.objects.bulk_update(adopted, ["guid"])
+
+
+def _upsert_episodes(
+    db_podcast: Podcast,
+    episodes: List[ParsedEpisode],
+    batch_size: int,
+    show_progress: bool = True,
+) -> None:
     current_timezone = timezone.get_current_timezone()
 
-    podcast = cast(
-        ParsedPodcast, podcastparser.parse(feed_url, urllib.request.urlopen(feed_url))
-    )
-    episodes = podcast.pop("episodes")
+    # the same guid can't be upserted twice in the same statement, when a
+    # feed repeats an episode the last one wins
+    db_episodes = {
+        _episode_guid(episode): Episode(
+            podcast=db_podcast,
+            guid=_episode_guid(episode),
+            title=episode["title"],
+            notes=episode.get("description", ""),
+            published_at=datetime.fromtimestamp(
+                episode["published"], tz=current_timezone
+            ),
+            total_time=episode.get("total_time", 0),
+        )
+        for episode in episodes
+    }
 
-    rich.print(f"Parsed feed: {podcast['title']}")
+    unique_episodes = list(db_episodes.values())
+    batches = [
+        unique_episodes[start : start + batch_size]
+        for start in range(0, len(unique_episodes), batch_size)
+    ]
+
+    if show_progress:
+        batches = track(batches, "Importing episodes")  # type: ignore
 
+    for batch in batches:
+        Episode.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=["podcast", "guid"],
+            update_fields=["title", "notes", "published_at", "total_time"],
+        )
+
+    # bulk_create doesn't send signals
+    if unique_episodes:
+        invalidate("latest_episodes")
+
+
+def _episode_fingerprint(episode: ParsedEpisode) -> str:
+    fields = [
+        episode["title"],
+        episode.get("description", ""),
+        episode["published"],
+        episode.get("total_time", 0),
+    ]
+
+    return hashlib.blake2b(json.dumps(fields).encode(), digest_size=8).hexdigest()
+
+
+def _save_podcast(podcast: ParsedPodcast) -> Podcast:
     db_podcast, _ = Podcast.objects.update_or_create(
         title=podcast["title"],
         defaults={
@@ -76,33 +164,376 @@ def _import_feed(feed_url: str) -> None:
         },
     )
 
-    rich.print(f"Podcast id: {db_podcast.id}")
-    rich.print(f"Found {len(episodes)} episodes")
+    return db_podcast
 
-    for episode in track(episodes, "Importing episodes"):
-        published_at = datetime.fromtimestamp(
-            episode["published"], tz=current_timezone
-        ).isoformat()
 
-        episode, _ = Episode.objects.update_or_create(
-            podcast=db_podcast,
-            title=episode["title"],
-            defaults={
-                "notes": episode.get("description", ""),
-                "published_at": published_at,
-                "total_time": episode.get("total_time", 0),
-            },
+def _import_feed(
+    feed_url: str,
+    content: bytes,
+    batch_size: int = 500,
+    episode_fingerprints: Optional[Dict[str, str]] = None,
+) -> Tuple[Podcast, Dict[str, str]]:
+    """Imports the feed, skipping the episodes whose fingerprint is the same
+    as in `episode_fingerprints`.
+
+    Returns the podcast and the fingerprints of all the episodes in the feed.
+    """
+
+    episode_fingerprints = episode_fingerprints or {}
+
+    podcast = cast(ParsedPodcast, podcastparser.parse(feed_url, io.BytesIO(content)))
+    episodes = podcast.pop("episodes")
+
+    rich.print(f"Parsed feed: {podcast['title']}")
+
+    fingerprints = {
+        _episode_guid(episode): _episode_fingerprint(episode) for episode in episodes
+    }
+    changed_episodes = [
+        episode
+        for episode in episodes
+        if episode_fingerprints.get(_episode_guid(episode))
+        != fingerprints[_episode_guid(episode)]
+    ]
+
+    with transaction.atomic():
+        db_podcast = _save_podcast(podcast)
+
+        rich.print(f"Podcast id: {db_podcast.id}")
+        rich.print(
+            f"Found {len(episodes)} episodes, {len(changed_episodes)} new or changed"
+        )
+
+        _adopt_legacy_episodes(db_podcast, changed_episodes)
+        _upsert_episodes(db_podcast, changed_episodes, batch_size)
+
+    return db_podcast, fingerprints
+
+
+@transaction.atomic
+def _import_feed_stream(
+    feed_url: str,
+    stream: IO[bytes],
+    batch_size: int = 500,
+    episode_fingerprints: Optional[Dict[str, str]] = None,
+) -> Tuple[Podcast, Dict[str, str]]:
+    """Same as `_import_feed`, but parses the feed while reading it and saves
+    the episodes `batch_size` at a time, so only one batch of episodes is in
+    memory at any time."""
+
+    episode_fingerprints = episode_fingerprints or {}
+    fingerprints: Dict[str, str] = {}
+    changed = 0
+    db_podcast: Optional[Podcast] = None
+
+    for data, episodes in parse_in_chunks(feed_url, stream, batch_size):
+        podcast = cast(ParsedPodcast, data)
+
+        # the channel's title comes before its items, we create the podcast
+        # as soon as we get to the first episodes
+        if db_podcast is None:
+            db_podcast = _save_podcast(podcast)
+
+            rich.print(f"Parsed feed: {podcast['title']}")
+            rich.print(f"Podcast id: {db_podcast.id}")
+
+        changed_episodes = []
+
+        for episode in cast(List[ParsedEpisode], episodes):
+            guid = _episode_guid(episode)
+            fingerprints[guid] = _episode_fingerprint(episode)
+
+            if episode_fingerprints.get(guid) != fingerprints[guid]:
+                changed_episodes.append(episode)
+
+        _adopt_legacy_episodes(db_podcast, changed_episodes)
+        _upsert_episodes(db_podcast, changed_episodes, batch_size, False)
+
+        changed += len(changed_episodes)
+
+    assert db_podcast is not None
+
+    # other podcast fields can come after the episodes
+    db_podcast = _save_podcast(podcast)
+
+    rich.print(f"Found {len(fingerprints)} episodes, {changed} new or changed")
+
+    return db_podcast, fingerprints
+
+
+def _conditional_headers(feed_urls: List[str]) -> Dict[str, Dict[str, str]]:
+    headers: Dict[str, Dict[str, str]] = {}
+
+    for feed in Feed.objects.filter(url__in=feed_urls):
+        headers[feed.url] = {}
+
+        if feed.etag:
+            headers[feed.url]["If-None-Match"] = feed.etag
+
+        if feed.last_modified:
+            headers[feed.url]["If-Modified-Since"] = feed.last_modified
+
+    return headers
+
+
+def _hash_stream(stream: IO[bytes]) -> str:
+    content_hash = hashlib.sha256()
+
+    while block := stream.read(READ_SIZE):
+        content_hash.update(block)
+
+    stream.seek(0)
+
+    return content_hash.hexdigest()
+
+
+@transaction.atomic
+def _refresh_feed(
+    fetched_feed: FetchedFeed, batch_size: int = 500, force: bool = False
+) -> bool:
+    """Imports the feed if it changed since the last import (or always when
+    `force` is True), returns whether it was imported."""
+
+    feed, _ = Feed.objects.get_or_create(url=fetched_feed.url)
+    feed.last_fetched_at = timezone.now()
+
+    if fetched_feed.not_modified:
+        feed.save(update_fields=["last_fetched_at"])
+
+        return False
+
+    # feeds fetched with `stream=True` have a body, the others their content
+    body, content = fetched_feed.body, fetched_feed.content
+
+    # some servers don't support conditional requests, or send different
+    # headers for the same content
+    if body is not None:
+        content_hash = _hash_stream(body)
+    else:
+        assert content is not None
+        content_hash = hashlib.sha256(content).hexdigest()
+
+    changed = force or content_hash != feed.content_hash
+    episode_fingerprints = None if force else feed.episode_fingerprints
+
+    if changed and body is not None:
+        feed.podcast, feed.episode_fingerprints = _import_feed_stream(
+            fetched_feed.url, body, batch_size, episode_fingerprints
+        )
+    elif changed and content is not None:
+        feed.podcast, feed.episode_fingerprints = _import_feed(
+            fetched_feed.url, content, batch_size, episode_fingerprints
         )
 
+    if changed:
+        feed.content_hash = content_hash
+
+    feed.etag = fetched_feed.etag
+    feed.last_modified = fetched_feed.last_modified
+    feed.save()
+
+    return changed
+
+
+def _peak_rss() -> int:
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, macOS bytes
+    return peak_rss if sys.platform == "darwin" else peak_rss * 1024
+
+
+@dataclass
+class ImportReport:
+    total: int
+    imported: int = 0
+    # imported feeds that didn't change since the last import
+    unchanged: int = 0
+    failures: List[Tuple[str, str]] = field(default_factory=list)
+    elapsed: float = 0
+    # in bytes, only reported for streaming imports
+    peak_rss: Optional[int] = None
+
+    def print(self) -> None:
+        feeds_per_second = self.imported / self.elapsed if self.elapsed else 0
+
+        rich.print(
+            f"Imported {self.imported}/{self.total} feeds ({self.unchanged} unchanged) "
+            f"in {self.elapsed:.1f}s ({feeds_per_second:.2f} feeds/sec), "
+            f"{len(self.failures)} failed"
+        )
+
+        if self.peak_rss is not None:
+            rich.print(f"Peak memory usage: {self.peak_rss / 1024 / 1024:.1f} MB")
+
+        for feed_url, error in self.failures:
+            rich.print(f"  [red]{feed_url}[/red]: {error}")
+
+
+async def _import_feeds(
+    feed_urls: List[str],
+    options: FetchOptions,
+    batch_size: int = 500,
+    force: bool = False,
+) -> ImportReport:
+    report = ImportReport(total=len(feed_urls))
+    fetcher = FeedFetcher(options)
+    # feeds are downloaded concurrently, but imported one at a time, as
+    # sync_to_async runs all of them in the same thread
+    refresh_feed = sync_to_async(_refresh_feed)
+
+    start = time.perf_counter()
+
+    headers = {} if force else await sync_to_async(_conditional_headers)(feed_urls)
+
+    async for feed in fetcher.fetch_all(feed_urls, headers):
+        progress = f"[{report.imported + len(report.failures) + 1}/{report.total}]"
+
+        if feed.content is None and feed.body is None and not feed.not_modified:
+            rich.print(f"{progress} [red]Failed to fetch {feed.url}[/red]")
+            report.failures.append((feed.url, feed.error or "Unknown error"))
+
+            continue
+
+        rich.print(f"{progress} Fetched {feed.url} ({feed.attempts} attempts)")
+
+        try:
+            changed = await refresh_feed(feed, batch_size, force)
+        except Exception as e:
+            rich.print(f"{progress} [red]Failed to import {feed.url}[/red]")
+            report.failures.append((feed.url, f"{type(e).__name__}: {e}"))
+        else:
+            report.imported += 1
+
+            if not changed:
+                rich.print(f"{progress} {feed.url} didn't change, skipping it")
+                report.unchanged += 1
+        finally:
+            if feed.body is not None:
+                feed.body.close()
+
+    report.elapsed = time.perf_counter() - start
+
+    if options.stream:
+        report.peak_rss = _peak_rss()
+
+    return report
+
+
+@app.command()
+def import_feeds(
+    feed_urls: List[str],
+    concurrency: int = typer.Option(
+        10, help="Maximum number of feeds to fetch at once"
+    ),
+    per_host: int = typer.Option(2, help="Maximum number of feeds to fetch per host"),
+    timeout: float = typer.Option(30, help="Timeout in seconds for each request"),
+    retries: int = typer.Option(3, help="Retries for network and 5xx errors"),
+    backoff: float = typer.Option(0.5, help="Initial delay between retries"),
+    batch_size: int = typer.Option(500, help="Number of episodes saved per query"),
+    force: bool = typer.Option(
+        False, help="Import all the episodes, even if the feeds didn't change"
+    ),
+    stream: bool = typer.Option(
+        False,
+        help="Parse the feeds while reading them, to import very large feeds "
+        "without loading all their episodes in memory",
+    ),
+):
+    options = FetchOptions(
+        concurrency=concurrency,
+        per_host=per_host,
+        timeout=timeout,
+        retries=retries,
+        backoff=backoff,
+        stream=stream,
+    )
+
+    report = asyncio.run(_import_feeds(feed_urls, options, batch_size, force))
+    report.print()
+
+    if report.failures:
+        raise typer.Exit(code=1)
+
+
+@app.command()
+def persist_queries(query_files: List[typer.FileText]):
+    """Adds the queries in the given files to the persisted queries, this is
+    needed for them to run when PERSISTED_QUERIES_ALLOWLIST_ONLY is set."""
+
+    for query_file in query_files:
+        query = query_file.read()
+        query_hash = hashlib.sha256(query.encode()).hexdigest()
+
+        PersistedQuery.objects.update_or_create(
+            hash=query_hash, defaults={"query": query}
+        )
+
+        rich.print(f"{query_file.name}: {query_hash}")
+
 
 @app.command()
-def import_feeds(feed_urls: List[str]):
-    # TODO: this can be async
+def seed(
+    podcasts: int = typer.Option(1_000, help="Number of podcasts to create"),
+    episodes: int = typer.Option(100_000, help="Number of episodes to create"),
+    users: int = typer.Option(1_000, help="Number of users to create"),
+    subscriptions: int = typer.Option(10, help="Podcasts each user subscribes to"),
+    seed: int = typer.Option(
+        0, help="Seed of the random data, the same seed creates the same rows"
+    ),
+    workers: int = typer.Option(
+        1,
+        help="Number of processes creating the rows, "
+        "SQLite only allows one of them to write at a time",
+    ),
+    batch_size: int = typer.Option(5_000, help="Number of rows created per batch"),
+):
+    """Fills the database with random podcasts, episodes, users and
+    subscriptions, to test with production sized tables.
+
+    Running it again with the same seed doesn't create any new rows, all
+    users have "password" as password.
+    """
 
-    for feed_url in feed_urls:
-        rich.print(f"Fetching feed from {feed_url}")
+    if episodes and not podcasts:
+        raise typer.BadParameter("Episodes need at least one podcast")
 
-        _import_feed(feed_url)
+    # in debug mode every query is logged and kept in memory, which takes
+    # longer than running them
+    settings.DEBUG = False
+
+    options = SeedOptions(
+        seed=seed,
+        podcasts=podcasts,
+        episodes=episodes,
+        users=users,
+        subscriptions=subscriptions,
+        batch_size=batch_size,
+    )
+    total = podcasts + episodes + users + users * min(subscriptions, podcasts)
+    rows = 0
+    rows_before = count_rows()
+    start = time.perf_counter()
+
+    with Progress() as progress:
+        task = progress.add_task("Seeding", total=total)
+
+        for created in seed_database(options, workers):
+            rows += created
+            progress.update(task, advance=created)
+
+    elapsed = time.perf_counter() - start
+
+    # bulk_create doesn't send the signals that invalidate cached results
+    invalidate("podcast")
+    invalidate("latest_episodes")
+
+    # rows that already existed were skipped
+    created = count_rows() - rows_before
+
+    rich.print(
+        f"Created {created} rows ({rows} attempted) in {elapsed:.1f}s "
+        f"({rows / elapsed:.0f} rows/sec)"
+    )
 
 
 @app.command()
@@ -0,0 +1,152 @@
+import asyncio
+import http.client
+import random
+import shutil
+import tempfile
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import IO, AsyncIterator, Iterable, Mapping, Optional
+from urllib.parse import urlsplit
+
+
+USER_AGENT = "strawberry-workshop (+https://strawberry-workshop.fly.dev)"
+
+# streamed downloads are kept in memory up to this size, and written to a
+# temporary file after that
+SPOOL_SIZE = 1024 * 1024
+
+
+@dataclass
+class FetchOptions:
+    concurrency: int = 10
+    per_host: int = 2
+    timeout: float = 30
+    retries: int = 3
+    backoff: float = 0.5
+    # write the responses to `FetchedFeed.body` instead of `content`
+    stream: bool = False
+
+
+@dataclass
+class FetchedFeed:
+    url: str
+    content: Optional[bytes] = None
+    # the response, when fetching with `stream=True`
+    body: Optional[IO[bytes]] = None
+    # the server answered 304 to our conditional request
+    not_modified: bool = False
+    etag: str = ""
+    last_modified: str = ""
+    error: Optional[str] = None
+    attempts: int = 0
+
+
+def _download(
+    url: str, timeout: float, headers: Mapping[str, str], stream: bool = False
+) -> FetchedFeed:
+    request = urllib.request.Request(url, headers={"User-Agent": USER_AGENT, **headers})
+
+    try:
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            feed = FetchedFeed(
+                url=url,
+                etag=response.headers.get("ETag", ""),
+                last_modified=response.headers.get("Last-Modified", ""),
+            )
+
+            if stream:
+                feed.body = tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE)
+                shutil.copyfileobj(response, feed.body)
+                feed.body.seek(0)
+            else:
+                feed.content = response.read()
+
+            return feed
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return FetchedFeed(url=url, not_modified=True)
+
+        raise
+
+
+def _is_retryable(error: Exception) -> bool:
+    if isinstance(error, urllib.error.HTTPError):
+        return error.code == 429 or error.code >= 500
+
+    # network errors and timeouts, but not invalid urls
+    return isinstance(error, (OSError, http.client.HTTPException))
+
+
+class FeedFetcher:
+    def __init__(self, options: FetchOptions):
+        self.options = options
+
+        # urllib is blocking, downloads happen in a thread pool that is as
+        # big as the number of concurrent fetches we allow
+        self._executor = ThreadPoolExecutor(max_workers=options.concurrency)
+        self._semaphore = asyncio.Semaphore(options.concurrency)
+        self._host_semaphores: defaultdict[str, asyncio.Semaphore] = defaultdict(
+            lambda: asyncio.Semaphore(options.per_host)
+        )
+
+    async def fetch(
+        self, url: str, headers: Optional[Mapping[str, str]] = None
+    ) -> FetchedFeed:
+        loop = asyncio.get_running_loop()
+        host_semaphore = self._host_semaphores[urlsplit(url).netloc]
+        feed = FetchedFeed(url=url)
+
+        for attempt in range(self.options.retries + 1):
+            # waiting for a busy host must not hold one of the global slots
+            async with host_semaphore, self._semaphore:
+                try:
+                    feed = await loop.run_in_executor(
+                        self._executor,
+                        _download,
+                        url,
+                        self.options.timeout,
+                        headers or {},
+                        self.options.stream,
+                    )
+                    feed.attempts = attempt + 1
+
+                    return feed
+                except (OSError, ValueError, http.client.HTTPException) as e:
+                    feed.error = f"{type(e).__name__}: {e}"
+                    feed.attempts = attempt + 1
+
+                    if not _is_retryable(e):
+                        return feed
+
+            if attempt < self.options.retries:
+                # exponential backoff with jitter, so retries to the same host
+                # don't all happen at the same time
+                delay = self.options.backoff * 2**attempt
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+
+        return feed
+
+    async def fetch_all(
+        self,
+        urls: Iterable[str],
+        headers: Optional[Mapping[str, Mapping[str, str]]] = None,
+    ) -> AsyncIterator[FetchedFeed]:
+        """Fetches all the urls concurrently, yielding them as they complete.
+
+        `headers` are extra headers to send for each url, for example to make
+        conditional requests."""
+
+        headers = headers or {}
+        tasks = [asyncio.create_task(self.fetch(url, headers.get(url))) for url in urls]
+
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,240 @@
+import functools
+import multiprocessing
+import random
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Iterator, List, Optional, Tuple
+
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+
+from db.models import Episode, Podcast
+from users.models import User
+
+
+WORDS = (
+    "python django rust web data science machine learning cloud devops "
+    "security open source testing design product startup career music "
+    "history science news culture comedy sports health business money "
+    "stories games books film tech talk weekly daily show hour podcast"
+).split()
+
+START_DATE = datetime(2010, 1, 1, tzinfo=timezone.utc)
+DAYS = 365 * 14
+
+
+@dataclass
+class SeedOptions:
+    seed: int
+    podcasts: int
+    episodes: int
+    users: int
+    # per user
+    subscriptions: int
+    batch_size: int
+
+
+# ("episodes" or "users", index of the batch)
+Task = Tuple[str, int]
+
+
+def _random(options: SeedOptions, kind: str, number: int) -> random.Random:
+    # every row has its own generator, so the data doesn't depend on the
+    # batch size, on the number of workers or on the order of the batches
+    return random.Random(f"{options.seed}:{kind}:{number}")
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choices(WORDS, k=count))
+
+
+@functools.lru_cache
+def _texts(seed: int) -> List[str]:
+    # generating long texts for every row would be slower than inserting
+    # them, so episodes pick their notes from these
+    rng = random.Random(f"{seed}:texts")
+
+    return [_words(rng, rng.randint(20, 200)).capitalize() for _ in range(1_000)]
+
+
+def _popular_index(rng: random.Random, size: int) -> int:
+    # a few podcasts have most of the episodes and subscribers
+    return int(size * rng.random() ** 3)
+
+
+def podcast_ids(options: SeedOptions) -> List[uuid.UUID]:
+    rng = _random(options, "podcast-ids", 0)
+
+    return [_uuid(rng) for _ in range(options.podcasts)]
+
+
+def _podcast(options: SeedOptions, id: uuid.UUID, number: int) -> Podcast:
+    rng = _random(options, "podcast", number)
+
+    return Podcast(
+        id=id,
+        title=f"{_words(rng, 3).title()} {number}",
+        subtitle=_words(rng, 6).capitalize(),
+        hosted_by=f"Host {number}",
+        description=_words(rng, 40).capitalize(),
+        website=f"https://podcast-{number}.example.com",
+    )
+
+
+def create_podcasts(options: SeedOptions, ids: List[uuid.UUID]) -> int:
+    podcasts = (_podcast(options, id, number) for number, id in enumerate(ids))
+
+    # bulk_create doesn't send signals
+    return len(
+        Podcast.objects.bulk_create(
+            podcasts, batch_size=options.batch_size, ignore_conflicts=True
+        )
+    )
+
+
+def tasks(options: SeedOptions) -> List[Task]:
+    def batches(total: int) -> range:
+        return range(-(-total // options.batch_size))
+
+    return [
+        *(("episodes", index) for index in batches(options.episodes)),
+        *(("users", index) for index in batches(options.users)),
+    ]
+
+
+def _episode(options: SeedOptions, ids: List[uuid.UUID], number: int) -> Episode:
+    rng = _random(options, "episode", number)
+
+    return Episode(
+        id=_uuid(rng),
+        podcast_id=ids[_popular_index(rng, len(ids))],
+        guid=f"seed-{options.seed}-{number}",
+        title=f"{_words(rng, 5).capitalize()} ({number})",
+        notes=rng.choice(_texts(options.seed)),
+        total_time=rng.randint(60, 3 * 60 * 60),
+        published_at=START_DATE + timedelta(minutes=rng.randrange(DAYS * 24 * 60)),
+    )
+
+
+def create_episodes(options: SeedOptions, ids: List[uuid.UUID], index: int) -> int:
+    start = index * options.batch_size
+    end = min(start + options.batch_size, options.episodes)
+
+    episodes = [_episode(options, ids, number) for number in range(start, end)]
+
+    Episode.objects.bulk_create(episodes, ignore_conflicts=True)
+
+    return len(episodes)
+
+
+def create_users(
+    options: SeedOptions, ids: List[uuid.UUID], index: int, password: str
+) -> int:
+    start = index * options.batch_size
+    end = min(start + options.batch_size, options.users)
+    users = {}
+    subscriptions = {}
+
+    for number in range(start, end):
+        rng = _random(options, "user", number)
+        email = f"seed-{options.seed}-user-{number}@example.com"
+
+        users[email] = User(email=email, name=_words(rng, 2).title(), password=password)
+        subscriptions[email] = [
+            ids[position]
+            for position in rng.sample(
+                range(len(ids)), min(options.subscriptions, len(ids))
+            )
+        ]
+
+    with transaction.atomic():
+        User.objects.bulk_create(users.values(), ignore_conflicts=True)
+
+        # ids are not returned when ignoring conflicts
+        user_ids = User.objects.filter(email__in=users).values_list("email", "id")
+        rows = [
+            Podcast.subscribers.through(user_id=user_id, podcast_id=podcast_id)
+            for email, user_id in user_ids
+            for podcast_id in subscriptions[email]
+        ]
+
+        Podcast.subscribers.through.objects.bulk_create(rows, ignore_conflicts=True)
+
+    return len(users) + len(rows)
+
+
+# set in each worker by `_init_worker`
+_worker_options: Optional[SeedOptions] = None
+_worker_podcast_ids: List[uuid.UUID] = []
+_worker_password = ""
+
+
+def _init_worker(options: SeedOptions, ids: List[uuid.UUID], password: str) -> None:
+    global _worker_options, _worker_podcast_ids, _worker_password
+
+    connection = connections["default"]
+
+    # SQLite only allows one writer at a time, the others wait for it
+    if connection.vendor == "sqlite":
+        connection.settings_dict["OPTIONS"]["timeout"] = 600
+
+    _worker_options = options
+    _worker_podcast_ids = ids
+    _worker_password = password
+
+
+def run_task(task: Task) -> int:
+    assert _worker_options is not None
+
+    kind, index = task
+
+    if kind == "episodes":
+        return create_episodes(_worker_options, _worker_podcast_ids, index)
+
+    return create_users(_worker_options, _worker_podcast_ids, index, _worker_password)
+
+
+def count_rows() -> int:
+    """Returns the number of rows in the tables `seed` fills."""
+
+    return sum(
+        model.objects.count()
+        for model in (Podcast, Episode, User, Podcast.subscribers.through)
+    )
+
+
+def seed(options: SeedOptions, workers: int = 1) -> Iterator[int]:
+    """Creates the podcasts, then the episodes, users and subscriptions in
+    batches, yielding the number of rows each batch tried to create (rows
+    that already exist are skipped, see `count_rows`)."""
+
+    ids = podcast_ids(options)
+
+    yield create_podcasts(options, ids)
+
+    # all the users have the same password, hashing it is slow
+    password = make_password("password")
+    all_tasks = tasks(options)
+
+    if workers == 1:
+        _init_worker(options, ids, password)
+
+        yield from map(run_task, all_tasks)
+
+        return
+
+    # forked processes can't share the connections of the parent
+    connections.close_all()
+
+    # spawned processes would run the CLI again when importing it
+    context = multiprocessing.get_context("fork")
+
+    with context.Pool(
+        workers, initializer=_init_worker, initargs=(options, ids, password)
+    ) as pool:
+        yield from pool.imap_unordered(run_task, all_tasks)
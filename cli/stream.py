@@ -0,0 +1,80 @@
+from typing import IO, Any, Dict, Iterator, List, Optional, Tuple
+from xml import sax
+from xml.sax.xmlreader import Locator
+
+import podcastparser
+
+
+# how much of the feed we read (and give to the parser) at a time
+READ_SIZE = 64 * 1024
+
+
+class _ErrorLocator(Locator):
+    """The position of a parse error, `podcastparser.FeedParseError` needs a
+    locator to be created."""
+
+    def __init__(self, error: sax.SAXParseException):
+        self.error = error
+
+    def getColumnNumber(self) -> int:
+        return self.error.getColumnNumber()
+
+    def getLineNumber(self) -> int:
+        return self.error.getLineNumber()
+
+    def getPublicId(self) -> Optional[str]:
+        return self.error.getPublicId()
+
+    def getSystemId(self) -> Optional[str]:
+        return self.error.getSystemId()
+
+
+class StreamingPodcastHandler(podcastparser.PodcastHandler):
+    """A podcastparser handler that hands over the episodes as soon as they
+    are parsed, instead of keeping all of them until the end of the feed."""
+
+    def __init__(self, url: str):
+        super().__init__(url, max_episodes=0)
+
+        self.parsed_episodes: List[Dict[str, Any]] = []
+
+    def validate_episode(self) -> None:
+        super().validate_episode()
+
+        # `self.episodes` is also referenced by `self.data`, so we empty it
+        # instead of replacing it
+        self.parsed_episodes.extend(self.episodes)
+        self.episodes.clear()
+
+
+def parse_in_chunks(
+    url: str, stream: IO[bytes], chunk_size: int
+) -> Iterator[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+    """Parses the feed in `stream` incrementally, yielding the podcast (as
+    parsed so far) and the next `chunk_size` episodes.
+
+    Only the current chunk of episodes is kept in memory, the podcast data
+    yielded with the last chunk is complete. The last chunk can be empty.
+    """
+
+    handler = StreamingPodcastHandler(url)
+    parser = sax.make_parser()
+    parser.setContentHandler(handler)
+
+    try:
+        while block := stream.read(READ_SIZE):
+            parser.feed(block)  # type: ignore
+
+            while len(handler.parsed_episodes) >= chunk_size:
+                chunk = handler.parsed_episodes[:chunk_size]
+                del handler.parsed_episodes[:chunk_size]
+
+                yield handler.data, chunk
+
+        parser.close()  # type: ignore
+    except sax.SAXParseException as e:
+        raise podcastparser.FeedParseError(
+            e.getMessage(), e.getException(), _ErrorLocator(e)
+        ) from e
+
+    yield handler.data, handler.parsed_episodes
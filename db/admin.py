@@ -1,7 +1,9 @@
 from django.contrib import admin
 
-from .models import Episode, Podcast
+from .models import Episode, Feed, PersistedQuery, Podcast
 
 
 admin.site.register(Podcast)
 admin.site.register(Episode)
+admin.site.register(Feed)
+admin.site.register(PersistedQuery)
@@ -3,3 +3,9 @@ from django.apps import AppConfig
 
 class DbConfig(AppConfig):
     name = "db"
+
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .slow_queries import install
+
+        install()
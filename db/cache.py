@@ -0,0 +1,329 @@
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Optional,
+    Protocol,
+    TypeVar,
+)
+
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.db.models import F
+
+from .models import CacheGeneration
+
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+# returned by `LRUCache.get` for missing keys, when None can be a value
+MISSING: Any = object()
+
+
+@dataclass
+class _Entry(Generic[V]):
+    value: V
+    size: int
+    expires_at: Optional[float]
+
+
+class LRUCache(Generic[K, V]):
+    """A thread safe dict that keeps at most `max_size` items, dropping the
+    least recently used ones first.
+
+    When `max_bytes` is set the size of the values (as pickled) is also
+    bounded, and when `ttl` is set values expire after `ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.bytes = 0
+
+        self._items: OrderedDict[K, _Entry[V]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: K, default: Any = None) -> Optional[V]:
+        with self._lock:
+            entry = self._items.get(key)
+
+            if entry is not None and self._is_expired(entry):
+                self._remove(key)
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+
+                return default
+
+            self._items.move_to_end(key)
+            self.hits += 1
+
+            return entry.value
+
+    def set(self, key: K, value: V) -> None:
+        size = len(pickle.dumps(value)) if self.max_bytes is not None else 0
+
+        # a value that doesn't fit would evict everything else
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            if key in self._items:
+                self._remove(key)
+
+            self._items[key] = _Entry(value=value, size=size, expires_at=expires_at)
+            self.bytes += size
+
+            while len(self._items) > self.max_size or (
+                self.max_bytes is not None and self.bytes > self.max_bytes
+            ):
+                self._remove(next(iter(self._items)))
+
+    def delete(self, key: K) -> None:
+        with self._lock:
+            if key in self._items:
+                self._remove(key)
+
+    def delete_where(self, predicate: Callable[[K], bool]) -> None:
+        with self._lock:
+            for key in [key for key in self._items if predicate(key)]:
+                self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.hits = 0
+            self.misses = 0
+            self.bytes = 0
+
+    def _remove(self, key: K) -> None:
+        self.bytes -= self._items.pop(key).size
+
+    def _is_expired(self, entry: _Entry[V]) -> bool:
+        return entry.expires_at is not None and entry.expires_at <= time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._items
+
+
+class Generations(Protocol):
+    """Generations of the result cache namespaces, shared by all the
+    processes, incremented on every invalidation."""
+
+    async def aget(self, namespace: str) -> int:
+        ...
+
+    def incr(self, namespace: str) -> None:
+        ...
+
+
+class CacheGenerations:
+    """Stores the generations in one of the `CACHES`."""
+
+    def __init__(self, backend: str):
+        self.backend = backend
+
+    async def aget(self, namespace: str) -> int:
+        return await caches[self.backend].aget(f"results:{namespace}:generation", 0)
+
+    def incr(self, namespace: str) -> None:
+        cache = caches[self.backend]
+        key = f"results:{namespace}:generation"
+
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, None)
+
+
+class DatabaseGenerations:
+    """Stores the generations in the database, for when there is no cache
+    shared by the processes."""
+
+    async def aget(self, namespace: str) -> int:
+        # replicas could still have the previous generation
+        generation = (
+            await CacheGeneration.objects.using(DEFAULT_DB_ALIAS)
+            .filter(namespace=namespace)
+            .values_list("generation", flat=True)
+            .afirst()
+        )
+
+        return generation or 0
+
+    def incr(self, namespace: str) -> None:
+        generations = CacheGeneration.objects.filter(namespace=namespace)
+
+        if not generations.update(generation=F("generation") + 1):
+            CacheGeneration.objects.get_or_create(namespace=namespace)
+            generations.update(generation=F("generation") + 1)
+
+
+class ResultCache:
+    """Caches the results of functions in `db.data`, by namespace (usually
+    the name of the function) and arguments.
+
+    Results are kept in a LRU cache in each process and, when `backend` is
+    the name of one of the `CACHES`, also in that cache, so processes can
+    share them.
+
+    Results need to be invalidated when the data they depend on changes,
+    see `db.signals`. Invalidations increment the generation of the
+    namespace in `generations` (by default in `backend`, when set), and
+    results cached under an older generation are not used, so the other
+    processes (like `import-feeds`) can invalidate the results of this one.
+    Generations are by namespace, invalidating a single result makes the
+    other processes fetch all the results of its namespace again.
+
+    When reading from replicas, results fetched less than `replication_lag`
+    seconds after their namespace was invalidated are not cached, as the
+    replicas could still return the old data.
+    """
+
+    def __init__(
+        self,
+        max_size: int,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+        backend: Optional[str] = None,
+        replication_lag: float = 0.0,
+        generations: Optional[Generations] = None,
+    ):
+        self.local: LRUCache[tuple, Any] = LRUCache(max_size, max_bytes, ttl)
+        self.ttl = ttl
+        self.backend = backend
+        self.replication_lag = replication_lag
+        self.generations = generations
+
+        if generations is None and backend is not None:
+            self.generations = CacheGenerations(backend)
+
+        self.hits = 0
+        self.misses = 0
+
+        # incremented on every invalidation, results fetched while their
+        # namespace was invalidated could be stale and are not cached
+        self._generations: Dict[str, int] = {}
+        # the last generation read from `generations`, by namespace
+        self._shared_generations: Dict[str, int] = {}
+        # when the replicas are expected to have caught up with the last
+        # invalidation of each namespace
+        self._replicated_at: Dict[str, float] = {}
+
+    async def get_or_set(
+        self, namespace: str, key: Hashable, fetch: Callable[[], Awaitable[V]]
+    ) -> V:
+        shared_generation = await self._shared_generation(namespace)
+        # entries are (generation, value) tuples, so they are never None
+        entry = self.local.get((namespace, key))
+
+        if entry is not None:
+            entry_generation, value = entry
+
+            if entry_generation == shared_generation:
+                self.hits += 1
+
+                return value
+
+            # invalidated by another process
+            self.local.delete((namespace, key))
+
+        generation = self._generations.get(namespace, 0)
+        replicated = time.monotonic() >= self._replicated_at.get(namespace, 0.0)
+
+        if self.backend is not None:
+            # results in the shared cache are stored by generation, starting
+            # a new one invalidates all of them
+            shared_key = f"results:{namespace}:{shared_generation}:{key!r}"
+            value = await caches[self.backend].aget(shared_key, MISSING)
+
+            if value is not MISSING:
+                self.hits += 1
+            else:
+                self.misses += 1
+                value = await fetch()
+
+                if replicated:
+                    await caches[self.backend].aset(shared_key, value, self.ttl)
+        else:
+            self.misses += 1
+            value = await fetch()
+
+        if replicated and self._generations.get(namespace, 0) == generation:
+            self.local.set((namespace, key), (shared_generation, value))
+
+        return value
+
+    def invalidate(self, namespace: str, key: Hashable = MISSING) -> None:
+        """Invalidates the result for `key`, or all the results in
+        `namespace` when no key is passed."""
+
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+        if self.replication_lag:
+            self._replicated_at[namespace] = time.monotonic() + self.replication_lag
+
+        if key is MISSING:
+            self.local.delete_where(lambda local_key: local_key[0] == namespace)
+        else:
+            self.local.delete((namespace, key))
+
+        if self.generations is not None:
+            self.generations.incr(namespace)
+
+    def clear(self) -> None:
+        self.local.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": len(self.local),
+            "bytes": self.local.bytes,
+        }
+
+    async def _shared_generation(self, namespace: str) -> int:
+        if self.generations is None:
+            return 0
+
+        generation = await self.generations.aget(namespace)
+        previous = self._shared_generations.get(namespace, generation)
+        self._shared_generations[namespace] = generation
+
+        # invalidated by another process, which the replicas could still be
+        # catching up with
+        if generation != previous and self.replication_lag:
+            self._replicated_at[namespace] = max(
+                self._replicated_at.get(namespace, 0.0),
+                time.monotonic() + self.replication_lag,
+            )
+
+        return generation
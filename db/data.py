@@ -1,95 +1,280 @@
-from typing import List, Optional
+import uuid
+from typing import Collection, Dict, Iterable, List, Optional, Set, TypeVar
 
 from asgiref.sync import sync_to_async
 
+from django.conf import settings
 from django.core.paginator import Page, Paginator
-
-from db.pagination import PaginatedData, paginate
+from django.db import connections, router
+from django.db.models import Model, QuerySet, Value
+from django.db.models.signals import m2m_changed
+
+from db.cache import DatabaseGenerations, ResultCache
+from db.pagination import PaginatedData, apaginate, apaginate_partitions
+from db.search import get_search_backend
+from db.thread_hops import record_thread_hops
 from users.models import User
 
 from . import models
 
 
+# results of the functions below that are requested the most, invalidated
+# by `db.signals` when podcasts and episodes change, in this process or in
+# others (the generations are in the database when there's no shared cache)
+result_cache = ResultCache(
+    max_size=settings.RESULT_CACHE_SIZE,
+    max_bytes=settings.RESULT_CACHE_MAX_BYTES,
+    ttl=settings.RESULT_CACHE_TTL,
+    backend=settings.RESULT_CACHE_BACKEND,
+    replication_lag=settings.DATABASE_REPLICA_LAG if settings.DATABASE_REPLICAS else 0,
+    generations=None if settings.RESULT_CACHE_BACKEND else DatabaseGenerations(),
+)
+
+
+# the indexes in db/models.py match these orderings, see the
+# check_query_plans command
+PODCASTS_ORDERING = ("title", "-id")
+EPISODES_ORDERING = ("title", "-id")
+LATEST_EPISODES_ORDERING = ("-published_at",)
+
+
+# the model fields to load, or None to load all of them
+Fields = Optional[Collection[str]]
+
+M = TypeVar("M", bound=Model)
+
+
 class AlreadySubscribedToPodcastError(Exception):
     pass
 
 
+def _project(
+    queryset: QuerySet[M], fields: Fields, ordering: Iterable[str] = ()
+) -> QuerySet[M]:
+    if fields is None:
+        return queryset
+
+    # the ordering fields are needed to build the cursors, the primary key is
+    # always loaded
+    names = {field.name for field in queryset.model._meta.concrete_fields}
+    columns = {*fields, *(item.lstrip("-") for item in ordering)} & names
+
+    return queryset.only(*sorted(columns))
+
+
+@record_thread_hops
 async def find_podcasts_by_ids(ids: List[str]) -> List[models.Podcast]:
     podcasts = models.Podcast.objects.filter(id__in=ids).all()
 
-    return await sync_to_async(list)(podcasts)
+    return [podcast async for podcast in podcasts]
+
 
+@record_thread_hops
+async def find_podcast_by_id(id: str) -> Optional[models.Podcast]:
+    # the same id can be written in different ways (uppercase, without
+    # dashes), they are all cached under the one signals invalidate
+    try:
+        id = str(uuid.UUID(id))
+    except ValueError:
+        return None
 
-async def find_podcast_by_id(id: str) -> models.Podcast:
     podcast = models.Podcast.objects.filter(id=id)
 
-    return await sync_to_async(podcast.first)()
+    return await result_cache.get_or_set("podcast", id, podcast.afirst)
 
 
+@record_thread_hops
 async def subscribe_to_podcast(user: User, podcast: models.Podcast) -> None:
-    def _subscribe_to_podcast():
-        if podcast.subscribers.contains(user):
-            raise AlreadySubscribedToPodcastError()
+    if not await subscribe_to_podcasts(user, [str(podcast.id)]):
+        raise AlreadySubscribedToPodcastError()
+
+
+def _subscribe_to_podcasts(user: User, podcast_ids: Iterable[str]) -> Set[str]:
+    through = models.Podcast.subscribers.through
+    connection = connections[router.db_for_write(through)]
+    quote_name = connection.ops.quote_name
+
+    podcasts = (
+        models.Podcast.objects.using(connection.alias)
+        .filter(id__in=podcast_ids)
+        .annotate(subscriber_id=Value(user.pk))
+        .values_list("id", "subscriber_id")
+    )
+    select, params = podcasts.query.get_compiler(connection=connection).as_sql()
+    podcast_column = quote_name(through._meta.get_field("podcast").column)
+    user_column = quote_name(through._meta.get_field("user").column)
+
+    # selecting the podcasts skips the ones that don't exist, and the unique
+    # (podcast, user) constraint skips existing subscriptions, even when two
+    # requests subscribe at the same time. RETURNING needs SQLite 3.35
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {quote_name(through._meta.db_table)} "
+            f"({podcast_column}, {user_column}) {select} "
+            f"ON CONFLICT DO NOTHING RETURNING {podcast_column}",
+            params,
+        )
+
+        subscribed = {
+            models.Podcast._meta.pk.to_python(podcast_id)
+            for (podcast_id,) in cursor.fetchall()
+        }
+
+    # what `user.subscribed_podcasts.add` would send, so the receivers in
+    # db/signals.py see the new subscriptions
+    m2m_changed.send(
+        sender=through,
+        instance=user,
+        action="post_add",
+        reverse=True,
+        model=models.Podcast,
+        pk_set=subscribed,
+        using=connection.alias,
+    )
+
+    return {str(podcast_id) for podcast_id in subscribed}
+
+
+@record_thread_hops
+async def subscribe_to_podcasts(user: User, podcast_ids: List[str]) -> Set[str]:
+    """Subscribes the user to the podcasts with a single statement, and
+    returns the ids of the podcasts the user wasn't subscribed to. Podcasts
+    that don't exist are skipped."""
 
-        podcast.subscribers.add(user)
+    if not podcast_ids:
+        return set()
 
-    await sync_to_async(_subscribe_to_podcast)()
+    return await sync_to_async(_subscribe_to_podcasts)(user, podcast_ids)
 
 
+@record_thread_hops
+async def find_subscribed_podcast_ids(user: User, podcast_ids: List[str]) -> Set[str]:
+    """Returns which of the podcasts the user is subscribed to."""
+
+    subscriptions = models.Podcast.subscribers.through.objects.filter(
+        podcast_id__in=podcast_ids, user_id=user.pk
+    ).values_list("podcast_id", flat=True)
+
+    return {str(podcast_id) async for podcast_id in subscriptions}
+
+
+@record_thread_hops
 async def find_podcasts(
-    query: Optional[str] = None, first: int = 10, after: Optional[str] = None
+    query: Optional[str] = None,
+    first: int = 10,
+    after: Optional[str] = None,
+    by_relevance: bool = False,
+    fields: Fields = None,
 ) -> PaginatedData[models.Podcast]:
-    def _find():
-        podcasts = models.Podcast.objects.all()
+    podcasts = models.Podcast.objects.all()
+    ordering: tuple[str, ...] = PODCASTS_ORDERING
 
-        if query:
-            podcasts = podcasts.filter(title__icontains=query)
+    if query:
+        podcasts = get_search_backend().search(podcasts, query)
 
-        return paginate(
-            podcasts,
-            ordering=("title", "-id"),
-            first=first,
-            after=after,
-        )
+        if by_relevance:
+            ordering = ("-rank", *ordering)
 
-    return await sync_to_async(_find)()
+    return await apaginate(
+        _project(podcasts, fields, ordering),
+        ordering=ordering,
+        first=first,
+        after=after,
+    )
 
 
-async def find_latest_episodes(last: int = 5) -> List[models.Episode]:
-    def _find():
-        return models.Episode.objects.order_by("-published_at").all()[:last]
+@record_thread_hops
+async def find_latest_episodes(
+    last: int = 5, fields: Fields = None
+) -> List[models.Episode]:
+    episodes = _project(
+        models.Episode.objects.order_by(*LATEST_EPISODES_ORDERING),
+        fields,
+        LATEST_EPISODES_ORDERING,
+    )[:last]
 
-    return await sync_to_async(list)(_find())
+    async def fetch() -> List[models.Episode]:
+        return [episode async for episode in episodes]
 
+    # results with different fields are cached separately
+    key = last if fields is None else f"{last}:{','.join(sorted(fields))}"
 
+    return await result_cache.get_or_set("latest_episodes", key, fetch)
+
+
+@record_thread_hops
 async def get_episodes_for_podcast(
-    podcast_id: str, first: int = 10, after: Optional[str] = None
+    podcast_id: str,
+    first: int = 10,
+    after: Optional[str] = None,
+    fields: Fields = None,
 ) -> PaginatedData[models.Episode]:
-    def _find():
-        episodes = models.Episode.objects.filter(podcast_id=podcast_id)
-
-        return paginate(
-            episodes,
-            ordering=("title", "-id"),
-            first=first,
-            after=after,
-        )
+    episodes = models.Episode.objects.filter(podcast_id=podcast_id)
 
-    return await sync_to_async(_find)()
+    return await apaginate(
+        _project(episodes, fields, EPISODES_ORDERING),
+        ordering=EPISODES_ORDERING,
+        first=first,
+        after=after,
+    )
 
 
+@record_thread_hops
 async def paginate_podcast(page: int = 1, per_page: int = 10) -> Page[models.Podcast]:
-    def _paginate():
-        p = Paginator(models.Podcast.objects.all(), per_page)
+    podcasts = models.Podcast.objects.all()
+    p = Paginator(podcasts, per_page)
+
+    # `Paginator.count` is a cached property, by setting it upfront the
+    # paginator won't need to run a sync query when validating the page number
+    p.count = await podcasts.acount()
+
+    paginated_page = p.page(page)
+    paginated_page.object_list = [
+        podcast async for podcast in paginated_page.object_list
+    ]
+
+    return paginated_page
+
+
+@record_thread_hops
+async def find_first_episodes_for_podcasts(
+    podcast_ids: List[str], first: int = 10, fields: Fields = None
+) -> Dict[str, PaginatedData[models.Episode]]:
+    # the episodes are grouped by podcast
+    if fields is not None:
+        fields = {*fields, "podcast"}
+
+    return await apaginate_partitions(
+        _project(models.Episode.objects.all(), fields, EPISODES_ORDERING),
+        partition_by="podcast_id",
+        keys=podcast_ids,
+        ordering=EPISODES_ORDERING,
+        first=first,
+    )
+
+
+@record_thread_hops
+async def find_persisted_query(hash: str) -> Optional[str]:
+    persisted_query = await models.PersistedQuery.objects.filter(hash=hash).afirst()
+
+    return persisted_query.query if persisted_query else None
+
 
-        paginated_page = p.page(page)
+@record_thread_hops
+async def save_persisted_query(
+    hash: str, query: str, max_size: Optional[int] = None
+) -> bool:
+    """Returns False when the query wasn't saved because there are already
+    `max_size` persisted queries."""
 
-        # TODO: This is a hack to make the paginator work with async
-        # we are forcing the paginator to load the data from the database
-        # and then we are converting it to a list
-        # we do this here because we wrap the this function in sync_to_async
-        paginated_page.object_list = list(paginated_page.object_list)
+    if (
+        max_size is not None
+        and await models.PersistedQuery.objects.acount() >= max_size
+    ):
+        return False
 
-        return paginated_page
+    await models.PersistedQuery.objects.aget_or_create(
+        hash=hash, defaults={"query": query}
+    )
 
-    return await sync_to_async(_paginate)()
+    return True
@@ -0,0 +1,181 @@
+import json
+import re
+import uuid
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.db.models import QuerySet
+
+from db import models
+from db.data import EPISODES_ORDERING, LATEST_EPISODES_ORDERING, PODCASTS_ORDERING
+from db.pagination import encode_cursor, page_queryset, partitions_queryset
+
+
+@dataclass
+class QueryShape:
+    name: str
+    queryset: QuerySet
+
+
+def get_query_shapes() -> List[QueryShape]:
+    """The queries run by the functions in db/data.py, with placeholder
+    values. Searching podcasts isn't here, the matching podcasts are sorted
+    after being found in the search index, and neither is `paginate_podcast`,
+    which reads podcasts in no particular order."""
+
+    podcast_id = uuid.uuid4()
+    podcasts = models.Podcast.objects.all()
+    episodes = models.Episode.objects.filter(podcast_id=podcast_id)
+    cursor = encode_cursor(["title", uuid.uuid4()])
+
+    return [
+        QueryShape("find_podcast_by_id", podcasts.filter(id=podcast_id)[:1]),
+        QueryShape("find_podcasts_by_ids", podcasts.filter(id__in=[podcast_id])),
+        QueryShape(
+            "find_subscribed_podcast_ids",
+            models.Podcast.subscribers.through.objects.filter(
+                podcast_id__in=[str(podcast_id), str(uuid.uuid4())], user_id=1
+            ).values_list("podcast_id", flat=True),
+        ),
+        QueryShape("find_podcasts", page_queryset(podcasts, PODCASTS_ORDERING)),
+        QueryShape(
+            "find_podcasts (after)",
+            page_queryset(podcasts, PODCASTS_ORDERING, after=cursor),
+        ),
+        QueryShape(
+            "find_podcasts (before)",
+            page_queryset(podcasts, PODCASTS_ORDERING, last=10, before=cursor),
+        ),
+        QueryShape(
+            "find_latest_episodes",
+            models.Episode.objects.order_by(*LATEST_EPISODES_ORDERING)[:5],
+        ),
+        QueryShape(
+            "get_episodes_for_podcast", page_queryset(episodes, EPISODES_ORDERING)
+        ),
+        QueryShape(
+            "get_episodes_for_podcast (after)",
+            page_queryset(episodes, EPISODES_ORDERING, after=cursor),
+        ),
+        QueryShape(
+            "find_first_episodes_for_podcasts",
+            partitions_queryset(
+                models.Episode.objects.all(),
+                "podcast_id",
+                [str(podcast_id), str(uuid.uuid4())],
+                EPISODES_ORDERING,
+            ),
+        ),
+    ]
+
+
+def _sqlite_plan(connection: BaseDatabaseWrapper, sql: str, params: Any) -> List[str]:
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+
+        return [detail for *_, detail in cursor.fetchall()]
+
+
+def _sqlite_problems(connection: BaseDatabaseWrapper, plan: List[str]) -> List[str]:
+    tables = set(connection.introspection.table_names())
+    problems = []
+
+    for detail in plan:
+        # scanning an index is fine, rows come out in the order we need and
+        # the scan stops at the LIMIT
+        scan = re.match(r"SCAN (\S+)$", detail)
+
+        if scan and scan.group(1) in tables:
+            problems.append(f"full scan: {detail}")
+
+        if "TEMP B-TREE" in detail:
+            problems.append(f"sort: {detail}")
+
+    return problems
+
+
+def _postgresql_nodes(node: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    yield node
+
+    for child in node.get("Plans", []):
+        yield from _postgresql_nodes(child)
+
+
+def _postgresql_plan(
+    connection: BaseDatabaseWrapper, sql: str, params: Any
+) -> List[Dict[str, Any]]:
+    with transaction.atomic(using=connection.alias), connection.cursor() as cursor:
+        # tables are small in development, and sequential scans and sorts
+        # would be cheaper, we want to know if they can be avoided at all
+        cursor.execute("SET LOCAL enable_seqscan = off")
+        cursor.execute("SET LOCAL enable_sort = off")
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+
+        (plan,) = cursor.fetchone()
+
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+
+    return list(_postgresql_nodes(plan[0]["Plan"]))
+
+
+def _postgresql_problems(plan: List[Dict[str, Any]]) -> List[str]:
+    problems = []
+
+    for node in plan:
+        if node["Node Type"] == "Seq Scan":
+            problems.append(f"full scan: Seq Scan on {node['Relation Name']}")
+
+        if node["Node Type"] == "Sort":
+            problems.append(f"sort: Sort on {', '.join(node['Sort Key'])}")
+
+    return problems
+
+
+def check_query_plan(connection: BaseDatabaseWrapper, queryset: QuerySet) -> List[str]:
+    """Returns the full table scans and sorts in the plan of the query."""
+
+    sql, params = queryset.query.sql_with_params()
+
+    if connection.vendor == "sqlite":
+        return _sqlite_problems(connection, _sqlite_plan(connection, sql, params))
+
+    if connection.vendor == "postgresql":
+        return _postgresql_problems(_postgresql_plan(connection, sql, params))
+
+    raise CommandError(f"Can't check query plans on {connection.vendor}")
+
+
+class Command(BaseCommand):
+    help = (
+        "Checks that the queries in db/data.py use indexes, failing if any of "
+        "them scans a whole table or sorts its rows"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, database: str, **options):
+        connection = connections[database]
+        failed = []
+
+        for shape in get_query_shapes():
+            problems = check_query_plan(connection, shape.queryset.using(database))
+
+            if not problems:
+                self.stdout.write(f"{shape.name}: {self.style.SUCCESS('OK')}")
+                continue
+
+            failed.append(shape.name)
+            self.stdout.write(f"{shape.name}: {self.style.ERROR('FAILED')}")
+
+            for problem in problems:
+                self.stdout.write(f"    {problem}")
+
+        if failed:
+            raise CommandError(
+                f"{len(failed)} queries don't use an index: {', '.join(failed)}"
+            )
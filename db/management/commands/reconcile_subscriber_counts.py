@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from db.signals import invalidate
+from db.subscriber_count import reconcile_subscriber_counts
+
+
+class Command(BaseCommand):
+    help = (
+        "Fixes the subscriber counts of the podcasts that don't match their "
+        "subscribers, for example after subscriptions were changed while the "
+        "triggers keeping them up to date were missing"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+
+    def handle(self, *args, database: str, **options):
+        fixed = reconcile_subscriber_counts(database)
+
+        if fixed:
+            invalidate("podcast")
+
+        self.stdout.write(f"Fixed the subscriber count of {fixed} podcasts")
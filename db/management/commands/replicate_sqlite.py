@@ -0,0 +1,53 @@
+import sqlite3
+import time
+from contextlib import closing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def copy_sqlite_database(source: str, target: str) -> None:
+    # the backup API copies a consistent snapshot, even while the source
+    # is being written to
+    with closing(sqlite3.connect(source)) as source_db, closing(
+        sqlite3.connect(target)
+    ) as target_db:
+        source_db.backup(target_db)
+
+
+class Command(BaseCommand):
+    help = (
+        "Copies the default SQLite database to the replicas every --lag "
+        "seconds, to try the replicas locally, for example with "
+        "DATABASE_REPLICA_URLS=sqlite:///replica.sqlite3"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--lag", type=float, default=1.0, help="Seconds between copies"
+        )
+        parser.add_argument("--once", action="store_true", help="Copy once and exit")
+
+    def handle(self, *args, lag: float, once: bool, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("There are no replicas, see DATABASE_REPLICA_URLS")
+
+        aliases = [DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS]
+
+        if any(connections[alias].vendor != "sqlite" for alias in aliases):
+            raise CommandError("Only SQLite databases can be copied")
+
+        primary = connections[DEFAULT_DB_ALIAS].settings_dict["NAME"]
+
+        while True:
+            for alias in settings.DATABASE_REPLICAS:
+                copy_sqlite_database(primary, connections[alias].settings_dict["NAME"])
+
+            if options["verbosity"] > 1:
+                self.stdout.write(f"Copied {primary} to the replicas")
+
+            if once:
+                return
+
+            time.sleep(lag)
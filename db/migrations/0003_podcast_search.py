@@ -0,0 +1,117 @@
+from django.db import migrations
+
+
+# the full text search indexes used by `db.search`, migrations that rebuild
+# db_podcast on SQLite need to install them again (see 0008)
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS db_podcast_search_update",
+    "DROP TRIGGER IF EXISTS db_podcast_search_delete",
+    "DROP TRIGGER IF EXISTS db_podcast_search_insert",
+    "DROP TABLE IF EXISTS db_podcast_search",
+]
+
+SQLITE_INSTALL = [
+    *SQLITE_UNINSTALL,
+    """
+    CREATE VIRTUAL TABLE db_podcast_search USING fts5(
+        title,
+        subtitle,
+        hosted_by,
+        description,
+        content='db_podcast',
+        content_rowid='rowid',
+        tokenize='porter unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER db_podcast_search_insert AFTER INSERT ON db_podcast
+    BEGIN
+        INSERT INTO db_podcast_search(rowid, title, subtitle, hosted_by, description)
+        VALUES (
+            new.rowid, new.title, new.subtitle, new.hosted_by, new.description
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER db_podcast_search_delete AFTER DELETE ON db_podcast
+    BEGIN
+        INSERT INTO db_podcast_search(
+            db_podcast_search, rowid, title, subtitle, hosted_by, description
+        )
+        VALUES (
+            'delete', old.rowid, old.title, old.subtitle, old.hosted_by,
+            old.description
+        );
+    END
+    """,
+    """
+    CREATE TRIGGER db_podcast_search_update
+    AFTER UPDATE OF title, subtitle, hosted_by, description ON db_podcast
+    BEGIN
+        INSERT INTO db_podcast_search(
+            db_podcast_search, rowid, title, subtitle, hosted_by, description
+        )
+        VALUES (
+            'delete', old.rowid, old.title, old.subtitle, old.hosted_by,
+            old.description
+        );
+        INSERT INTO db_podcast_search(rowid, title, subtitle, hosted_by, description)
+        VALUES (
+            new.rowid, new.title, new.subtitle, new.hosted_by, new.description
+        );
+    END
+    """,
+    "INSERT INTO db_podcast_search(db_podcast_search) VALUES('rebuild')",
+]
+
+POSTGRES_INSTALL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """
+    ALTER TABLE db_podcast
+    ADD COLUMN IF NOT EXISTS search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english', title), 'A')
+        || setweight(to_tsvector('english', subtitle), 'B')
+        || setweight(to_tsvector('english', hosted_by), 'B')
+        || setweight(to_tsvector('english', description), 'C')
+    ) STORED
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS db_podcast_search_vector_idx
+    ON db_podcast USING GIN (search_vector)
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS db_podcast_title_trgm_idx
+    ON db_podcast USING GIN (title gin_trgm_ops)
+    """,
+]
+
+POSTGRES_UNINSTALL = [
+    "DROP INDEX IF EXISTS db_podcast_title_trgm_idx",
+    "DROP INDEX IF EXISTS db_podcast_search_vector_idx",
+    "ALTER TABLE db_podcast DROP COLUMN IF EXISTS search_vector",
+]
+
+INSTALL = {"sqlite": SQLITE_INSTALL, "postgresql": POSTGRES_INSTALL}
+UNINSTALL = {"sqlite": SQLITE_UNINSTALL, "postgresql": POSTGRES_UNINSTALL}
+
+
+def install_search_index(apps, schema_editor):
+    for sql in INSTALL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+def uninstall_search_index(apps, schema_editor):
+    for sql in UNINSTALL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("db", "0002_podcast_subscribers"),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 4.2 on 2026-10-18 12:56
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("db", "0003_podcast_search"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="episode",
+            name="guid",
+            field=models.CharField(blank=True, max_length=1000, null=True),
+        ),
+        migrations.AlterField(
+            model_name="episode",
+            name="published_at",
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddConstraint(
+            model_name="episode",
+            constraint=models.UniqueConstraint(
+                fields=("podcast", "guid"), name="unique_episode_guid_per_podcast"
+            ),
+        ),
+    ]
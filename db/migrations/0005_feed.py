@@ -0,0 +1,48 @@
+# Generated by Django 4.2 on 2026-10-18 12:58
+
+import uuid
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("db", "0004_episode_guid"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Feed",
+            fields=[
+                (
+                    "id",
+                    models.UUIDField(
+                        db_index=True,
+                        default=uuid.uuid4,
+                        editable=False,
+                        primary_key=True,
+                        serialize=False,
+                        unique=True,
+                    ),
+                ),
+                ("url", models.URLField(max_length=2000, unique=True)),
+                ("etag", models.CharField(blank=True, max_length=500)),
+                ("last_modified", models.CharField(blank=True, max_length=100)),
+                ("content_hash", models.CharField(blank=True, max_length=64)),
+                ("episode_fingerprints", models.JSONField(blank=True, default=dict)),
+                ("last_fetched_at", models.DateTimeField(blank=True, null=True)),
+                (
+                    "podcast",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="feeds",
+                        to="db.podcast",
+                    ),
+                ),
+            ],
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 4.2 on 2026-10-18 13:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("db", "0006_persisted_query"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="episode",
+            index=models.Index(
+                fields=["podcast", "title", "-id"], name="episode_podcast_title_id_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="episode",
+            index=models.Index(
+                fields=["published_at"], name="episode_published_at_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="podcast",
+            index=models.Index(fields=["title", "-id"], name="podcast_title_id_idx"),
+        ),
+    ]
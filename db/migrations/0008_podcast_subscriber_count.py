@@ -0,0 +1,128 @@
+# Generated by Django 4.2 on 2026-10-18 13:42
+
+from importlib import import_module
+
+from django.db import migrations, models
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+# adding and removing the column rebuilds db_podcast on SQLite, which drops
+# the triggers of the search index, so it is installed again like 0003 does
+search_migration = import_module("db.migrations.0003_podcast_search")
+
+# the triggers that keep `Podcast.subscriber_count` up to date,
+# `db.subscriber_count` can fix the counts if they drift
+
+SQLITE_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS db_podcast_subscriber_count_delete",
+    "DROP TRIGGER IF EXISTS db_podcast_subscriber_count_insert",
+]
+
+SQLITE_INSTALL = [
+    *SQLITE_UNINSTALL,
+    """
+    CREATE TRIGGER db_podcast_subscriber_count_insert
+    AFTER INSERT ON db_podcast_subscribers
+    BEGIN
+        UPDATE db_podcast SET subscriber_count = subscriber_count + 1
+        WHERE id = new.podcast_id;
+    END
+    """,
+    """
+    CREATE TRIGGER db_podcast_subscriber_count_delete
+    AFTER DELETE ON db_podcast_subscribers
+    BEGIN
+        UPDATE db_podcast SET subscriber_count = max(subscriber_count - 1, 0)
+        WHERE id = old.podcast_id;
+    END
+    """,
+]
+
+POSTGRES_UNINSTALL = [
+    "DROP TRIGGER IF EXISTS db_podcast_subscriber_count ON db_podcast_subscribers",
+    "DROP FUNCTION IF EXISTS db_podcast_subscriber_count",
+]
+
+POSTGRES_INSTALL = [
+    """
+    CREATE OR REPLACE FUNCTION db_podcast_subscriber_count()
+    RETURNS trigger AS $$
+    BEGIN
+        IF TG_OP = 'INSERT' THEN
+            UPDATE db_podcast SET subscriber_count = subscriber_count + 1
+            WHERE id = NEW.podcast_id;
+        ELSE
+            UPDATE db_podcast
+            SET subscriber_count = GREATEST(subscriber_count - 1, 0)
+            WHERE id = OLD.podcast_id;
+        END IF;
+
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    "DROP TRIGGER IF EXISTS db_podcast_subscriber_count ON db_podcast_subscribers",
+    """
+    CREATE TRIGGER db_podcast_subscriber_count
+    AFTER INSERT OR DELETE ON db_podcast_subscribers
+    FOR EACH ROW EXECUTE FUNCTION db_podcast_subscriber_count()
+    """,
+]
+
+INSTALL = {"sqlite": SQLITE_INSTALL, "postgresql": POSTGRES_INSTALL}
+UNINSTALL = {"sqlite": SQLITE_UNINSTALL, "postgresql": POSTGRES_UNINSTALL}
+
+
+def install_subscriber_count_triggers(apps, schema_editor):
+    for sql in INSTALL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+    Podcast = apps.get_model("db", "Podcast")
+    Subscription = Podcast.subscribers.through
+
+    subscriber_count = Coalesce(
+        Subquery(
+            Subscription.objects.filter(podcast_id=OuterRef("pk"))
+            .order_by()
+            .values("podcast_id")
+            .annotate(count=Count("*"))
+            .values("count")
+        ),
+        0,
+    )
+
+    Podcast.objects.using(schema_editor.connection.alias).alias(
+        actual_subscriber_count=subscriber_count
+    ).exclude(subscriber_count=F("actual_subscriber_count")).update(
+        subscriber_count=subscriber_count
+    )
+
+
+def uninstall_subscriber_count_triggers(apps, schema_editor):
+    for sql in UNINSTALL.get(schema_editor.connection.vendor, []):
+        schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("db", "0007_ordering_indexes"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            migrations.RunPython.noop, search_migration.install_search_index
+        ),
+        migrations.AddField(
+            model_name="podcast",
+            name="subscriber_count",
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(
+            search_migration.install_search_index, migrations.RunPython.noop
+        ),
+        migrations.RunPython(
+            install_subscriber_count_triggers, uninstall_subscriber_count_triggers
+        ),
+    ]
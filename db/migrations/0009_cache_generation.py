@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-18 14:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("db", "0008_podcast_subscriber_count"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CacheGeneration",
+            fields=[
+                (
+                    "namespace",
+                    models.CharField(max_length=100, primary_key=True, serialize=False),
+                ),
+                ("generation", models.PositiveBigIntegerField(default=0)),
+            ],
+        ),
+    ]
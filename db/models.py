@@ -1,6 +1,7 @@
 import uuid
 
 from django.db import models
+from django.utils import timezone
 
 
 class Podcast(models.Model):
@@ -24,6 +25,15 @@ class Podcast(models.Model):
     subscribers = models.ManyToManyField(
         "users.User", related_name="subscribed_podcasts", blank=True
     )
+    # kept up to date by triggers on the subscribers table, see
+    # db/migrations/0008_podcast_subscriber_count.py
+    subscriber_count = models.PositiveIntegerField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # matches the ordering used to paginate podcasts in db/data.py
+            models.Index(fields=["title", "-id"], name="podcast_title_id_idx"),
+        ]
 
     def __str__(self):
         return self.title
@@ -39,12 +49,79 @@ class Episode(models.Model):
         db_index=True,
     )
     podcast = models.ForeignKey(Podcast, on_delete=models.CASCADE)
+    # the guid from the feed, episodes imported before we started storing it
+    # don't have one
+    guid = models.CharField(max_length=1000, null=True, blank=True)
     title = models.CharField(max_length=500)
     notes = models.TextField(blank=True)
     total_time = models.PositiveSmallIntegerField(default=0)
     audio = models.FileField(upload_to="episodes/", blank=True)
     image = models.ImageField(upload_to="episodes/", blank=True)
-    published_at = models.DateTimeField(auto_now_add=True)
+    published_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["podcast", "guid"], name="unique_episode_guid_per_podcast"
+            ),
+        ]
+        indexes = [
+            # match the orderings used to paginate the episodes of a podcast
+            # and to find the latest episodes in db/data.py
+            models.Index(
+                fields=["podcast", "title", "-id"], name="episode_podcast_title_id_idx"
+            ),
+            models.Index(fields=["published_at"], name="episode_published_at_idx"),
+        ]
 
     def __str__(self):
         return f"{self.podcast.title} - {self.title}"
+
+
+class Feed(models.Model):
+    """What we know about a feed since the last time we imported it, used to
+    make conditional requests and to skip unchanged episodes."""
+
+    id = models.UUIDField(
+        default=uuid.uuid4,
+        primary_key=True,
+        editable=False,
+        null=False,
+        unique=True,
+        db_index=True,
+    )
+    url = models.URLField(max_length=2000, unique=True)
+    podcast = models.ForeignKey(
+        Podcast, null=True, blank=True, on_delete=models.SET_NULL, related_name="feeds"
+    )
+    etag = models.CharField(max_length=500, blank=True)
+    last_modified = models.CharField(max_length=100, blank=True)
+    content_hash = models.CharField(max_length=64, blank=True)
+    # guid -> fingerprint of each episode in the last imported version
+    episode_fingerprints = models.JSONField(blank=True, default=dict)
+    last_fetched_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return self.url
+
+
+class PersistedQuery(models.Model):
+    """GraphQL documents clients can run by sending their sha256 hash."""
+
+    hash = models.CharField(max_length=64, primary_key=True)
+    query = models.TextField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.hash
+
+
+class CacheGeneration(models.Model):
+    """Incremented when the results of `namespace` are invalidated, so the
+    result caches of all the processes see it, see db/cache.py."""
+
+    namespace = models.CharField(max_length=100, primary_key=True)
+    generation = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.namespace}: {self.generation}"
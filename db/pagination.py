@@ -1,13 +1,29 @@
+import base64
+import binascii
+import json
+import uuid
 from dataclasses import dataclass
-from typing import Generic, Iterable, Optional, TypeVar
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Any, Generic, Iterable, Optional, Sequence, TypeVar
 
-from cursor_pagination import CursorPaginator
-
-from django.db.models import Model
+from django.db.models import F, Model, Q, Window
+from django.db.models.functions import RowNumber
 from django.db.models.query import QuerySet
 
 
+# pages are read-only, a page of podcasts is also a page of models
 T = TypeVar("T", bound=Model, covariant=True)
+M = TypeVar("M", bound=Model)
+
+CURSOR_VERSION = 1
+
+# used when neither `first` nor `last` is passed
+DEFAULT_PAGE_SIZE = 10
+
+
+class InvalidCursorError(Exception):
+    pass
 
 
 @dataclass
@@ -30,24 +46,307 @@ class PaginatedData(Generic[T]):
     page_info: PageInfo
 
 
+@dataclass(frozen=True)
+class OrderingField:
+    attname: str
+    descending: bool
+
+    def expression(self, reverse: bool = False) -> Any:
+        if self.descending != reverse:
+            return F(self.attname).desc()
+
+        return F(self.attname).asc()
+
+
+@lru_cache(maxsize=None)
+def _parse_ordering(
+    model: type[Model],
+    ordering: tuple[str, ...],
+    annotations: frozenset[str] = frozenset(),
+) -> tuple[OrderingField, ...]:
+    if not ordering:
+        raise ValueError("Ordering can't be empty")
+
+    fields = []
+    is_unique = False
+
+    for item in ordering:
+        name = item.lstrip("-")
+        descending = item.startswith("-")
+
+        # annotations (like a search rank) can be used to sort the results,
+        # as long as a unique field comes after them
+        if name in annotations:
+            fields.append(OrderingField(attname=name, descending=descending))
+            is_unique = False
+
+            continue
+
+        field = model._meta.get_field(name)
+
+        # keyset pagination relies on comparing values, NULLs would need to
+        # be special cased in every comparison
+        if field.null:
+            raise ValueError(f"Can't paginate on nullable field {name}")
+
+        fields.append(OrderingField(attname=field.attname, descending=descending))
+        is_unique = field.unique or field.primary_key
+
+    # without a unique column at the end rows with the same values would
+    # share the same cursor, and could be skipped or repeated across pages
+    if not is_unique:
+        raise ValueError(f"The last ordering field must be unique, {name} is not")
+
+    return tuple(fields)
+
+
+def _parse_queryset_ordering(
+    queryset: QuerySet, ordering: Iterable[str]
+) -> tuple[OrderingField, ...]:
+    return _parse_ordering(
+        queryset.model, tuple(ordering), frozenset(queryset.query.annotations)
+    )
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, uuid.UUID):
+        return value.hex
+
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+
+    raise TypeError(f"Can't encode {type(value).__name__} in a cursor")
+
+
+def encode_cursor(values: Sequence[Any]) -> str:
+    payload = json.dumps(
+        [CURSOR_VERSION, *values], separators=(",", ":"), default=_encode_value
+    )
+
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> list[Any]:
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        version, *values = json.loads(payload)
+    except (binascii.Error, ValueError, TypeError):
+        raise InvalidCursorError("Invalid cursor")
+
+    if version != CURSOR_VERSION or len(values) != length:
+        raise InvalidCursorError("Invalid cursor")
+
+    return values
+
+
+def _cursor_for(item: Model, fields: Sequence[OrderingField]) -> str:
+    return encode_cursor([getattr(item, field.attname) for field in fields])
+
+
+def _seek(fields: Sequence[OrderingField], cursor: str, before: bool = False) -> Q:
+    # for an ordering like ("title", "-id") and a cursor (title, id), rows
+    # after the cursor are the ones matching:
+    #
+    #     title > :title OR (title = :title AND id < :id)
+    values = decode_cursor(cursor, len(fields))
+
+    filtering = Q()
+    equality: dict[str, Any] = {}
+
+    for field, value in zip(fields, values):
+        lookup = "lt" if field.descending != before else "gt"
+
+        filtering |= Q(**equality, **{f"{field.attname}__{lookup}": value})
+        equality[field.attname] = value
+
+    return filtering
+
+
+@dataclass
+class _PageQuery(Generic[M]):
+    queryset: QuerySet[M]
+    fields: tuple[OrderingField, ...]
+    page_size: int
+    backwards: bool
+    after: Optional[str]
+    before: Optional[str]
+
+    def to_paginated_data(self, rows: list[M]) -> PaginatedData[M]:
+        has_more = len(rows) > self.page_size
+        items = rows[: self.page_size]
+
+        if self.backwards:
+            items.reverse()
+
+        edges = [
+            Edge(node=item, cursor=_cursor_for(item, self.fields)) for item in items
+        ]
+
+        if self.backwards:
+            has_next_page, has_previous_page = self.before is not None, has_more
+        else:
+            has_next_page, has_previous_page = has_more, self.after is not None
+
+        return PaginatedData(
+            edges=edges,
+            page_info=PageInfo(
+                has_next_page=has_next_page,
+                has_previous_page=has_previous_page,
+                start_cursor=edges[0].cursor if edges else None,
+                end_cursor=edges[-1].cursor if edges else None,
+            ),
+        )
+
+
+def _page_query(
+    queryset: QuerySet[M],
+    ordering: Iterable[str],
+    first: Optional[int],
+    after: Optional[str],
+    last: Optional[int],
+    before: Optional[str],
+) -> _PageQuery[M]:
+    if first is not None and last is not None:
+        raise ValueError("Cannot paginate using both first and last")
+
+    if first is None and last is None:
+        first = DEFAULT_PAGE_SIZE
+
+    fields = _parse_queryset_ordering(queryset, ordering)
+    backwards = last is not None
+    page_size: int = last if backwards else first  # type: ignore
+
+    if page_size < 0:
+        raise ValueError(f"{'last' if backwards else 'first'} can't be negative")
+
+    if after is not None:
+        queryset = queryset.filter(_seek(fields, after))
+
+    if before is not None:
+        queryset = queryset.filter(_seek(fields, before, before=True))
+
+    # fetching one more row than needed tells us if there's another page,
+    # without having to count the rows
+    queryset = queryset.order_by(
+        *(field.expression(reverse=backwards) for field in fields)
+    )[: page_size + 1]
+
+    return _PageQuery(
+        queryset=queryset,
+        fields=fields,
+        page_size=page_size,
+        backwards=backwards,
+        after=after,
+        before=before,
+    )
+
+
+def page_queryset(
+    queryset: QuerySet[M],
+    ordering: Iterable[str],
+    first: Optional[int] = None,
+    after: Optional[str] = None,
+    last: Optional[int] = None,
+    before: Optional[str] = None,
+) -> QuerySet[M]:
+    """Returns the query `paginate` runs to fetch a page, without running it."""
+
+    return _page_query(queryset, ordering, first, after, last, before).queryset
+
+
 def paginate(
-    queryset: QuerySet[T],
+    queryset: QuerySet[M],
     ordering: Iterable[str],
-    first: int = 10,
+    first: Optional[int] = None,
     after: Optional[str] = None,
-) -> PaginatedData[T]:
-    paginator = CursorPaginator(queryset, ordering=ordering)
-    page = paginator.page(first=first, after=after)
-    has_items = len(page) > 0
-
-    page_info = PageInfo(
-        has_next_page=page.has_next,
-        has_previous_page=page.has_previous,
-        start_cursor=paginator.cursor(page[0]) if has_items else None,
-        end_cursor=paginator.cursor(page[-1]) if has_items else None,
+    last: Optional[int] = None,
+    before: Optional[str] = None,
+) -> PaginatedData[M]:
+    page_query: _PageQuery[M] = _page_query(
+        queryset, ordering, first, after, last, before
     )
 
-    return PaginatedData(
-        edges=[Edge(node=item, cursor=paginator.cursor(item)) for item in page],
-        page_info=page_info,
+    return page_query.to_paginated_data(list(page_query.queryset))
+
+
+async def apaginate(
+    queryset: QuerySet[M],
+    ordering: Iterable[str],
+    first: Optional[int] = None,
+    after: Optional[str] = None,
+    last: Optional[int] = None,
+    before: Optional[str] = None,
+) -> PaginatedData[M]:
+    page_query: _PageQuery[M] = _page_query(
+        queryset, ordering, first, after, last, before
+    )
+
+    return page_query.to_paginated_data([item async for item in page_query.queryset])
+
+
+def partitions_queryset(
+    queryset: QuerySet[M],
+    partition_by: str,
+    keys: Iterable[str],
+    ordering: Iterable[str],
+    first: int = 10,
+) -> QuerySet[M]:
+    """Returns the query `apaginate_partitions` runs, without running it."""
+
+    if first < 0:
+        raise ValueError("first can't be negative")
+
+    fields = _parse_queryset_ordering(queryset, ordering)
+
+    return (
+        queryset.filter(**{f"{partition_by}__in": [str(key) for key in keys]})
+        # rows are sorted by the window function, sorting the whole result set
+        # again isn't needed
+        .order_by()
+        .annotate(
+            row_number=Window(
+                RowNumber(),
+                partition_by=F(partition_by),
+                order_by=[field.expression() for field in fields],
+            )
+        )
+        .filter(row_number__lte=first + 1)
     )
+
+
+async def apaginate_partitions(
+    queryset: QuerySet[M],
+    partition_by: str,
+    keys: Iterable[str],
+    ordering: Iterable[str],
+    first: int = 10,
+) -> dict[str, PaginatedData[M]]:
+    # Fetches the first page of many partitions (for example the episodes of
+    # many podcasts) using a single query, by numbering the rows of each
+    # partition with ROW_NUMBER() and keeping the first `first + 1` of them.
+    # Cursors are the same ones `paginate` would return, so the following
+    # pages can be fetched with `paginate` and `after`.
+    keys = [str(key) for key in keys]
+    fields = _parse_queryset_ordering(queryset, ordering)
+    rows = partitions_queryset(queryset, partition_by, keys, ordering, first)
+
+    rows_by_key: dict[str, list[M]] = {key: [] for key in keys}
+
+    async for row in rows:
+        rows_by_key[str(getattr(row, partition_by))].append(row)
+
+    page_query: _PageQuery[M] = _PageQuery(
+        queryset=queryset,
+        fields=fields,
+        page_size=first,
+        backwards=False,
+        after=None,
+        before=None,
+    )
+
+    for items in rows_by_key.values():
+        items.sort(key=lambda row: row.row_number)
+
+    return {
+        key: page_query.to_paginated_data(items) for key, items in rows_by_key.items()
+    }
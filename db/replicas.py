@@ -0,0 +1,179 @@
+import threading
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Optional
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.http import HttpRequest, HttpResponse
+
+
+# set on the responses of requests that wrote to the database, the following
+# requests of the client read from the primary until it expires
+PRIMARY_COOKIE = "use_primary"
+
+
+@dataclass
+class ReplicaState:
+    # reads go to the primary when this is set
+    use_primary: bool = False
+    wrote: bool = False
+
+
+current_state: ContextVar[Optional[ReplicaState]] = ContextVar(
+    "current_replica_state", default=None
+)
+
+
+def _get_state() -> ReplicaState:
+    state = current_state.get()
+
+    # outside of requests (in commands and scripts) the state lasts as long
+    # as the context, so they read their own writes too
+    if state is None:
+        state = ReplicaState()
+        current_state.set(state)
+
+    return state
+
+
+def use_primary() -> None:
+    """Sends the following reads of the current request to the primary."""
+
+    _get_state().use_primary = True
+
+
+class WeightedRoundRobin:
+    """Cycles through `weights`, returning each key `weight` times per cycle,
+    spread over the cycle (like nginx's smooth weighted round-robin)."""
+
+    def __init__(self, weights: Dict[str, int]):
+        if any(weight < 0 for weight in weights.values()):
+            raise ValueError("Weights can't be negative")
+
+        # keys with a weight of 0 are never returned
+        self.weights = {key: weight for key, weight in weights.items() if weight}
+        self.total = sum(self.weights.values())
+
+        self._current = dict.fromkeys(self.weights, 0)
+        self._lock = threading.Lock()
+
+    def __bool__(self) -> bool:
+        return bool(self.weights)
+
+    def __next__(self) -> str:
+        with self._lock:
+            for key, weight in self.weights.items():
+                self._current[key] += weight
+
+            key = max(self._current, key=self._current.__getitem__)
+            self._current[key] -= self.total
+
+            return key
+
+
+class ReplicaRouter:
+    """Sends reads to the replicas in `DATABASE_REPLICAS`, in turn and by
+    weight, and writes to the default database.
+
+    Once a request writes, or runs a mutation, its reads go to the default
+    database too, and so do the ones of the following requests of the same
+    client for `DATABASE_REPLICA_LAG` seconds (see `ReplicaMiddleware`), so
+    users see their changes even though the replicas are behind.
+    """
+
+    def __init__(self) -> None:
+        self.replicas = WeightedRoundRobin(
+            {
+                alias: settings.DATABASE_REPLICA_WEIGHTS.get(alias, 1)
+                for alias in settings.DATABASE_REPLICAS
+            }
+        )
+
+    def db_for_read(self, model, **hints) -> Optional[str]:
+        if not self.replicas:
+            return None
+
+        state = current_state.get()
+
+        # the replicas don't see the changes of the current transaction
+        if (state is not None and state.use_primary) or connections[
+            DEFAULT_DB_ALIAS
+        ].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+
+        return next(self.replicas)
+
+    def db_for_write(self, model, **hints) -> str:
+        state = _get_state()
+        state.use_primary = True
+        state.wrote = True
+
+        # instances read from a replica would be saved to it otherwise
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints) -> bool:
+        # the replicas have the same data as the default database
+        return True
+
+    def allow_migrate(self, db: str, app_label: str, **hints) -> Optional[bool]:
+        # replicas get the schema from the default database
+        if db in settings.DATABASE_REPLICAS:
+            return False
+
+        return None
+
+
+class ReplicaMiddleware:
+    """Tracks the writes of each request for `ReplicaRouter`, and sends the
+    requests that follow a write to the default database."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request: HttpRequest):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        state = ReplicaState(use_primary=PRIMARY_COOKIE in request.COOKIES)
+        token = current_state.set(state)
+
+        try:
+            response = self.get_response(request)
+        finally:
+            current_state.reset(token)
+
+        return self.process_response(state, response)
+
+    async def __acall__(self, request: HttpRequest) -> HttpResponse:
+        state = ReplicaState(use_primary=PRIMARY_COOKIE in request.COOKIES)
+        token = current_state.set(state)
+
+        try:
+            response = await self.get_response(request)
+        finally:
+            current_state.reset(token)
+
+        return self.process_response(state, response)
+
+    def process_response(
+        self, state: ReplicaState, response: HttpResponse
+    ) -> HttpResponse:
+        if state.wrote and settings.DATABASE_REPLICAS:
+            response.set_cookie(
+                PRIMARY_COOKIE,
+                "1",
+                max_age=settings.DATABASE_REPLICA_LAG,
+                httponly=True,
+                samesite="Lax",
+            )
+
+        return response
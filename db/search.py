@@ -0,0 +1,115 @@
+import re
+from typing import Protocol
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.query import QuerySet
+
+from . import models
+
+
+# podcasts are searched by title, subtitle, hosts and description, using the
+# indexes created by db/migrations/0003_podcast_search.py
+SEARCH_FIELDS = ("title", "subtitle", "hosted_by", "description")
+
+
+class SearchBackend(Protocol):
+    def search(
+        self, podcasts: QuerySet[models.Podcast], query: str
+    ) -> QuerySet[models.Podcast]:
+        """Filters the podcasts matching `query` and annotates them with a
+        `rank`, higher is more relevant."""
+        ...
+
+
+class SQLiteSearchBackend:
+    # `db_podcast_search` is a FTS5 table using db_podcast as external
+    # content, kept in sync by triggers and joined on rowid.
+    #
+    # Rebuilding db_podcast (which Django does when altering most columns on
+    # SQLite) drops the triggers and VACUUM can change the rowids, so the
+    # index needs to be installed again after either of these, like
+    # db/migrations/0008_podcast_subscriber_count.py does.
+
+    def _match_expression(self, query: str) -> str:
+        # the FTS5 query syntax fails on unbalanced quotes and treats some
+        # words as operators, we only support searching for words (and their
+        # prefixes) so we quote each one of them
+        return " ".join(f'"{word}"*' for word in re.findall(r"\w+", query))
+
+    def search(
+        self, podcasts: QuerySet[models.Podcast], query: str
+    ) -> QuerySet[models.Podcast]:
+        match = self._match_expression(query)
+
+        if not match:
+            return podcasts.none()
+
+        # joining the index computes the rank of every match in a single
+        # MATCH, a subquery for the rank would run it again for each row
+        return podcasts.extra(
+            tables=["db_podcast_search"],
+            where=[
+                '"db_podcast_search"."rowid" = "db_podcast"."rowid"',
+                '"db_podcast_search" MATCH %s',
+            ],
+            params=[match],
+        ).annotate(
+            # FTS5's rank is bm25, where lower is more relevant
+            rank=RawSQL('-"db_podcast_search"."rank"', (), output_field=FloatField())
+        )
+
+
+class PostgresSearchBackend:
+    # `db_podcast.search_vector` is a generated tsvector column with a GIN
+    # index, titles also have a trigram index to match typos. Both are
+    # maintained by Postgres itself.
+
+    def search(
+        self, podcasts: QuerySet[models.Podcast], query: str
+    ) -> QuerySet[models.Podcast]:
+        return podcasts.filter(
+            RawSQL(
+                "(search_vector @@ websearch_to_tsquery('english', %s) "
+                "OR db_podcast.title %% %s)",
+                (query, query),
+                output_field=BooleanField(),
+            )
+        ).annotate(
+            # casting to double precision makes sure the rank we store in
+            # the cursors compares equal to the one in the database
+            rank=RawSQL(
+                "(ts_rank(search_vector, websearch_to_tsquery('english', %s)) "
+                "+ similarity(db_podcast.title, %s))::double precision",
+                (query, query),
+                output_field=FloatField(),
+            )
+        )
+
+
+class ContainsSearchBackend:
+    # fallback for other databases, this does a full table scan and doesn't
+    # rank the results
+
+    def search(
+        self, podcasts: QuerySet[models.Podcast], query: str
+    ) -> QuerySet[models.Podcast]:
+        matches = Q()
+
+        for field in SEARCH_FIELDS:
+            matches |= Q(**{f"{field}__icontains": query})
+
+        return podcasts.filter(matches).annotate(
+            rank=Value(0.0, output_field=FloatField())
+        )
+
+
+SEARCH_BACKENDS: dict[str, SearchBackend] = {
+    "sqlite": SQLiteSearchBackend(),
+    "postgresql": PostgresSearchBackend(),
+}
+
+
+def get_search_backend(using: str = "default") -> SearchBackend:
+    return SEARCH_BACKENDS.get(connections[using].vendor, ContainsSearchBackend())
@@ -0,0 +1,51 @@
+from typing import Hashable
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import MISSING
+from .data import result_cache
+from .models import Episode, Podcast
+
+
+# bulk operations (like `bulk_create` and `QuerySet.update`) don't send
+# signals, code using them needs to call `invalidate` itself
+
+
+def invalidate(namespace: str, key: Hashable = MISSING) -> None:
+    result_cache.invalidate(namespace, key)
+
+    # results fetched before the transaction is committed still see the old
+    # data, so we invalidate them again after the commit
+    transaction.on_commit(lambda: result_cache.invalidate(namespace, key))
+
+
+@receiver(post_save, sender=Podcast)
+@receiver(post_delete, sender=Podcast)
+def invalidate_podcast(sender, instance: Podcast, **kwargs) -> None:
+    invalidate("podcast", str(instance.pk))
+
+
+@receiver(post_save, sender=Episode)
+@receiver(post_delete, sender=Episode)
+def invalidate_episodes(sender, instance: Episode, **kwargs) -> None:
+    invalidate("latest_episodes")
+
+
+@receiver(m2m_changed, sender=Podcast.subscribers.through)
+def invalidate_subscriptions(
+    sender, instance, action: str, reverse: bool, pk_set, **kwargs
+) -> None:
+    if not action.startswith("post_"):
+        return
+
+    # `instance` is a user when the subscriptions are changed from the user
+    if not reverse:
+        invalidate("podcast", str(instance.pk))
+    elif pk_set is None:
+        # a user's subscriptions were cleared, we don't know which podcasts
+        invalidate("podcast")
+    else:
+        for podcast_id in pk_set:
+            invalidate("podcast", str(podcast_id))
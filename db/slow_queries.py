@@ -0,0 +1,68 @@
+import logging
+import random
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Optional
+
+from graphql.pyutils import Path
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+
+logger = logging.getLogger(__name__)
+
+# set by `api.extensions.slow_queries.SlowQueryContext`, so queries can be
+# traced back to the GraphQL operation and field that ran them
+current_operation: ContextVar[Optional[str]] = ContextVar(
+    "current_operation", default=None
+)
+current_path: ContextVar[Optional[Path]] = ContextVar("current_path", default=None)
+
+
+def log_query(sql: str, duration: float, slow: bool, database: str) -> None:
+    path = current_path.get()
+
+    logger.log(
+        logging.WARNING if slow else logging.INFO,
+        "%s query (%.1fms)",
+        "Slow" if slow else "Sampled",
+        duration * 1000,
+        extra={
+            # the parameters are left out, they could contain personal data
+            "sql": sql,
+            "duration_ms": round(duration * 1000, 3),
+            "slow": slow,
+            "database": database,
+            "operation": current_operation.get(),
+            "path": ".".join(map(str, path.as_list())) if path else None,
+        },
+    )
+
+
+def _log_slow_query(execute: Callable, sql: str, params: Any, many: bool, context):
+    start = time.perf_counter()
+
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = time.perf_counter() - start
+        slow = duration >= settings.SLOW_QUERY_THRESHOLD
+
+        if slow or random.random() < settings.SLOW_QUERY_SAMPLE_RATE:
+            log_query(sql, duration, slow, context["connection"].alias)
+
+
+def _add_slow_query_logger(connection, **kwargs) -> None:
+    if _log_slow_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_log_slow_query)
+
+
+def install() -> None:
+    # database connections are created per thread, so the logger is added
+    # to each new connection (and to the ones of this thread)
+    connection_created.connect(_add_slow_query_logger, dispatch_uid="db.slow_queries")
+
+    for connection in connections.all(initialized_only=True):
+        _add_slow_query_logger(connection)
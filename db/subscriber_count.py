@@ -0,0 +1,32 @@
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from . import models
+
+
+# the counts are kept up to date by the triggers created in
+# db/migrations/0008_podcast_subscriber_count.py, this fixes them if they
+# ever drift
+
+
+def reconcile_subscriber_counts(using: str = "default") -> int:
+    """Sets `Podcast.subscriber_count` to the number of subscribers of each
+    podcast, and returns how many podcasts had a wrong count."""
+
+    subscriber_count = Coalesce(
+        Subquery(
+            models.Podcast.subscribers.through.objects.filter(podcast_id=OuterRef("pk"))
+            .order_by()
+            .values("podcast_id")
+            .annotate(count=Count("*"))
+            .values("count")
+        ),
+        0,
+    )
+
+    return (
+        models.Podcast.objects.using(using)
+        .alias(actual_subscriber_count=subscriber_count)
+        .exclude(subscriber_count=F("actual_subscriber_count"))
+        .update(subscriber_count=subscriber_count)
+    )
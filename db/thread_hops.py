@@ -0,0 +1,47 @@
+import functools
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Optional, TypeVar, cast
+
+
+F = TypeVar("F", bound=Callable[..., Awaitable[Any]])
+
+
+@dataclass
+class ThreadHops:
+    # calls running at the same time are added up
+    duration: float = 0.0
+
+
+# set by `api.metrics.MetricsMiddleware`, the functions decorated with
+# `record_thread_hops` add the time they take to it
+current_thread_hops: ContextVar[Optional[ThreadHops]] = ContextVar(
+    "current_thread_hops", default=None
+)
+# calls made by decorated functions are already recorded by them
+_recording: ContextVar[bool] = ContextVar("recording_thread_hops", default=False)
+
+
+def record_thread_hops(func: F) -> F:
+    """Records the time spent in `func`, an async function that (directly or
+    through the async methods of the ORM) waits for `sync_to_async` calls,
+    which run in another thread."""
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        thread_hops = current_thread_hops.get()
+
+        if thread_hops is None or _recording.get():
+            return await func(*args, **kwargs)
+
+        token = _recording.set(True)
+        start = time.perf_counter()
+
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            thread_hops.duration += time.perf_counter() - start
+            _recording.reset(token)
+
+    return cast(F, wrapper)
@@ -0,0 +1,95 @@
+import copy
+import json
+import logging
+import queue
+import time
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional, TextIO
+
+
+# attributes every record has, the others were passed in `extra`
+RECORD_ATTRIBUTES = {
+    *vars(logging.LogRecord("", logging.INFO, "", 0, "", None, None)),
+    "message",
+    "asctime",
+}
+
+
+class JSONFormatter(logging.Formatter):
+    """Formats records as a JSON object per line, with the values passed in
+    `extra` as keys of the object."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+
+        data.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in RECORD_ATTRIBUTES
+        )
+
+        if record.exc_info:
+            data["exception"] = self.formatException(record.exc_info)
+
+        return json.dumps(data, default=str)
+
+
+class _QueueListener(QueueListener):
+    def enqueue_sentinel(self) -> None:
+        # when stopping, waits for room in the queue instead of failing
+        while True:
+            try:
+                return super().enqueue_sentinel()
+            except queue.Full:
+                time.sleep(0.01)
+
+
+class BackgroundStreamHandler(QueueHandler):
+    """Hands the records over to a thread that formats them and writes them
+    to `stream`, so logging never blocks the caller (or the event loop) on
+    IO. When the thread can't keep up and the queue is full, records are
+    dropped and counted in `dropped`."""
+
+    def __init__(self, stream: Optional[TextIO] = None, max_size: int = 10_000):
+        super().__init__(queue.Queue(max_size))
+
+        self.dropped = 0
+        self.handler = logging.StreamHandler(stream)
+        self.listener: Optional[QueueListener] = _QueueListener(
+            self.queue, self.handler
+        )
+        self.listener.start()
+
+    def setFormatter(self, fmt: Optional[logging.Formatter]) -> None:
+        # formatting happens in the thread
+        self.handler.setFormatter(fmt)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # the arguments could change before the thread formats the message
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self) -> None:
+        # writes the records left in the queue
+        if self.listener is not None:
+            self.listener.stop()
+            self.listener = None
+
+        self.handler.close()
+
+        super().close()
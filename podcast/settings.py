@@ -10,9 +10,13 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/4.0/ref/settings/
 """
 
+import os
 from pathlib import Path
+from typing import Dict, List
+
 import dj_database_url
 
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,6 +49,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "api.metrics.MetricsMiddleware",
+    # before the sessions, so they are read from the right database
+    "db.replicas.ReplicaMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -85,6 +92,27 @@ DATABASES = {
     )
 }
 
+# read-only copies of the default database, as space separated URLs in
+# DATABASE_REPLICA_URLS, reads are sent to them unless the request (or a
+# recent request of the same client) wrote to the database, see db/replicas.py
+DATABASE_REPLICAS: List[str] = []
+
+for number, url in enumerate(os.environ.get("DATABASE_REPLICA_URLS", "").split(), 1):
+    DATABASES[f"replica_{number}"] = {
+        **dj_database_url.parse(url, conn_max_age=600, conn_health_checks=True),
+        # tests only use the default database
+        "TEST": {"MIRROR": "default"},
+    }
+    DATABASE_REPLICAS.append(f"replica_{number}")
+
+# replicas get reads in proportion to their weight, 1 when not set here
+DATABASE_REPLICA_WEIGHTS: Dict[str, int] = {}
+# in seconds, should be longer than the time the replicas take to catch up,
+# clients read from the default database for this long after writing
+DATABASE_REPLICA_LAG = 5
+
+DATABASE_ROUTERS = ["db.replicas.ReplicaRouter"]
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
@@ -133,17 +161,70 @@ AUTH_USER_MODEL = "users.User"
 
 LOGGING = {
     "version": 1,
+    "formatters": {
+        "json": {
+            "()": "podcast.log.JSONFormatter",
+        },
+    },
     "handlers": {
         "console": {
             "class": "logging.StreamHandler",
         },
+        "background": {
+            "()": "podcast.log.BackgroundStreamHandler",
+            "formatter": "json",
+        },
     },
     "loggers": {
-        "django.db.backends": {
-            "level": "DEBUG",
+        "db.slow_queries": {
+            "handlers": ["background"],
+            "level": "INFO",
+            "propagate": False,
         },
     },
     "root": {
         "handlers": ["console"],
     },
 }
+
+# Automatic persisted queries, see api/persisted_queries.py
+PERSISTED_QUERIES_CACHE_SIZE = 1000
+# also store the persisted queries in the database, to share them across
+# processes and deploys
+PERSISTED_QUERIES_DATABASE = False
+# queries sent by clients are only stored in the database while there are
+# fewer than this, the ones added with `persist-queries` are not limited
+PERSISTED_QUERIES_DATABASE_MAX_SIZE = 10_000
+# only run queries that have been persisted in the database beforehand
+PERSISTED_QUERIES_ALLOWLIST_ONLY = False
+
+# number of parsed and validated GraphQL documents to keep in memory, see
+# api/extensions/document_cache.py
+GRAPHQL_DOCUMENT_CACHE_SIZE = 1000
+
+# operations that cost more than this are rejected, see
+# api/extensions/query_cost.py
+GRAPHQL_MAX_QUERY_COST = 5000
+
+# results of the most requested functions in db/data.py are cached in memory,
+# up to this many entries and bytes, see db/cache.py
+RESULT_CACHE_SIZE = 1000
+RESULT_CACHE_MAX_BYTES = 50 * 1024 * 1024
+# in seconds, results are also invalidated when the data changes
+RESULT_CACHE_TTL = 300
+# name of one of the CACHES to also store the results in, to share them
+# across processes
+RESULT_CACHE_BACKEND = None
+
+# operation names used as labels in the metrics exposed on /metrics, other
+# operations are recorded as "other", see api/metrics.py
+GRAPHQL_METRICS_MAX_OPERATIONS = 100
+# /metrics is only readable by superusers, or with this token in an
+# "Authorization: Bearer <token>" header (like Prometheus sends)
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# SQL queries slower than this (in seconds) are logged as warnings, with the
+# GraphQL operation and field that ran them, see db/slow_queries.py
+SLOW_QUERY_THRESHOLD = 0.1
+# fraction of the other queries that are logged too
+SLOW_QUERY_SAMPLE_RATE = 0.01
@@ -0,0 +1,126 @@
+from types import SimpleNamespace
+
+import pytest
+
+from django.http import HttpResponse
+
+from api.schema import schema
+from db.models import Episode, Podcast
+
+
+pytestmark = pytest.mark.django_db
+
+LATEST_EPISODES_QUERY = """
+    query LatestEpisodes {
+        hello
+        latestEpisodes(last: 5) {
+            title
+            podcast {
+                title
+            }
+        }
+    }
+"""
+
+IS_SUBSCRIBED_QUERY = """
+    query IsSubscribed($id: ID!) {
+        podcast(id: $id) {
+            title
+            isSubscribed
+        }
+    }
+"""
+
+
+def _get(client, query, **kwargs):
+    return client.get("/graphql", {"query": query}, **kwargs)
+
+
+def test_uses_the_lowest_max_age(client):
+    podcast = Podcast.objects.create(title="Talk Python")
+    Episode.objects.create(podcast=podcast, title="Episode 1")
+
+    response = _get(client, LATEST_EPISODES_QUERY)
+
+    assert response.status_code == 200
+    # hello (3600), latestEpisodes (60) and podcast (300)
+    assert response["Cache-Control"] == "public, max-age=60"
+
+
+def test_uses_the_max_age_of_the_type(client):
+    podcast = Podcast.objects.create(title="Talk Python")
+
+    response = client.get(
+        "/graphql",
+        {
+            "query": "query Podcast($id: ID!) { podcast(id: $id) { title } }",
+            "variables": f'{{"id": "{podcast.id}"}}',
+        },
+    )
+
+    assert response["Cache-Control"] == "public, max-age=300"
+
+
+def test_answers_not_modified_when_the_etag_matches(client):
+    response = _get(client, "query { hello }")
+    etag = response["ETag"]
+
+    # strong ETag
+    assert etag.startswith('"')
+
+    response = _get(client, "query { hello }", HTTP_IF_NONE_MATCH=etag)
+
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response["ETag"] == etag
+    assert response["Cache-Control"] == "public, max-age=3600"
+
+    Podcast.objects.create(title="Talk Python")
+    response = _get(
+        client, "query { latestEpisodes { title } }", HTTP_IF_NONE_MATCH=etag
+    )
+
+    assert response.status_code == 200
+
+
+def test_authenticated_fields_are_private(logged_in_client):
+    podcast = Podcast.objects.create(title="Talk Python")
+
+    response = logged_in_client.get(
+        "/graphql",
+        {"query": IS_SUBSCRIBED_QUERY, "variables": f'{{"id": "{podcast.id}"}}'},
+    )
+
+    assert response.json()["data"]["podcast"]["isSubscribed"] is False
+    assert response["Cache-Control"] == "private, max-age=300"
+
+
+def test_errors_are_not_cached(client):
+    response = _get(client, "query { latestEpisodes(last: 100) { title } }")
+
+    assert response.json()["errors"]
+    assert response["Cache-Control"] == "no-store"
+    assert not response.has_header("ETag")
+
+
+@pytest.mark.asyncio
+async def test_mutations_are_not_cached(rf):
+    response = HttpResponse()
+
+    result = await schema.execute(
+        "mutation { hello }",
+        root_value=SimpleNamespace(hello="Hello World!"),
+        context_value={"request": rf.post("/graphql"), "response": response},
+    )
+
+    assert result.errors is None
+    assert response["Cache-Control"] == "no-store"
+
+
+def test_post_requests_dont_have_an_etag(client):
+    response = client.post(
+        "/graphql", {"query": "query { hello }"}, content_type="application/json"
+    )
+
+    assert response["Cache-Control"] == "public, max-age=3600"
+    assert not response.has_header("ETag")
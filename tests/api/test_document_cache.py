@@ -0,0 +1,79 @@
+from unittest import mock
+
+import pytest
+
+import strawberry.schema.execute
+
+from api.extensions.document_cache import document_cache
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture(autouse=True)
+def clear_document_cache():
+    document_cache.clear()
+
+    yield
+
+    document_cache.clear()
+
+
+@pytest.fixture
+def parse_document():
+    with mock.patch.object(
+        strawberry.schema.execute,
+        "parse_document",
+        wraps=strawberry.schema.execute.parse_document,
+    ) as parse_document:
+        yield parse_document
+
+
+@pytest.fixture
+def validate_document():
+    with mock.patch.object(
+        strawberry.schema.execute,
+        "validate_document",
+        wraps=strawberry.schema.execute.validate_document,
+    ) as validate_document:
+        yield validate_document
+
+
+def _query(client, query):
+    return client.post("/graphql", {"query": query}, content_type="application/json")
+
+
+def test_caches_documents(client, parse_document, validate_document):
+    for _ in range(3):
+        response = _query(client, "query { hello }")
+
+        assert response.json() == {
+            "data": {"hello": "Hello World!"},
+            "extensions": mock.ANY,
+        }
+
+    assert parse_document.call_count == 1
+    assert validate_document.call_count == 1
+    assert (document_cache.hits, document_cache.misses) == (2, 1)
+
+
+def test_caches_validation_errors(client, validate_document):
+    responses = [_query(client, "query { missing }").json() for _ in range(2)]
+
+    assert responses[0] == responses[1]
+    assert responses[0]["errors"][0]["message"] == (
+        "Cannot query field 'missing' on type 'Query'."
+    )
+    assert validate_document.call_count == 1
+
+
+def test_doesnt_cache_syntax_errors(client, parse_document):
+    for _ in range(2):
+        response = _query(client, "query {")
+
+        assert response.json()["errors"][0]["message"] == (
+            "Syntax Error: Expected Name, found <EOF>."
+        )
+
+    assert parse_document.call_count == 2
+    assert len(document_cache) == 0
@@ -1,5 +1,7 @@
 import pytest
 
+from db.models import Episode, Podcast
+
 
 pytestmark = pytest.mark.django_db
 
@@ -17,13 +19,148 @@ FIND_PODCASTS_QUERY = """
 """
 
 
+def _find_podcasts(client, document=FIND_PODCASTS_QUERY, **variables):
+    response = client.post(
+        "/graphql",
+        {"query": document, "variables": variables},
+        content_type="application/json",
+    )
+
+    return response.json()["data"]["findPodcasts"]
+
+
 def test_returns_empty_list_when_there_is_no_podcast(client):
-    ...
+    assert _find_podcasts(client, query="python") == {"edges": []}
 
 
 def test_returns_podcasts_when_title_matches(client):
-    ...
+    Podcast.objects.create(title="Talk Python")
+    Podcast.objects.create(title="Rust in Production")
+
+    data = _find_podcasts(client, query="python")
+
+    assert [edge["node"]["title"] for edge in data["edges"]] == ["Talk Python"]
 
 
 def test_can_paginate(client):
-    ...
+    for title in ("Python 1", "Python 2", "Python 3"):
+        Podcast.objects.create(title=title)
+
+    first_page = _find_podcasts(client, query="python", first=2)
+
+    assert [edge["node"]["title"] for edge in first_page["edges"]] == [
+        "Python 1",
+        "Python 2",
+    ]
+
+    second_page = _find_podcasts(
+        client, query="python", first=2, after=first_page["edges"][-1]["cursor"]
+    )
+
+    assert [edge["node"]["title"] for edge in second_page["edges"]] == ["Python 3"]
+
+
+FIND_PODCASTS_WITH_EPISODES_QUERY = """
+    query FindPodcastsWithEpisodes($query: String!, $first: Int!) {
+        findPodcasts(query: $query, first: $first) {
+            edges {
+                node {
+                    title
+                    episodes(first: 2) {
+                        edges {
+                            node {
+                                title
+                            }
+                        }
+                        pageInfo {
+                            hasNextPage
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+
+@pytest.mark.parametrize("first", [1, 5])
+def test_fetches_episodes_of_all_podcasts_at_once(
+    client, django_assert_num_queries, first
+):
+    for podcast_number in range(5):
+        podcast = Podcast.objects.create(title=f"Python {podcast_number}")
+
+        for episode_number in range(podcast_number):
+            Episode.objects.create(podcast=podcast, title=f"Episode {episode_number}")
+
+    # one query for the podcasts and one for the episodes of all of them
+    with django_assert_num_queries(2):
+        data = _find_podcasts(
+            client, FIND_PODCASTS_WITH_EPISODES_QUERY, query="python", first=first
+        )
+
+    episodes = [edge["node"]["episodes"] for edge in data["edges"]]
+
+    assert len(episodes) == first
+    assert episodes[-1] == {
+        "edges": [
+            {"node": {"title": f"Episode {number}"}}
+            for number in range(min(first - 1, 2))
+        ],
+        "pageInfo": {"hasNextPage": first - 1 > 2},
+    }
+
+
+def test_query_budget(assert_query_budget):
+    def seed(size):
+        podcasts = Podcast.objects.bulk_create(
+            Podcast(title=f"Python {number}") for number in range(size)
+        )
+        Episode.objects.bulk_create(
+            Episode(podcast=podcast, title=f"Episode {number}")
+            for podcast in podcasts
+            for number in range(3)
+        )
+
+        return {"query": "python", "first": size}
+
+    assert_query_budget(FIND_PODCASTS_WITH_EPISODES_QUERY, seed, budget=2)
+
+
+FIND_PODCASTS_BY_RELEVANCE_QUERY = """
+    query FindPodcasts($query: String!) {
+        findPodcasts(query: $query, orderBy: RELEVANCE) {
+            edges {
+                node {
+                    title
+                }
+            }
+        }
+    }
+"""
+
+
+def test_can_sort_by_relevance(client):
+    Podcast.objects.create(title="A Python Podcast")
+    Podcast.objects.create(title="Python", description="All about python")
+
+    data = _find_podcasts(client, FIND_PODCASTS_BY_RELEVANCE_QUERY, query="python")
+
+    assert [edge["node"]["title"] for edge in data["edges"]] == [
+        "Python",
+        "A Python Podcast",
+    ]
+
+
+@pytest.mark.parametrize("first", [-1, 51])
+def test_validates_first(client, first):
+    response = client.post(
+        "/graphql",
+        {
+            "query": FIND_PODCASTS_QUERY,
+            "variables": {"query": "python", "first": first},
+        },
+        content_type="application/json",
+    )
+
+    assert response.json()["errors"][0]["message"] == "first must be between 0 and 50"
@@ -1,5 +1,9 @@
+from unittest import mock
+
 import pytest
 
+from db.models import Episode, Podcast
+
 
 pytestmark = pytest.mark.django_db
 
@@ -16,8 +20,59 @@ GET_LATEST_EPISODE_QUERY = """
 
 
 def test_returns_empty_list_when_there_is_no_episode(client):
-    ...
+    response = client.post(
+        "/graphql",
+        {"query": GET_LATEST_EPISODE_QUERY, "variables": {"last": 5}},
+        content_type="application/json",
+    )
+
+    assert response.status_code == 200
+    assert response.json() == {"data": {"latestEpisodes": []}, "extensions": mock.ANY}
+
+
+@pytest.mark.parametrize("last", [1, 5, 20])
+def test_returns_episodes(client, django_assert_num_queries, last):
+    for podcast_number in range(5):
+        podcast = Podcast.objects.create(title=f"Podcast {podcast_number}")
+
+        for episode_number in range(5):
+            Episode.objects.create(podcast=podcast, title=f"Episode {episode_number}")
+
+    # one query for the generation of the cached results, one for the
+    # episodes and one for all their podcasts
+    with django_assert_num_queries(3):
+        response = client.post(
+            "/graphql",
+            {"query": GET_LATEST_EPISODE_QUERY, "variables": {"last": last}},
+            content_type="application/json",
+        )
+
+    data = response.json()["data"]["latestEpisodes"]
+
+    assert len(data) == last
+    assert data[0] == {"title": "Episode 4", "podcast": {"title": "Podcast 4"}}
+
+
+def test_query_budget(assert_query_budget):
+    def seed(size):
+        podcasts = Podcast.objects.bulk_create(
+            Podcast(title=f"Podcast {number}") for number in range(size)
+        )
+        Episode.objects.bulk_create(
+            Episode(podcast=podcast, title="Episode") for podcast in podcasts
+        )
+
+        return {"last": size}
+
+    assert_query_budget(GET_LATEST_EPISODE_QUERY, seed, budget=3)
+
 
+@pytest.mark.parametrize("last", [-1, 51])
+def test_validates_last(client, last):
+    response = client.post(
+        "/graphql",
+        {"query": GET_LATEST_EPISODE_QUERY, "variables": {"last": last}},
+        content_type="application/json",
+    )
 
-def test_returns_episodes(client, django_assert_num_queries):
-    ...
+    assert response.json()["errors"][0]["message"] == "last must be between 0 and 50"
@@ -0,0 +1,121 @@
+from unittest import mock
+
+import pytest
+
+from prometheus_client import REGISTRY
+
+from db.models import Episode, Podcast
+
+
+pytestmark = pytest.mark.django_db
+
+LATEST_EPISODES_QUERY = """
+    query LatestEpisodes {
+        latestEpisodes(last: 5) {
+            title
+            podcast {
+                title
+            }
+        }
+    }
+"""
+
+
+def _sample(name, operation, suffix="_sum"):
+    return REGISTRY.get_sample_value(f"{name}{suffix}", {"operation": operation}) or 0
+
+
+def _query(client, query):
+    return client.post("/graphql", {"query": query}, content_type="application/json")
+
+
+def test_records_operation_metrics(client):
+    podcast = Podcast.objects.create(title="Talk Python")
+    Episode.objects.create(podcast=podcast, title="Episode 1")
+
+    requests = _sample("graphql_operation_duration_seconds", "LatestEpisodes", "_count")
+    queries = _sample("graphql_operation_sql_queries", "LatestEpisodes")
+    response_size = _sample("graphql_operation_response_size_bytes", "LatestEpisodes")
+    sync_to_async_duration = _sample(
+        "graphql_operation_sync_to_async_duration_seconds", "LatestEpisodes"
+    )
+
+    response = _query(client, LATEST_EPISODES_QUERY)
+
+    assert (
+        _sample("graphql_operation_duration_seconds", "LatestEpisodes", "_count")
+        == requests + 1
+    )
+    # the generation of the cached results, the episodes and their podcasts
+    assert _sample("graphql_operation_sql_queries", "LatestEpisodes") == queries + 3
+    assert _sample(
+        "graphql_operation_response_size_bytes", "LatestEpisodes"
+    ) == response_size + len(response.content)
+    assert _sample("graphql_operation_sql_duration_seconds", "LatestEpisodes") > 0
+    assert (
+        _sample("graphql_operation_sync_to_async_duration_seconds", "LatestEpisodes")
+        > sync_to_async_duration
+    )
+
+
+def test_records_errors(client):
+    errors = _sample("graphql_operation_errors", "anonymous", "_total")
+
+    _query(client, "query { latestEpisodes(last: 100) { title } }")
+
+    assert _sample("graphql_operation_errors", "anonymous", "_total") == errors + 1
+
+
+def test_bounds_the_operation_names(client, settings):
+    settings.GRAPHQL_METRICS_MAX_OPERATIONS = 0
+
+    with mock.patch("api.metrics._operation_names", set()):
+        other = _sample("graphql_operation_duration_seconds", "other", "_count")
+
+        _query(client, "query Unknown { hello }")
+
+        assert (
+            _sample("graphql_operation_duration_seconds", "other", "_count")
+            == other + 1
+        )
+        assert _sample("graphql_operation_duration_seconds", "Unknown", "_count") == 0
+
+
+def test_metrics_endpoint(client, settings):
+    settings.METRICS_TOKEN = "secret"
+
+    _query(client, "query Hello { hello }")
+
+    response = client.get("/metrics", HTTP_AUTHORIZATION="Bearer secret")
+
+    assert response.status_code == 200
+    assert response["Content-Type"].startswith("text/plain")
+
+    content = response.content.decode()
+
+    assert 'graphql_operation_duration_seconds_count{operation="Hello"}' in content
+    assert (
+        'graphql_operation_sync_to_async_duration_seconds_count{operation="Hello"}'
+        in content
+    )
+    assert 'graphql_cache_hits_total{cache="document"}' in content
+
+
+def test_metrics_endpoint_is_private(client, settings, django_user_model):
+    settings.METRICS_TOKEN = "secret"
+
+    assert client.get("/metrics").status_code == 403
+    assert client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong").status_code == 403
+
+    settings.METRICS_TOKEN = ""
+
+    # without a token only superusers can read the metrics
+    assert client.get("/metrics", HTTP_AUTHORIZATION="Bearer ").status_code == 403
+
+    client.force_login(
+        django_user_model.objects.create_superuser(
+            email="admin@example.com", password="password", name="Admin"
+        )
+    )
+
+    assert client.get("/metrics").status_code == 200
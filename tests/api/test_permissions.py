@@ -0,0 +1,87 @@
+from unittest import mock
+
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.authentication.permissions import IsAuthenticated
+from db.models import Podcast
+
+
+pytestmark = pytest.mark.django_db
+
+FIND_PODCASTS_QUERY = """
+    query FindPodcasts {
+        findPodcasts(query: "Podcast", first: 20) {
+            edges {
+                node {
+                    title
+                    isSubscribed
+                }
+            }
+        }
+    }
+"""
+
+
+def _count_queries(queries, table):
+    return sum(f'"{table}"' in query["sql"] for query in queries)
+
+
+def test_fetches_the_user_once_per_request(logged_in_client):
+    podcasts = Podcast.objects.bulk_create(
+        Podcast(title=f"Podcast {i}") for i in range(20)
+    )
+    podcasts[0].subscribers.add(logged_in_client.user)
+
+    with CaptureQueriesContext(connection) as queries:
+        response = logged_in_client.post(
+            "/graphql", {"query": FIND_PODCASTS_QUERY}, content_type="application/json"
+        )
+
+    edges = response.json()["data"]["findPodcasts"]["edges"]
+
+    assert len(edges) == 20
+    assert sum(edge["node"]["isSubscribed"] for edge in edges) == 1
+
+    assert _count_queries(queries, "django_session") == 1
+    assert _count_queries(queries, "users_user") == 1
+
+
+def test_checks_permissions_once_per_request(logged_in_client):
+    Podcast.objects.bulk_create(Podcast(title=f"Podcast {i}") for i in range(20))
+
+    with mock.patch.object(
+        IsAuthenticated,
+        "has_request_permission",
+        autospec=True,
+        side_effect=IsAuthenticated.has_request_permission,
+    ) as has_request_permission:
+        response = logged_in_client.post(
+            "/graphql", {"query": FIND_PODCASTS_QUERY}, content_type="application/json"
+        )
+
+    assert len(response.json()["data"]["findPodcasts"]["edges"]) == 20
+    assert has_request_permission.call_count == 1
+
+
+def test_not_authenticated(client):
+    Podcast.objects.create(title="Podcast")
+
+    response = client.post(
+        "/graphql", {"query": FIND_PODCASTS_QUERY}, content_type="application/json"
+    )
+
+    assert response.json()["errors"][0]["message"] == "User is not authenticated"
+
+
+def test_query_budget(assert_query_budget, logged_in_client):
+    def seed(size):
+        podcasts = Podcast.objects.bulk_create(
+            Podcast(title=f"Podcast {number}") for number in range(size)
+        )
+        logged_in_client.user.subscribed_podcasts.add(*podcasts[::2])
+
+    # the session, the user, the podcasts and their subscriptions
+    assert_query_budget(FIND_PODCASTS_QUERY, seed, budget=4, client=logged_in_client)
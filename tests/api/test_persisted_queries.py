@@ -0,0 +1,193 @@
+import hashlib
+import json
+from unittest import mock
+
+import pytest
+
+from typer.testing import CliRunner
+
+from api.persisted_queries import persisted_queries
+from cli import app
+from db.cache import LRUCache
+from db.models import PersistedQuery, Podcast
+
+
+pytestmark = pytest.mark.django_db
+
+QUERY = """
+    query FindPodcastById($id: ID!) {
+        podcast(id: $id) {
+            title
+        }
+    }
+"""
+
+QUERY_HASH = hashlib.sha256(QUERY.encode()).hexdigest()
+
+
+@pytest.fixture(autouse=True)
+def clear_persisted_queries():
+    persisted_queries.cache.clear()
+
+    yield
+
+    persisted_queries.cache.clear()
+
+
+@pytest.fixture
+def podcast():
+    return Podcast.objects.create(title="Talk Python")
+
+
+def _extensions(hash=QUERY_HASH):
+    return {"persistedQuery": {"version": 1, "sha256Hash": hash}}
+
+
+def _post(client, **data):
+    return client.post("/graphql", data, content_type="application/json")
+
+
+def test_unknown_hash(client, podcast):
+    response = _post(client, extensions=_extensions(), variables={"id": podcast.id})
+
+    assert response.json() == {
+        "data": None,
+        "errors": [
+            {
+                "message": "PersistedQueryNotFound",
+                "extensions": {"code": "PERSISTED_QUERY_NOT_FOUND"},
+            }
+        ],
+    }
+
+
+def test_persists_queries(client, podcast):
+    expected = {"data": {"podcast": {"title": "Talk Python"}}, "extensions": mock.ANY}
+    variables = {"id": str(podcast.id)}
+
+    response = _post(client, query=QUERY, extensions=_extensions(), variables=variables)
+
+    assert response.json() == expected
+
+    response = _post(client, extensions=_extensions(), variables=variables)
+
+    assert response.json() == expected
+
+    response = client.get(
+        "/graphql",
+        {
+            "extensions": json.dumps(_extensions()),
+            "variables": json.dumps(variables),
+        },
+        HTTP_ACCEPT="*/*",
+    )
+
+    assert response.json() == expected
+
+
+def test_rejects_wrong_hashes(client, podcast):
+    response = _post(
+        client,
+        query=QUERY,
+        extensions=_extensions("not-the-hash"),
+        variables={"id": str(podcast.id)},
+    )
+
+    assert response.json()["errors"][0]["message"] == (
+        "provided sha does not match query"
+    )
+    assert QUERY_HASH not in persisted_queries.cache
+
+
+def test_evicts_least_recently_used_queries(client, podcast, monkeypatch):
+    monkeypatch.setattr(persisted_queries, "cache", LRUCache(1))
+
+    other_query = "query { hello }"
+    other_hash = hashlib.sha256(other_query.encode()).hexdigest()
+
+    _post(client, query=QUERY, extensions=_extensions(), variables={"id": podcast.id})
+    _post(client, query=other_query, extensions=_extensions(other_hash))
+
+    response = _post(client, extensions=_extensions(), variables={"id": podcast.id})
+
+    assert response.json()["errors"][0]["message"] == "PersistedQueryNotFound"
+
+    response = _post(client, extensions=_extensions(other_hash))
+
+    assert response.json() == {
+        "data": {"hello": "Hello World!"},
+        "extensions": mock.ANY,
+    }
+
+
+def test_stores_queries_in_the_database(client, podcast, settings):
+    settings.PERSISTED_QUERIES_DATABASE = True
+
+    _post(client, query=QUERY, extensions=_extensions(), variables={"id": podcast.id})
+
+    assert PersistedQuery.objects.get().hash == QUERY_HASH
+
+    # as if the query was persisted by another process
+    persisted_queries.cache.clear()
+
+    response = _post(client, extensions=_extensions(), variables={"id": podcast.id})
+
+    assert response.json() == {
+        "data": {"podcast": {"title": "Talk Python"}},
+        "extensions": mock.ANY,
+    }
+
+
+def test_doesnt_store_invalid_queries_in_the_database(client, settings):
+    settings.PERSISTED_QUERIES_DATABASE = True
+
+    for query in ("query {", "query { missingField }"):
+        _post(
+            client,
+            query=query,
+            extensions=_extensions(hashlib.sha256(query.encode()).hexdigest()),
+        )
+
+    assert not PersistedQuery.objects.exists()
+
+
+def test_database_is_bounded(client, podcast, settings):
+    settings.PERSISTED_QUERIES_DATABASE = True
+    settings.PERSISTED_QUERIES_DATABASE_MAX_SIZE = 1
+    PersistedQuery.objects.create(hash="0" * 64, query="query { hello }")
+
+    response = _post(
+        client, query=QUERY, extensions=_extensions(), variables={"id": podcast.id}
+    )
+
+    # the query still runs, it's only kept in memory
+    assert response.json()["data"] == {"podcast": {"title": "Talk Python"}}
+    assert PersistedQuery.objects.count() == 1
+
+
+def test_allowlist_only(client, podcast, settings, tmp_path):
+    settings.PERSISTED_QUERIES_ALLOWLIST_ONLY = True
+    variables = {"id": str(podcast.id)}
+
+    response = _post(client, query=QUERY, variables=variables)
+
+    assert response.json()["errors"][0]["message"] == "PersistedQueryNotAllowed"
+
+    response = _post(client, query=QUERY, extensions=_extensions(), variables=variables)
+
+    assert response.json()["errors"][0]["message"] == "PersistedQueryNotAllowed"
+    assert not PersistedQuery.objects.exists()
+
+    query_file = tmp_path / "query.graphql"
+    query_file.write_text(QUERY)
+
+    result = CliRunner().invoke(app, ["persist-queries", str(query_file)])
+
+    assert result.exit_code == 0, result.output
+
+    response = _post(client, extensions=_extensions(), variables=variables)
+
+    assert response.json() == {
+        "data": {"podcast": {"title": "Talk Python"}},
+        "extensions": mock.ANY,
+    }
@@ -1,5 +1,10 @@
+import uuid
+from unittest import mock
+
 import pytest
 
+from db.models import Episode, Podcast
+
 
 pytestmark = pytest.mark.django_db
 
@@ -14,11 +19,28 @@ FIND_PODCAST_BY_ID_QUERY = """
 
 
 def test_returns_none_when_there_is_no_podcast(client):
-    ...
+    response = client.post(
+        "/graphql",
+        {"query": FIND_PODCAST_BY_ID_QUERY, "variables": {"id": str(uuid.uuid4())}},
+        content_type="application/json",
+    )
+
+    assert response.json() == {"data": {"podcast": None}, "extensions": mock.ANY}
 
 
 def test_finds_podcast(client):
-    ...
+    podcast = Podcast.objects.create(title="Talk Python")
+
+    response = client.post(
+        "/graphql",
+        {"query": FIND_PODCAST_BY_ID_QUERY, "variables": {"id": str(podcast.id)}},
+        content_type="application/json",
+    )
+
+    assert response.json() == {
+        "data": {"podcast": {"id": str(podcast.id), "title": "Talk Python"}},
+        "extensions": mock.ANY,
+    }
 
 
 FIND_PODCAST_WITH_EPISODES_QUERY = """
@@ -40,4 +62,60 @@ FIND_PODCAST_WITH_EPISODES_QUERY = """
 
 
 def tests_returns_episodes(client):
-    ...
+    podcast = Podcast.objects.create(title="Talk Python")
+    episode = Episode.objects.create(podcast=podcast, title="Episode 1")
+    Episode.objects.create(podcast=podcast, title="Episode 2")
+
+    response = client.post(
+        "/graphql",
+        {
+            "query": FIND_PODCAST_WITH_EPISODES_QUERY,
+            "variables": {"id": str(podcast.id)},
+        },
+        content_type="application/json",
+    )
+
+    assert response.json() == {
+        "data": {
+            "podcast": {
+                "id": str(podcast.id),
+                "title": "Talk Python",
+                "episodes": {
+                    "edges": [{"node": {"id": str(episode.id), "title": "Episode 1"}}]
+                },
+            }
+        },
+        # podcast (1) + episodes (1 + first * (edges (1) + node (1)))
+        "extensions": {"cost": {"requested": 4, "maximum": 5000}},
+    }
+
+
+def test_query_budget(assert_query_budget):
+    def seed(size):
+        podcast = Podcast.objects.create(title="Talk Python")
+        Episode.objects.bulk_create(
+            Episode(podcast=podcast, title=f"Episode {number}")
+            for number in range(size)
+        )
+
+        return {"id": str(podcast.id)}
+
+    assert_query_budget(FIND_PODCAST_WITH_EPISODES_QUERY, seed, budget=3)
+
+
+@pytest.mark.parametrize("first", [-1, 51])
+def test_validates_the_number_of_episodes(client, first):
+    podcast = Podcast.objects.create(title="Talk Python")
+
+    response = client.post(
+        "/graphql",
+        {
+            "query": FIND_PODCAST_WITH_EPISODES_QUERY.replace(
+                "episodes(first: 1)", f"episodes(first: {first})"
+            ),
+            "variables": {"id": str(podcast.id)},
+        },
+        content_type="application/json",
+    )
+
+    assert response.json()["errors"][0]["message"] == "first must be between 0 and 50"
@@ -1,7 +1,30 @@
+import uuid
+
 import pytest
 
+from api.podcasts.dataloaders import create_podcast_loader, load_podcasts
+from db.models import Podcast
+
 
 @pytest.mark.asyncio
-@pytest.mark.django_db
+@pytest.mark.django_db(transaction=True)
 async def test_dataloader():
-    ...
+    first = await Podcast.objects.acreate(title="First")
+    second = await Podcast.objects.acreate(title="Second")
+    missing_id = str(uuid.uuid4())
+
+    loader = create_podcast_loader()
+
+    podcasts = await loader.load_many([str(second.id), missing_id, str(first.id)])
+
+    assert podcasts == [second, None, first]
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_load_podcasts_dedupes_ids():
+    podcast = await Podcast.objects.acreate(title="Podcast")
+
+    podcasts = await load_podcasts([str(podcast.id), str(podcast.id)])
+
+    assert podcasts == [podcast, podcast]
@@ -0,0 +1,53 @@
+from unittest import mock
+
+import pytest
+
+from django.test import override_settings
+
+from db.models import Podcast
+from db.replicas import PRIMARY_COOKIE
+
+
+pytestmark = pytest.mark.django_db
+
+
+def _post(client, query, variables=None):
+    return client.post(
+        "/graphql",
+        {"query": query, "variables": variables or {}},
+        content_type="application/json",
+    )
+
+
+def test_mutations_read_from_the_primary(logged_in_client):
+    podcast = Podcast.objects.create(title="Talk Python")
+
+    with mock.patch("api.extensions.replicas.use_primary") as use_primary:
+        _post(logged_in_client, "{ hello }")
+
+        use_primary.assert_not_called()
+
+        _post(
+            logged_in_client,
+            "mutation($id: ID!) { subscribeToPodcast(id: $id) { __typename } }",
+            {"id": str(podcast.id)},
+        )
+
+        use_primary.assert_called_once()
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"], DATABASE_REPLICA_LAG=5)
+def test_clients_read_from_the_primary_after_a_mutation(logged_in_client):
+    podcast = Podcast.objects.create(title="Talk Python")
+
+    response = _post(logged_in_client, "{ hello }")
+
+    assert PRIMARY_COOKIE not in response.cookies
+
+    response = _post(
+        logged_in_client,
+        "mutation($id: ID!) { subscribeToPodcast(id: $id) { __typename } }",
+        {"id": str(podcast.id)},
+    )
+
+    assert response.cookies[PRIMARY_COOKIE]["max-age"] == 5
@@ -0,0 +1,89 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from db.models import Episode, Podcast
+
+
+pytestmark = pytest.mark.django_db
+
+PODCAST_EPISODES_QUERY = """
+    query PodcastEpisodes($id: ID!, $withNotes: Boolean! = false) {
+        podcast(id: $id) {
+            episodes(first: 10) {
+                edges {
+                    node {
+                        ...EpisodeTitle
+                        notes @include(if: $withNotes)
+                    }
+                }
+            }
+        }
+    }
+
+    fragment EpisodeTitle on Episode {
+        title
+    }
+"""
+
+
+def _episodes_sql(client, podcast, **variables):
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(
+            "/graphql",
+            {
+                "query": PODCAST_EPISODES_QUERY,
+                "variables": {"id": str(podcast.id), **variables},
+            },
+            content_type="application/json",
+        )
+
+    (sql,) = [query["sql"] for query in queries if 'FROM "db_episode"' in query["sql"]]
+
+    return response.json()["data"]["podcast"]["episodes"]["edges"], sql
+
+
+def test_loads_only_the_selected_fields(client):
+    podcast = Podcast.objects.create(title="Python Bytes")
+    Episode.objects.create(podcast=podcast, title="Episode 1", notes="Notes")
+
+    edges, sql = _episodes_sql(client, podcast)
+
+    assert edges == [{"node": {"title": "Episode 1"}}]
+    assert '"db_episode"."title"' in sql
+    assert '"db_episode"."notes"' not in sql
+
+
+def test_loads_fields_included_by_directives(client):
+    podcast = Podcast.objects.create(title="Python Bytes")
+    Episode.objects.create(podcast=podcast, title="Episode 1", notes="Notes")
+
+    edges, sql = _episodes_sql(client, podcast, withNotes=True)
+
+    assert edges == [{"node": {"title": "Episode 1", "notes": "Notes"}}]
+    assert '"db_episode"."notes"' in sql
+
+
+def test_find_podcasts_loads_only_the_selected_fields(client):
+    Podcast.objects.create(title="Talk Python", description="A long description")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.post(
+            "/graphql",
+            {
+                "query": """
+                    query {
+                        findPodcasts(query: "python") {
+                            edges { node { title subscriberCount } }
+                        }
+                    }
+                """
+            },
+            content_type="application/json",
+        )
+
+    assert response.json()["data"]["findPodcasts"]["edges"] == [
+        {"node": {"title": "Talk Python", "subscriberCount": 0}}
+    ]
+    assert all('"db_podcast"."description"' not in query["sql"] for query in queries)
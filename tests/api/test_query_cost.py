@@ -0,0 +1,121 @@
+import pytest
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from db.models import Podcast
+
+
+pytestmark = pytest.mark.django_db
+
+FIND_PODCASTS_QUERY = """
+    query FindPodcasts($first: Int, $withEpisodes: Boolean = false) {
+        findPodcasts(query: "Podcast", first: $first) {
+            edges {
+                node {
+                    title
+                    episodes(first: 5) @include(if: $withEpisodes) {
+                        edges {
+                            node {
+                                title
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+NESTED_EPISODES_QUERY = """
+    query NestedEpisodes($id: ID!) {
+        podcast(id: $id) {
+            episodes(first: 50) {
+                edges {
+                    node {
+                        podcast {
+                            episodes(first: 50) {
+                                ...EpisodeConnection
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+    fragment EpisodeConnection on EpisodeConnection {
+        edges {
+            node {
+                title
+            }
+        }
+    }
+"""
+
+
+def _query(client, query, **variables):
+    return client.post(
+        "/graphql",
+        {"query": query, "variables": variables},
+        content_type="application/json",
+    )
+
+
+@pytest.mark.parametrize(
+    "variables, cost",
+    [
+        # findPodcasts (5) + first * (edges (1) + node (1))
+        ({}, 5 + 10 * 2),
+        ({"first": 20}, 5 + 20 * 2),
+        # + first * (episodes (1) + 5 * (edges (1) + node (1)))
+        ({"first": 20, "withEpisodes": True}, 5 + 20 * (2 + 11)),
+    ],
+)
+def test_reports_cost(client, variables, cost):
+    response = _query(client, FIND_PODCASTS_QUERY, **variables)
+
+    assert response.json() == {
+        "data": {"findPodcasts": {"edges": []}},
+        "extensions": {"cost": {"requested": cost, "maximum": 5000}},
+    }
+
+
+def test_rejects_expensive_queries(client):
+    podcast = Podcast.objects.create(title="Talk Python")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = _query(client, NESTED_EPISODES_QUERY, id=str(podcast.id))
+
+    assert response.json() == {
+        "data": None,
+        "errors": [
+            {
+                "message": "Query cost 5202 exceeds the maximum cost of 5000",
+                "extensions": {"code": "QUERY_TOO_EXPENSIVE"},
+            }
+        ],
+        "extensions": {"cost": {"requested": 5202, "maximum": 5000}},
+    }
+    # no resolver ran
+    assert len(queries) == 0
+
+
+def test_negative_limits_dont_lower_the_cost(client):
+    podcast = Podcast.objects.create(title="Talk Python")
+    query = NESTED_EPISODES_QUERY.replace(
+        "podcast(id: $id) {",
+        """x: findPodcasts(query: "Podcast", first: -100000) {
+            edges { node { title } }
+        }
+        podcast(id: $id) {""",
+        1,
+    )
+
+    response = _query(client, query, id=str(podcast.id))
+
+    # findPodcasts only costs 5
+    assert response.json()["extensions"] == {
+        "cost": {"requested": 5202 + 5, "maximum": 5000}
+    }
+    assert response.json()["data"] is None
@@ -0,0 +1,95 @@
+import logging
+
+import pytest
+
+from db.models import Episode, Podcast
+
+
+pytestmark = pytest.mark.django_db
+
+PODCAST_QUERY = """
+    query PodcastEpisodes($id: ID!) {
+        podcast(id: $id) {
+            episodes(first: 5) {
+                edges {
+                    node {
+                        title
+                    }
+                }
+            }
+        }
+    }
+"""
+
+
+class RecordsHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+@pytest.fixture
+def slow_queries():
+    logger = logging.getLogger("db.slow_queries")
+    handler = RecordsHandler()
+
+    level, handlers = logger.level, logger.handlers
+
+    # the configured handler writes from a thread, outside of pytest's capture
+    logger.handlers = [handler]
+    logger.setLevel(logging.INFO)
+    yield handler.records
+    logger.setLevel(level)
+    logger.handlers = handlers
+
+
+def _query_podcast(client):
+    podcast = Podcast.objects.create(title="Talk Python")
+    Episode.objects.create(podcast=podcast, title="Episode 1")
+
+    response = client.post(
+        "/graphql",
+        {"query": PODCAST_QUERY, "variables": {"id": str(podcast.id)}},
+        content_type="application/json",
+    )
+
+    assert "errors" not in response.json()
+
+
+def test_logs_slow_queries_with_the_operation_and_field(client, settings, slow_queries):
+    settings.SLOW_QUERY_THRESHOLD = 0
+    settings.SLOW_QUERY_SAMPLE_RATE = 0
+
+    _query_podcast(client)
+
+    records = [record for record in slow_queries if record.operation]
+
+    assert records
+    assert all(record.levelno == logging.WARNING for record in records)
+    assert all(record.slow for record in records)
+    assert {record.operation for record in records} == {"PodcastEpisodes"}
+    assert {record.path for record in records} >= {"podcast", "podcast.episodes"}
+    assert any('"db_episode"' in record.sql for record in records)
+
+
+def test_does_not_log_fast_queries(client, settings, slow_queries):
+    settings.SLOW_QUERY_THRESHOLD = 60
+    settings.SLOW_QUERY_SAMPLE_RATE = 0
+
+    _query_podcast(client)
+
+    assert slow_queries == []
+
+
+def test_logs_a_sample_of_fast_queries(client, settings, slow_queries):
+    settings.SLOW_QUERY_THRESHOLD = 60
+    settings.SLOW_QUERY_SAMPLE_RATE = 1
+
+    _query_podcast(client)
+
+    assert slow_queries
+    assert all(record.levelno == logging.INFO for record in slow_queries)
+    assert not any(record.slow for record in slow_queries)
@@ -1,5 +1,12 @@
+import uuid
+
 import pytest
 
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from db.models import Podcast
+
 
 pytestmark = pytest.mark.django_db
 
@@ -10,6 +17,7 @@ SUBSCRIBE_TO_PODCAST_MUTATION = """
             ... on SubscribeToPodcastSuccess {
                 podcast {
                     title
+                    subscriberCount
                 }
             }
             ... on PodcastDoesNotExistError {
@@ -22,18 +30,173 @@ SUBSCRIBE_TO_PODCAST_MUTATION = """
     }
 """
 
+SUBSCRIBE_TO_PODCASTS_MUTATION = """
+    mutation SubscribeToPodcasts($ids: [ID!]!) {
+        subscribeToPodcasts(ids: $ids) {
+            __typename
+            ... on SubscribeToPodcastSuccess {
+                podcast {
+                    title
+                }
+            }
+            ... on Error {
+                message
+            }
+        }
+    }
+"""
+
+
+def _subscribe(client, id):
+    return client.post(
+        "/graphql",
+        {"query": SUBSCRIBE_TO_PODCAST_MUTATION, "variables": {"id": str(id)}},
+        content_type="application/json",
+    ).json()
+
+
+def _subscribe_to_many(client, ids):
+    return client.post(
+        "/graphql",
+        {
+            "query": SUBSCRIBE_TO_PODCASTS_MUTATION,
+            "variables": {"ids": [str(id) for id in ids]},
+        },
+        content_type="application/json",
+    ).json()
+
 
 def test_errors_when_not_logged_in(client):
-    ...
+    podcast = Podcast.objects.create(title="Talk Python")
+
+    response = _subscribe(client, podcast.id)
+
+    assert response["data"] is None
+    assert response["errors"][0]["message"] == "User is not authenticated"
+    assert not podcast.subscribers.exists()
 
 
 def test_errors_when_podcast_is_missing(logged_in_client):
-    ...
+    response = _subscribe(logged_in_client, uuid.uuid4())
+
+    assert response["data"]["subscribeToPodcast"] == {
+        "__typename": "PodcastDoesNotExistError",
+        "message": "Podcast does not exist",
+    }
 
 
 def test_works(logged_in_client):
-    ...
+    podcast = Podcast.objects.create(title="Talk Python")
+
+    response = _subscribe(logged_in_client, podcast.id)
+
+    assert response["data"]["subscribeToPodcast"] == {
+        "__typename": "SubscribeToPodcastSuccess",
+        "podcast": {"title": "Talk Python", "subscriberCount": 1},
+    }
+    assert podcast.subscribers.filter(id=logged_in_client.user.id).exists()
 
 
 def test_fails_if_already_subscribed(logged_in_client):
-    ...
+    podcast = Podcast.objects.create(title="Talk Python")
+    podcast.subscribers.add(logged_in_client.user)
+
+    response = _subscribe(logged_in_client, podcast.id)
+
+    assert response["data"]["subscribeToPodcast"] == {
+        "__typename": "AlreadySubscribedToPodcastError",
+        "message": "You are already subscribed to this podcast",
+    }
+    assert podcast.subscribers.count() == 1
+
+
+def test_subscribes_with_a_single_statement(logged_in_client):
+    podcast = Podcast.objects.create(title="Talk Python")
+    table = Podcast.subscribers.through._meta.db_table
+
+    with CaptureQueriesContext(connection) as queries:
+        _subscribe(logged_in_client, podcast.id)
+
+    statements = [query["sql"] for query in queries if f'"{table}"' in query["sql"]]
+
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT")
+
+
+def test_subscribes_to_many_podcasts(logged_in_client):
+    podcasts = Podcast.objects.bulk_create(
+        Podcast(title=f"Podcast {i}") for i in range(3)
+    )
+    podcasts[1].subscribers.add(logged_in_client.user)
+
+    response = _subscribe_to_many(
+        logged_in_client, [*(podcast.id for podcast in podcasts), uuid.uuid4(), "1"]
+    )
+
+    assert "errors" not in response
+    assert [
+        result["__typename"] for result in response["data"]["subscribeToPodcasts"]
+    ] == [
+        "SubscribeToPodcastSuccess",
+        "AlreadySubscribedToPodcastError",
+        "SubscribeToPodcastSuccess",
+        "PodcastDoesNotExistError",
+        "PodcastDoesNotExistError",
+    ]
+    assert set(logged_in_client.user.subscribed_podcasts.all()) == set(podcasts)
+
+
+def test_subscribes_once_to_repeated_podcasts(logged_in_client):
+    podcast = Podcast.objects.create(title="Talk Python")
+
+    response = logged_in_client.post(
+        "/graphql",
+        {
+            "query": """
+                mutation SubscribeToPodcasts($ids: [ID!]!) {
+                    subscribeToPodcasts(ids: $ids) {
+                        __typename
+                        ... on SubscribeToPodcastSuccess {
+                            podcast {
+                                subscriberCount
+                            }
+                        }
+                    }
+                }
+            """,
+            "variables": {"ids": [str(podcast.id), str(podcast.id)]},
+        },
+        content_type="application/json",
+    ).json()
+
+    assert response["data"]["subscribeToPodcasts"] == [
+        {"__typename": "SubscribeToPodcastSuccess", "podcast": {"subscriberCount": 1}},
+        {"__typename": "AlreadySubscribedToPodcastError"},
+    ]
+    podcast.refresh_from_db()
+    assert podcast.subscriber_count == 1
+
+
+def test_subscribes_to_many_podcasts_with_a_single_statement(logged_in_client):
+    podcasts = Podcast.objects.bulk_create(
+        Podcast(title=f"Podcast {i}") for i in range(30)
+    )
+    table = Podcast.subscribers.through._meta.db_table
+
+    with CaptureQueriesContext(connection) as queries:
+        response = _subscribe_to_many(
+            logged_in_client, [podcast.id for podcast in podcasts]
+        )
+
+    assert len(response["data"]["subscribeToPodcasts"]) == 30
+    assert sum(f'"{table}"' in query["sql"] for query in queries) == 1
+    assert logged_in_client.user.subscribed_podcasts.count() == 30
+
+
+def test_limits_the_podcasts_per_request(logged_in_client):
+    response = _subscribe_to_many(logged_in_client, [uuid.uuid4()] * 101)
+
+    assert response["data"] is None
+    assert response["errors"][0]["message"] == (
+        "Can't subscribe to more than 100 podcasts at once"
+    )
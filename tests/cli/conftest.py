@@ -0,0 +1,89 @@
+import hashlib
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+
+FEEDS_DIR = Path(__file__).parent / "feeds"
+
+
+class FeedServer(ThreadingHTTPServer):
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FeedRequestHandler)
+
+        self.requests: Counter[str] = Counter()
+        # path -> number of times it should fail with a 503 before working
+        self.failures: Counter[str] = Counter()
+        # path -> content, tests can change feeds by updating this
+        self.feeds = {
+            f"/{path.name}": path.read_bytes() for path in FEEDS_DIR.glob("*.xml")
+        }
+        # whether the server sends ETags and answers conditional requests
+        self.conditional_requests = True
+        self.not_modified: Counter[str] = Counter()
+        self.request_headers: dict[str, list[dict[str, str]]] = {}
+
+    def url(self, path: str) -> str:
+        host, port = self.server_address
+
+        return f"http://{host}:{port}{path}"
+
+
+class FeedRequestHandler(BaseHTTPRequestHandler):
+    server: FeedServer
+
+    def do_GET(self):
+        self.server.requests[self.path] += 1
+        self.server.request_headers.setdefault(self.path, []).append(dict(self.headers))
+
+        if self.server.failures[self.path] > 0:
+            self.server.failures[self.path] -= 1
+            self.send_error(503)
+
+            return
+
+        content = self.server.feeds.get(self.path)
+
+        if content is None:
+            self.send_error(404)
+
+            return
+
+        etag = f'"{hashlib.sha1(content).hexdigest()}"'
+
+        if self.server.conditional_requests:
+            if self.headers.get("If-None-Match") == etag:
+                self.server.not_modified[self.path] += 1
+                self.send_response(304)
+                self.end_headers()
+
+                return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "application/rss+xml")
+        self.send_header("Content-Length", str(len(content)))
+
+        if self.server.conditional_requests:
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", "Mon, 01 Aug 2022 10:00:00 GMT")
+
+        self.end_headers()
+        self.wfile.write(content)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def feed_server():
+    server = FeedServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,34 @@
+import threading
+import time
+from unittest import mock
+
+import pytest
+
+from cli.fetch import FeedFetcher, FetchedFeed, FetchOptions
+
+
+@pytest.mark.asyncio
+async def test_busy_hosts_dont_block_the_others():
+    started = []
+    lock = threading.Lock()
+
+    def download(url, *args):
+        with lock:
+            started.append(url)
+
+        time.sleep(0.1)
+
+        return FetchedFeed(url=url)
+
+    fetcher = FeedFetcher(FetchOptions(concurrency=4, per_host=1))
+    urls = [
+        *(f"https://slow.example.com/{number}" for number in range(8)),
+        "https://fast.example.com/feed",
+    ]
+
+    with mock.patch("cli.fetch._download", download):
+        feeds = [feed.url async for feed in fetcher.fetch_all(urls)]
+
+    assert sorted(feeds) == sorted(urls)
+    # the feeds of the slow host wait for each other, not for a global slot
+    assert "https://fast.example.com/feed" in started[:2]
@@ -0,0 +1,249 @@
+from unittest import mock
+
+import pytest
+
+from typer.testing import CliRunner
+
+from cli import app
+from db.cache import DatabaseGenerations, ResultCache
+from db.models import Episode, Feed, Podcast
+
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+runner = CliRunner()
+
+NEW_EPISODE = b"""
+    <item>
+      <title>Episode 3</title>
+      <guid isPermaLink="false">python-3</guid>
+      <pubDate>Wed, 03 Aug 2022 10:00:00 +0000</pubDate>
+      <enclosure url="https://python.example.com/3.mp3" length="100" type="audio/mpeg"/>
+    </item>
+"""
+
+
+def _import_feeds(*args):
+    return runner.invoke(app, ["import-feeds", *args, "--backoff", "0"])
+
+
+def test_imports_feeds(feed_server):
+    result = _import_feeds(feed_server.url("/python.xml"), feed_server.url("/rust.xml"))
+
+    assert result.exit_code == 0, result.output
+    assert "Imported 2/2 feeds" in result.output
+
+    assert set(Podcast.objects.values_list("title", flat=True)) == {
+        "Fixture Python Podcast",
+        "Fixture Rust Podcast",
+    }
+    assert Episode.objects.filter(podcast__title="Fixture Python Podcast").count() == 2
+
+
+def test_retries_server_errors(feed_server):
+    feed_server.failures["/python.xml"] = 2
+
+    result = _import_feeds(feed_server.url("/python.xml"))
+
+    assert result.exit_code == 0, result.output
+    assert feed_server.requests["/python.xml"] == 3
+    assert Podcast.objects.count() == 1
+
+
+def test_reports_failures(feed_server):
+    feed_server.failures["/python.xml"] = 10
+
+    result = _import_feeds(
+        feed_server.url("/python.xml"),
+        feed_server.url("/missing.xml"),
+        feed_server.url("/rust.xml"),
+        "--retries",
+        "1",
+    )
+
+    assert result.exit_code == 1
+    assert "Imported 1/3 feeds" in result.output
+    assert "2 failed" in result.output
+    # 404s are not retried
+    assert feed_server.requests["/missing.xml"] == 1
+    assert feed_server.requests["/python.xml"] == 2
+
+
+def test_reimporting_updates_episodes(feed_server):
+    _import_feeds(feed_server.url("/python.xml"))
+
+    Episode.objects.filter(guid="python-1").update(title="Old title", notes="")
+
+    result = _import_feeds(feed_server.url("/python.xml"), "--force")
+
+    assert result.exit_code == 0, result.output
+    assert Episode.objects.count() == 2
+
+    episode = Episode.objects.get(guid="python-1")
+
+    assert episode.title == "Episode 1"
+    assert episode.notes == "Notes for episode 1"
+    assert episode.total_time == 60
+    assert episode.published_at.isoformat() == "2022-08-01T10:00:00+00:00"
+
+
+def test_adopts_episodes_imported_without_guid(feed_server):
+    podcast = Podcast.objects.create(title="Fixture Python Podcast")
+    legacy_episode = Episode.objects.create(podcast=podcast, title="Episode 1")
+
+    result = _import_feeds(feed_server.url("/python.xml"), "--batch-size", "1")
+
+    assert result.exit_code == 0, result.output
+    assert Episode.objects.count() == 2
+
+    legacy_episode.refresh_from_db()
+
+    assert legacy_episode.guid == "python-1"
+    assert legacy_episode.notes == "Notes for episode 1"
+
+
+def test_sends_conditional_requests(feed_server):
+    _import_feeds(feed_server.url("/python.xml"))
+
+    Episode.objects.update(title="Old title")
+
+    result = _import_feeds(feed_server.url("/python.xml"))
+
+    assert result.exit_code == 0, result.output
+    assert "Imported 1/1 feeds (1 unchanged)" in result.output
+    assert feed_server.not_modified["/python.xml"] == 1
+
+    headers = feed_server.request_headers["/python.xml"][-1]
+
+    assert headers["If-None-Match"] == Feed.objects.get().etag
+    assert headers["If-Modified-Since"] == "Mon, 01 Aug 2022 10:00:00 GMT"
+    assert set(Episode.objects.values_list("title", flat=True)) == {"Old title"}
+
+
+def test_skips_feeds_with_the_same_content(feed_server):
+    feed_server.conditional_requests = False
+
+    _import_feeds(feed_server.url("/python.xml"))
+
+    Episode.objects.update(title="Old title")
+
+    result = _import_feeds(feed_server.url("/python.xml"))
+
+    assert result.exit_code == 0, result.output
+    assert "Imported 1/1 feeds (1 unchanged)" in result.output
+    assert "If-None-Match" not in feed_server.request_headers["/python.xml"][-1]
+    assert set(Episode.objects.values_list("title", flat=True)) == {"Old title"}
+
+
+def test_only_updates_changed_episodes(feed_server):
+    _import_feeds(feed_server.url("/python.xml"))
+
+    Episode.objects.update(title="Old title")
+
+    feed_server.feeds["/python.xml"] = (
+        feed_server.feeds["/python.xml"]
+        .replace(b"<title>Episode 2</title>", b"<title>Episode 2 (updated)</title>")
+        .replace(b"</channel>", NEW_EPISODE + b"</channel>")
+    )
+
+    result = _import_feeds(feed_server.url("/python.xml"))
+
+    assert result.exit_code == 0, result.output
+    assert "Imported 1/1 feeds (0 unchanged)" in result.output
+    assert "Found 3 episodes, 2 new or changed" in result.output
+
+    assert dict(Episode.objects.values_list("guid", "title")) == {
+        "python-1": "Old title",
+        "python-2": "Episode 2 (updated)",
+        "python-3": "Episode 3",
+    }
+    assert set(Feed.objects.get().episode_fingerprints) == {
+        "python-1",
+        "python-2",
+        "python-3",
+    }
+
+
+def test_streaming_import(feed_server):
+    result = _import_feeds(
+        feed_server.url("/python.xml"), "--stream", "--batch-size", "1"
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Peak memory usage" in result.output
+
+    podcast = Podcast.objects.get()
+
+    assert podcast.description == "A podcast about Python"
+    assert dict(podcast.episode_set.values_list("guid", "title")) == {
+        "python-1": "Episode 1",
+        "python-2": "Episode 2",
+    }
+
+    Episode.objects.update(title="Old title")
+    feed_server.feeds["/python.xml"] += b"\n"
+
+    result = _import_feeds(feed_server.url("/python.xml"), "--stream")
+
+    assert result.exit_code == 0, result.output
+    assert "Found 2 episodes, 0 new or changed" in result.output
+    assert set(Episode.objects.values_list("title", flat=True)) == {"Old title"}
+
+
+def test_latest_episodes_are_fresh_after_import(feed_server, client):
+    def latest_episodes():
+        response = client.post(
+            "/graphql",
+            {"query": "query { latestEpisodes(last: 5) { title } }"},
+            content_type="application/json",
+        )
+
+        return [
+            episode["title"] for episode in response.json()["data"]["latestEpisodes"]
+        ]
+
+    _import_feeds(feed_server.url("/python.xml"))
+
+    assert latest_episodes() == ["Episode 2", "Episode 1"]
+
+    feed_server.feeds["/python.xml"] = feed_server.feeds["/python.xml"].replace(
+        b"</channel>", NEW_EPISODE + b"</channel>"
+    )
+
+    result = _import_feeds(feed_server.url("/python.xml"))
+
+    assert result.exit_code == 0, result.output
+    assert latest_episodes() == ["Episode 3", "Episode 2", "Episode 1"]
+
+
+def test_latest_episodes_are_fresh_in_other_processes_after_import(feed_server, client):
+    # the server runs in another process than `import-feeds`, with its own
+    # result cache, which only sees the invalidations through the database
+    server_cache = ResultCache(max_size=10, generations=DatabaseGenerations())
+
+    def latest_episodes():
+        response = client.post(
+            "/graphql",
+            {"query": "query { latestEpisodes(last: 5) { title } }"},
+            content_type="application/json",
+        )
+
+        return [
+            episode["title"] for episode in response.json()["data"]["latestEpisodes"]
+        ]
+
+    _import_feeds(feed_server.url("/python.xml"))
+
+    with mock.patch("db.data.result_cache", server_cache):
+        assert latest_episodes() == ["Episode 2", "Episode 1"]
+
+    feed_server.feeds["/python.xml"] = feed_server.feeds["/python.xml"].replace(
+        b"</channel>", NEW_EPISODE + b"</channel>"
+    )
+
+    result = _import_feeds(feed_server.url("/python.xml"))
+
+    assert result.exit_code == 0, result.output
+
+    with mock.patch("db.data.result_cache", server_cache):
+        assert latest_episodes() == ["Episode 3", "Episode 2", "Episode 1"]
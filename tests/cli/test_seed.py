@@ -0,0 +1,86 @@
+import pytest
+
+from typer.testing import CliRunner
+
+from cli import app
+from db.models import Episode, Podcast
+from users.models import User
+
+
+pytestmark = pytest.mark.django_db(transaction=True)
+
+runner = CliRunner()
+
+
+def _seed(*args):
+    return runner.invoke(
+        app,
+        [
+            "seed",
+            "--podcasts",
+            "5",
+            "--episodes",
+            "30",
+            "--users",
+            "4",
+            "--subscriptions",
+            "2",
+            *args,
+        ],
+    )
+
+
+def _rows():
+    return (
+        set(Podcast.objects.values_list("id", "title")),
+        set(Episode.objects.values_list("id", "podcast_id", "title", "published_at")),
+        set(User.objects.values_list("email", "name")),
+        set(
+            Podcast.subscribers.through.objects.values_list("user__email", "podcast_id")
+        ),
+    )
+
+
+def test_seeds_the_database():
+    result = _seed()
+
+    assert result.exit_code == 0, result.output
+    assert "Created 47 rows" in result.output
+
+    assert Podcast.objects.count() == 5
+    assert Episode.objects.count() == 30
+    assert User.objects.count() == 4
+    assert Podcast.subscribers.through.objects.count() == 8
+    assert User.objects.first().check_password("password")
+
+
+def test_seeding_again_does_not_create_rows():
+    _seed()
+    rows = _rows()
+
+    result = _seed()
+
+    assert result.exit_code == 0, result.output
+    assert "Created 0 rows (47 attempted)" in result.output
+    assert _rows() == rows
+
+
+def test_rows_do_not_depend_on_the_batch_size():
+    _seed("--batch-size", "7")
+    rows = _rows()
+
+    Podcast.objects.all().delete()
+    User.objects.all().delete()
+
+    _seed("--batch-size", "1000")
+
+    assert _rows() == rows
+
+
+def test_different_seeds_create_different_rows():
+    _seed()
+
+    _seed("--seed", "1")
+
+    assert Podcast.objects.count() == 10
+    assert Episode.objects.count() == 60
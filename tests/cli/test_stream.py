@@ -0,0 +1,36 @@
+import io
+from pathlib import Path
+
+import pytest
+
+import podcastparser
+
+from cli.stream import parse_in_chunks
+
+
+FEED = (Path(__file__).parent / "feeds" / "python.xml").read_bytes()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3])
+def test_parse_in_chunks(chunk_size):
+    chunks = list(parse_in_chunks("https://example.com", io.BytesIO(FEED), chunk_size))
+    episodes = [episode for _, chunk in chunks for episode in chunk]
+
+    assert all(len(chunk) <= chunk_size for _, chunk in chunks)
+    assert [episode["guid"] for episode in episodes] == ["python-1", "python-2"]
+
+    podcast, _ = chunks[-1]
+    expected = podcastparser.parse("https://example.com", io.BytesIO(FEED))
+
+    assert podcast["title"] == expected["title"]
+    assert podcast["description"] == expected["description"]
+    assert sorted(episodes, key=lambda episode: episode["guid"]) == sorted(
+        expected["episodes"], key=lambda episode: episode["guid"]
+    )
+
+
+def test_parse_in_chunks_invalid_feed():
+    with pytest.raises(podcastparser.FeedParseError) as exc_info:
+        list(parse_in_chunks("https://example.com", io.BytesIO(FEED[:-20]), 1))
+
+    assert exc_info.value.getLineNumber() > 1
@@ -0,0 +1,30 @@
+import logging
+
+import pytest
+
+from query_budget import QueryBudget
+
+from db.data import result_cache
+
+
+@pytest.fixture(autouse=True, scope="session")
+def quiet_sampled_queries():
+    # sampled queries are written by a background thread, which pytest can't
+    # capture
+    logging.getLogger("db.slow_queries").setLevel(logging.WARNING)
+
+
+@pytest.fixture(autouse=True)
+def clear_result_cache():
+    # rolling back the database doesn't invalidate cached results
+    result_cache.clear()
+    yield
+    result_cache.clear()
+
+
+@pytest.fixture
+def assert_query_budget(db, client) -> QueryBudget:
+    """Checks that a GraphQL operation doesn't have N+1 queries, see
+    `query_budget.QueryBudget`."""
+
+    return QueryBudget(client)
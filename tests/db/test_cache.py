@@ -0,0 +1,163 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from db.cache import LRUCache, ResultCache
+
+
+def test_lru_cache_drops_least_recently_used():
+    cache = LRUCache(max_size=2)
+
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert "a" in cache
+    assert "b" not in cache
+    assert "c" in cache
+
+
+def test_lru_cache_is_bounded_by_bytes():
+    cache = LRUCache(max_size=100, max_bytes=200)
+
+    for key in range(10):
+        cache.set(key, "x" * 50)
+
+    assert cache.bytes <= 200
+    assert 0 < len(cache) < 10
+    assert 9 in cache
+
+    # values that don't fit are not cached
+    cache.set("big", "x" * 500)
+
+    assert "big" not in cache
+
+
+def test_lru_cache_expires_values():
+    cache = LRUCache(max_size=10, ttl=60)
+
+    with mock.patch("time.monotonic", return_value=0):
+        cache.set("a", 1)
+
+    with mock.patch("time.monotonic", return_value=59):
+        assert cache.get("a") == 1
+
+    with mock.patch("time.monotonic", return_value=60):
+        assert cache.get("a") is None
+
+    assert len(cache) == 0
+
+
+@pytest.mark.asyncio
+async def test_result_cache_invalidation():
+    cache = ResultCache(max_size=10)
+    fetch = mock.AsyncMock(side_effect=["first", "second", "third"])
+
+    assert await cache.get_or_set("podcast", "1", fetch) == "first"
+    assert await cache.get_or_set("podcast", "1", fetch) == "first"
+
+    cache.invalidate("podcast", "1")
+
+    assert await cache.get_or_set("podcast", "1", fetch) == "second"
+
+    cache.invalidate("podcast")
+
+    assert await cache.get_or_set("podcast", "1", fetch) == "third"
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 3,
+        "hit_rate": 0.25,
+        "entries": 1,
+        "bytes": 0,
+    }
+
+
+@pytest.mark.asyncio
+async def test_result_cache_doesnt_cache_results_invalidated_while_fetching():
+    cache = ResultCache(max_size=10)
+    fetching = asyncio.Event()
+    invalidated = asyncio.Event()
+
+    async def fetch():
+        fetching.set()
+        await invalidated.wait()
+
+        return "stale"
+
+    task = asyncio.create_task(cache.get_or_set("podcast", "1", fetch))
+
+    await fetching.wait()
+    cache.invalidate("podcast", "1")
+    invalidated.set()
+
+    assert await task == "stale"
+    assert cache.stats()["entries"] == 0
+
+
+@pytest.mark.asyncio
+async def test_result_cache_doesnt_cache_results_until_replicas_catch_up():
+    cache = ResultCache(max_size=10, replication_lag=5)
+    fetch = mock.AsyncMock(side_effect=["first", "stale", "second"])
+
+    with mock.patch("time.monotonic", return_value=0):
+        await cache.get_or_set("podcast", "1", fetch)
+        cache.invalidate("podcast", "1")
+
+    # a replica could still have the old data
+    with mock.patch("time.monotonic", return_value=4):
+        assert await cache.get_or_set("podcast", "1", fetch) == "stale"
+
+    with mock.patch("time.monotonic", return_value=5):
+        assert await cache.get_or_set("podcast", "1", fetch) == "second"
+        assert await cache.get_or_set("podcast", "1", fetch) == "second"
+
+
+class _Generations:
+    def __init__(self):
+        self.generations = {}
+
+    async def aget(self, namespace):
+        return self.generations.get(namespace, 0)
+
+    def incr(self, namespace):
+        self.generations[namespace] = self.generations.get(namespace, 0) + 1
+
+
+@pytest.mark.asyncio
+async def test_result_cache_is_invalidated_by_other_processes():
+    generations = _Generations()
+    cache = ResultCache(max_size=10, generations=generations)
+    other_process_cache = ResultCache(max_size=10, generations=generations)
+    fetch = mock.AsyncMock(side_effect=["first", "second"])
+
+    assert await cache.get_or_set("podcast", "1", fetch) == "first"
+
+    other_process_cache.invalidate("podcast", "1")
+
+    assert await cache.get_or_set("podcast", "1", fetch) == "second"
+    assert await cache.get_or_set("podcast", "1", fetch) == "second"
+
+
+@pytest.mark.asyncio
+async def test_result_cache_counts_shared_cache_hits(settings):
+    settings.CACHES = {
+        **settings.CACHES,
+        "results": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"},
+    }
+    cache = ResultCache(max_size=10, backend="results")
+    other_process_cache = ResultCache(max_size=10, backend="results")
+    fetch = mock.AsyncMock(return_value="first")
+
+    await cache.get_or_set("podcast", "1", fetch)
+    await other_process_cache.get_or_set("podcast", "1", fetch)
+
+    assert fetch.await_count == 1
+    assert other_process_cache.stats()["hits"] == 1
+
+    other_process_cache.invalidate("podcast", "1")
+
+    await cache.get_or_set("podcast", "1", fetch)
+
+    assert fetch.await_count == 2
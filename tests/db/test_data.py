@@ -0,0 +1,165 @@
+import pytest
+
+from db import data
+from db.models import Episode, Podcast
+
+
+pytestmark = [pytest.mark.asyncio, pytest.mark.django_db(transaction=True)]
+
+
+async def test_find_podcast_by_id():
+    podcast = await Podcast.objects.acreate(title="Rust in Production")
+
+    assert await data.find_podcast_by_id(str(podcast.id)) == podcast
+
+
+async def test_find_podcast_by_id_normalizes_the_id():
+    podcast = await Podcast.objects.acreate(title="Rust in Production")
+
+    await data.find_podcast_by_id(podcast.id.hex.upper())
+
+    podcast.title = "Rust in Prod"
+    await podcast.asave()
+
+    cached = await data.find_podcast_by_id(podcast.id.hex.upper())
+
+    assert cached.title == "Rust in Prod"
+    assert await data.find_podcast_by_id("not-an-id") is None
+
+
+async def test_find_podcasts_paginates():
+    for title in ("A", "B", "C"):
+        await Podcast.objects.acreate(title=title)
+
+    first_page = await data.find_podcasts(first=2)
+
+    assert [edge.node.title for edge in first_page.edges] == ["A", "B"]
+    assert first_page.page_info.has_next_page
+    assert not first_page.page_info.has_previous_page
+
+    second_page = await data.find_podcasts(
+        first=2, after=first_page.page_info.end_cursor
+    )
+
+    assert [edge.node.title for edge in second_page.edges] == ["C"]
+    assert not second_page.page_info.has_next_page
+    assert second_page.page_info.has_previous_page
+
+
+async def test_find_latest_episodes():
+    podcast = await Podcast.objects.acreate(title="Python Bytes")
+
+    for title in ("1", "2", "3"):
+        await Episode.objects.acreate(podcast=podcast, title=title)
+
+    episodes = await data.find_latest_episodes(last=2)
+
+    assert [episode.title for episode in episodes] == ["3", "2"]
+
+
+async def test_find_latest_episodes_loads_only_the_given_fields():
+    podcast = await Podcast.objects.acreate(title="Python Bytes")
+    await Episode.objects.acreate(podcast=podcast, title="1", notes="Notes")
+
+    (episode,) = await data.find_latest_episodes(last=1, fields=["title"])
+
+    # the ordering and the primary key are always loaded
+    assert episode.get_deferred_fields() == {
+        field.attname
+        for field in Episode._meta.concrete_fields
+        if field.name not in ("id", "title", "published_at")
+    }
+    # and different fields aren't cached together
+    (episode,) = await data.find_latest_episodes(last=1, fields=["notes"])
+
+    assert episode.notes == "Notes"
+
+
+async def test_paginate_podcast():
+    for title in ("A", "B", "C"):
+        await Podcast.objects.acreate(title=title)
+
+    page = await data.paginate_podcast(page=2, per_page=2)
+
+    assert len(page.object_list) == 1
+    assert not page.has_next()
+
+
+async def test_subscribe_to_podcast(django_user_model):
+    podcast = await Podcast.objects.acreate(title="Talk Python")
+    user = await django_user_model.objects.acreate(email="demo@example.com")
+
+    await data.subscribe_to_podcast(user, podcast)
+
+    assert await podcast.subscribers.acontains(user)
+
+    with pytest.raises(data.AlreadySubscribedToPodcastError):
+        await data.subscribe_to_podcast(user, podcast)
+
+
+async def test_subscribe_to_podcasts(django_user_model):
+    subscribed = await Podcast.objects.acreate(title="Talk Python")
+    podcast = await Podcast.objects.acreate(title="Python Bytes")
+    user = await django_user_model.objects.acreate(email="demo@example.com")
+    await subscribed.subscribers.aadd(user)
+    missing = "4b9c1c8e-9d8e-4c1e-8f4f-0c4a0e6d6f00"
+
+    assert await data.subscribe_to_podcasts(
+        user, [str(subscribed.id), str(podcast.id), missing]
+    ) == {str(podcast.id)}
+    assert await podcast.subscribers.acontains(user)
+
+
+async def test_find_first_episodes_for_podcasts():
+    python = await Podcast.objects.acreate(title="Python")
+    rust = await Podcast.objects.acreate(title="Rust")
+    empty = await Podcast.objects.acreate(title="Empty")
+
+    for title in ("C", "A", "B"):
+        await Episode.objects.acreate(podcast=python, title=title)
+
+    await Episode.objects.acreate(podcast=rust, title="A")
+
+    pages = await data.find_first_episodes_for_podcasts(
+        [str(python.id), str(rust.id), str(empty.id)], first=2
+    )
+
+    assert [edge.node.title for edge in pages[str(python.id)].edges] == ["A", "B"]
+    assert pages[str(python.id)].page_info.has_next_page
+    assert [edge.node.title for edge in pages[str(rust.id)].edges] == ["A"]
+    assert not pages[str(rust.id)].page_info.has_next_page
+    assert pages[str(empty.id)].edges == []
+
+    # cursors can be used to fetch the following page one podcast at a time
+    next_page = await data.get_episodes_for_podcast(
+        str(python.id), first=2, after=pages[str(python.id)].page_info.end_cursor
+    )
+
+    assert [edge.node.title for edge in next_page.edges] == ["C"]
+
+
+async def test_find_podcast_by_id_is_invalidated_when_the_podcast_changes():
+    podcast = await Podcast.objects.acreate(title="Rust in Production")
+
+    await data.find_podcast_by_id(str(podcast.id))
+
+    podcast.title = "Rust in Prod"
+    await podcast.asave()
+
+    cached = await data.find_podcast_by_id(str(podcast.id))
+
+    assert cached.title == "Rust in Prod"
+
+
+async def test_find_latest_episodes_is_cached():
+    podcast = await Podcast.objects.acreate(title="Python Bytes")
+    await Episode.objects.acreate(podcast=podcast, title="1")
+
+    await data.find_latest_episodes(last=5)
+    await data.find_latest_episodes(last=5)
+
+    assert data.result_cache.stats()["hits"] == 1
+
+    await Episode.objects.acreate(podcast=podcast, title="2")
+
+    assert len(await data.find_latest_episodes(last=5)) == 2
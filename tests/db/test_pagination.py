@@ -0,0 +1,118 @@
+import pytest
+
+from db.models import Podcast
+from db.pagination import InvalidCursorError, paginate
+
+
+pytestmark = pytest.mark.django_db
+
+
+def _titles(paginated_data):
+    return [edge.node.title for edge in paginated_data.edges]
+
+
+@pytest.fixture
+def podcasts():
+    return [Podcast.objects.create(title=title) for title in "ABCDE"]
+
+
+def test_paginates_forward(podcasts):
+    ordering = ("title", "-id")
+
+    first_page = paginate(Podcast.objects.all(), ordering, first=2)
+
+    assert _titles(first_page) == ["A", "B"]
+    assert first_page.page_info.has_next_page
+    assert not first_page.page_info.has_previous_page
+    assert first_page.page_info.end_cursor == first_page.edges[-1].cursor
+
+    last_page = paginate(
+        Podcast.objects.all(), ordering, first=3, after=first_page.edges[-1].cursor
+    )
+
+    assert _titles(last_page) == ["C", "D", "E"]
+    assert not last_page.page_info.has_next_page
+    assert last_page.page_info.has_previous_page
+
+
+def test_paginates_backwards(podcasts):
+    ordering = ("title", "-id")
+
+    last_page = paginate(Podcast.objects.all(), ordering, last=2)
+
+    assert _titles(last_page) == ["D", "E"]
+    assert last_page.page_info.has_previous_page
+    assert not last_page.page_info.has_next_page
+
+    previous_page = paginate(
+        Podcast.objects.all(),
+        ordering,
+        last=5,
+        before=last_page.page_info.start_cursor,
+    )
+
+    assert _titles(previous_page) == ["A", "B", "C"]
+    assert not previous_page.page_info.has_previous_page
+    assert previous_page.page_info.has_next_page
+
+
+def test_paginates_between_cursors(podcasts):
+    ordering = ("title", "-id")
+    edges = paginate(Podcast.objects.all(), ordering, first=5).edges
+
+    page = paginate(
+        Podcast.objects.all(),
+        ordering,
+        first=5,
+        after=edges[0].cursor,
+        before=edges[3].cursor,
+    )
+
+    assert _titles(page) == ["B", "C"]
+
+
+def test_handles_duplicated_values_in_ordering():
+    podcasts = [Podcast.objects.create(title="Same") for _ in range(3)]
+    ordering = ("title", "-id")
+
+    first_page = paginate(Podcast.objects.all(), ordering, first=2)
+    second_page = paginate(
+        Podcast.objects.all(), ordering, first=2, after=first_page.edges[-1].cursor
+    )
+
+    ids = [edge.node.id for edge in first_page.edges + second_page.edges]
+
+    assert sorted(ids, reverse=True) == ids
+    assert set(ids) == {podcast.id for podcast in podcasts}
+
+
+def test_fails_with_invalid_cursor():
+    with pytest.raises(InvalidCursorError):
+        paginate(Podcast.objects.all(), ("title", "-id"), after="not a cursor")
+
+
+def test_ordering_must_end_with_a_unique_field():
+    with pytest.raises(ValueError, match="must be unique"):
+        paginate(Podcast.objects.all(), ("title",))
+
+
+def test_returns_the_first_page_by_default():
+    Podcast.objects.bulk_create(Podcast(title=f"{number:02}") for number in range(12))
+
+    page = paginate(Podcast.objects.all(), ("title", "-id"))
+
+    assert _titles(page) == [f"{number:02}" for number in range(10)]
+    assert page.page_info.has_next_page
+
+
+def test_cannot_use_first_and_last():
+    with pytest.raises(ValueError):
+        paginate(Podcast.objects.all(), ("title", "-id"), first=2, last=2)
+
+
+def test_page_size_cant_be_negative():
+    with pytest.raises(ValueError, match="first can't be negative"):
+        paginate(Podcast.objects.all(), ("title", "-id"), first=-1)
+
+    with pytest.raises(ValueError, match="last can't be negative"):
+        paginate(Podcast.objects.all(), ("title", "-id"), last=-1)
@@ -0,0 +1,41 @@
+from unittest import mock
+
+import pytest
+
+from django.core.management import CommandError, call_command
+
+from db.management.commands.check_query_plans import QueryShape, get_query_shapes
+from db.models import Episode
+
+
+pytestmark = pytest.mark.django_db
+
+
+def test_queries_use_indexes(capsys):
+    call_command("check_query_plans")
+
+    output = capsys.readouterr().out
+
+    assert "find_latest_episodes: OK" in output
+    assert "get_episodes_for_podcast: OK" in output
+    assert "FAILED" not in output
+
+
+def test_fails_when_a_query_sorts_without_an_index(capsys):
+    shapes = [
+        *get_query_shapes(),
+        QueryShape("episodes_by_notes", Episode.objects.order_by("notes")[:10]),
+    ]
+
+    with mock.patch(
+        "db.management.commands.check_query_plans.get_query_shapes",
+        return_value=shapes,
+    ):
+        with pytest.raises(CommandError, match="1 queries don't use an index"):
+            call_command("check_query_plans")
+
+    output = capsys.readouterr().out
+
+    assert "episodes_by_notes: FAILED" in output
+    assert "full scan: SCAN db_episode" in output
+    assert "sort: USE TEMP B-TREE FOR ORDER BY" in output
@@ -0,0 +1,151 @@
+import sqlite3
+from collections import Counter
+from contextlib import closing
+
+import pytest
+
+from django.core.management import CommandError, call_command
+from django.db import DEFAULT_DB_ALIAS
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from db.management.commands.replicate_sqlite import copy_sqlite_database
+from db.models import Podcast
+from db.replicas import (
+    PRIMARY_COOKIE,
+    ReplicaMiddleware,
+    ReplicaRouter,
+    ReplicaState,
+    WeightedRoundRobin,
+    current_state,
+)
+
+
+@pytest.fixture
+def state():
+    state = ReplicaState()
+    token = current_state.set(state)
+    yield state
+    current_state.reset(token)
+
+
+@pytest.fixture
+def router():
+    with override_settings(
+        DATABASE_REPLICAS=["replica_1", "replica_2"], DATABASE_REPLICA_WEIGHTS={}
+    ):
+        yield ReplicaRouter()
+
+
+def test_round_robin():
+    replicas = WeightedRoundRobin({"a": 1, "b": 1})
+
+    assert [next(replicas) for _ in range(4)] == ["a", "b", "a", "b"]
+
+
+def test_weighted_round_robin_spreads_the_keys():
+    replicas = WeightedRoundRobin({"a": 3, "b": 1, "c": 0})
+    picks = [next(replicas) for _ in range(8)]
+
+    assert Counter(picks) == {"a": 6, "b": 2}
+    # "b" isn't only picked at the end of each cycle
+    assert picks[:4] == ["a", "a", "b", "a"]
+
+
+def test_weights_cant_be_negative():
+    with pytest.raises(ValueError):
+        WeightedRoundRobin({"a": -1})
+
+
+def test_reads_go_to_the_replicas_in_turn(router, state):
+    assert [router.db_for_read(Podcast) for _ in range(3)] == [
+        "replica_1",
+        "replica_2",
+        "replica_1",
+    ]
+
+
+def test_reads_stick_to_the_primary_after_a_write(router, state):
+    assert router.db_for_write(Podcast) == DEFAULT_DB_ALIAS
+    assert router.db_for_read(Podcast) == DEFAULT_DB_ALIAS
+    assert state.wrote
+
+
+@pytest.mark.django_db
+def test_reads_in_transactions_go_to_the_primary(router, state):
+    # tests run in a transaction
+    assert router.db_for_read(Podcast) == DEFAULT_DB_ALIAS
+
+
+def test_reads_go_to_the_primary_without_replicas(state):
+    assert ReplicaRouter().db_for_read(Podcast) is None
+
+
+def test_replicas_are_not_migrated(router):
+    assert router.allow_migrate("replica_1", "db") is False
+    assert router.allow_migrate(DEFAULT_DB_ALIAS, "db") is None
+
+
+def _write(request):
+    ReplicaRouter().db_for_write(Podcast)
+
+    return HttpResponse()
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"], DATABASE_REPLICA_LAG=5)
+def test_middleware_pins_the_following_requests_after_a_write():
+    response = ReplicaMiddleware(_write)(RequestFactory().get("/"))
+
+    assert response.cookies[PRIMARY_COOKIE]["max-age"] == 5
+
+    response = ReplicaMiddleware(lambda request: HttpResponse())(
+        RequestFactory().get("/")
+    )
+
+    assert PRIMARY_COOKIE not in response.cookies
+
+
+@override_settings(DATABASE_REPLICAS=["replica_1"])
+def test_middleware_reads_from_the_primary_with_the_cookie():
+    states = []
+
+    def view(request):
+        states.append(current_state.get())
+
+        return HttpResponse()
+
+    request = RequestFactory().get("/")
+    request.COOKIES[PRIMARY_COOKIE] = "1"
+
+    ReplicaMiddleware(view)(request)
+    ReplicaMiddleware(view)(RequestFactory().get("/"))
+
+    assert [state.use_primary for state in states] == [True, False]
+
+
+def test_middleware_doesnt_pin_without_replicas():
+    response = ReplicaMiddleware(_write)(RequestFactory().get("/"))
+
+    assert PRIMARY_COOKIE not in response.cookies
+
+
+def test_copy_sqlite_database(tmp_path):
+    primary = str(tmp_path / "primary.sqlite3")
+    replica = str(tmp_path / "replica.sqlite3")
+
+    with closing(sqlite3.connect(primary)) as connection:
+        connection.execute("CREATE TABLE podcast (title TEXT)")
+        connection.execute("INSERT INTO podcast VALUES ('Talk Python')")
+        connection.commit()
+
+    copy_sqlite_database(primary, replica)
+
+    with closing(sqlite3.connect(replica)) as connection:
+        assert connection.execute("SELECT title FROM podcast").fetchall() == [
+            ("Talk Python",)
+        ]
+
+
+def test_replicate_sqlite_needs_replicas():
+    with pytest.raises(CommandError, match="no replicas"):
+        call_command("replicate_sqlite", once=True)
@@ -0,0 +1,101 @@
+import pytest
+
+from db.models import Podcast
+from db.pagination import paginate
+from db.search import get_search_backend
+
+
+pytestmark = pytest.mark.django_db
+
+
+def _search(query):
+    return get_search_backend().search(Podcast.objects.all(), query)
+
+
+def _titles(podcasts):
+    return sorted(podcast.title for podcast in podcasts)
+
+
+def test_searches_all_the_fields():
+    Podcast.objects.create(title="Talk Python")
+    Podcast.objects.create(title="Rust", subtitle="A show about python too")
+    Podcast.objects.create(title="Hosted", hosted_by="Python Software Foundation")
+    Podcast.objects.create(title="Described", description="We talk about Python")
+    Podcast.objects.create(title="Go Time")
+
+    assert _titles(_search("python")) == [
+        "Described",
+        "Hosted",
+        "Rust",
+        "Talk Python",
+    ]
+
+
+def test_matches_prefixes_and_ignores_query_syntax():
+    Podcast.objects.create(title="Talk Python")
+
+    assert _titles(_search("pyth")) == ["Talk Python"]
+    assert _titles(_search('"talk -python*')) == ["Talk Python"]
+    assert _titles(_search("---")) == []
+
+
+def test_index_follows_updates_and_deletes():
+    podcast = Podcast.objects.create(title="Talk Python")
+
+    podcast.title = "Talk Rust"
+    podcast.save()
+
+    assert _titles(_search("python")) == []
+    assert _titles(_search("rust")) == ["Talk Rust"]
+
+    podcast.delete()
+
+    assert _titles(_search("rust")) == []
+
+
+def test_can_paginate_by_relevance():
+    Podcast.objects.create(title="Python", description="python python python")
+    Podcast.objects.create(title="Mostly Python", description="python")
+    Podcast.objects.create(title="Some Python")
+    Podcast.objects.create(title="Other Python")
+
+    ordering = ("-rank", "title", "-id")
+    first_page = paginate(_search("python"), ordering, first=2)
+    second_page = paginate(
+        _search("python"), ordering, first=2, after=first_page.page_info.end_cursor
+    )
+
+    titles = [edge.node.title for edge in first_page.edges + second_page.edges]
+
+    assert titles == ["Python", "Mostly Python", "Other Python", "Some Python"]
+    assert not second_page.page_info.has_next_page
+
+
+def test_ranks_matches_in_a_single_search():
+    Podcast.objects.bulk_create(
+        Podcast(title=f"Python {number}", description="python " * (number % 5))
+        for number in range(500)
+    )
+
+    podcasts = _search("python")
+
+    # the rank is read from the joined index, not searched again for each
+    # matching podcast
+    assert str(podcasts.query).count("MATCH") == 1
+
+    ordering = ("-rank", "title", "-id")
+    seen = []
+    after = None
+
+    while True:
+        page = paginate(_search("python"), ordering, first=50, after=after)
+        seen += [edge.node for edge in page.edges]
+        after = page.page_info.end_cursor
+
+        if not page.page_info.has_next_page:
+            break
+
+    assert len({podcast.id for podcast in seen}) == 500
+    assert [podcast.rank for podcast in seen] == sorted(
+        (podcast.rank for podcast in seen), reverse=True
+    )
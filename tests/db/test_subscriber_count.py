@@ -0,0 +1,93 @@
+import pytest
+
+from django.core.management import call_command
+
+from db import data
+from db.models import Podcast
+from db.subscriber_count import reconcile_subscriber_counts
+
+
+pytestmark = pytest.mark.django_db
+
+
+@pytest.fixture
+def users(django_user_model):
+    return [
+        django_user_model.objects.create_user(
+            email=f"user-{number}@example.com", password="password", name="User"
+        )
+        for number in range(3)
+    ]
+
+
+def _subscriber_count(podcast):
+    podcast.refresh_from_db(fields=["subscriber_count"])
+
+    return podcast.subscriber_count
+
+
+def test_counts_follow_subscriptions(users):
+    podcast = Podcast.objects.create(title="Talk Python")
+
+    podcast.subscribers.add(*users)
+    assert _subscriber_count(podcast) == 3
+
+    podcast.subscribers.remove(users[0])
+    assert _subscriber_count(podcast) == 2
+
+    users[1].delete()
+    assert _subscriber_count(podcast) == 1
+
+    podcast.subscribers.clear()
+    assert _subscriber_count(podcast) == 0
+
+
+def test_counts_bulk_created_subscriptions(users):
+    podcasts = Podcast.objects.bulk_create(Podcast(title="Talk Python") for _ in users)
+
+    Podcast.subscribers.through.objects.bulk_create(
+        Podcast.subscribers.through(podcast=podcast, user=user)
+        for podcast in podcasts
+        for user in users
+    )
+
+    assert [_subscriber_count(podcast) for podcast in podcasts] == [3, 3, 3]
+
+
+@pytest.mark.asyncio
+@pytest.mark.django_db(transaction=True)
+async def test_counts_subscriptions_made_with_a_single_statement(django_user_model):
+    podcast = await Podcast.objects.acreate(title="Talk Python")
+    user = await django_user_model.objects.acreate(email="demo@example.com")
+
+    await data.subscribe_to_podcasts(user, [str(podcast.id)])
+    await data.subscribe_to_podcasts(user, [str(podcast.id)])
+
+    await podcast.arefresh_from_db(fields=["subscriber_count"])
+
+    assert podcast.subscriber_count == 1
+
+
+def test_reconcile_fixes_wrong_counts(users):
+    podcast = Podcast.objects.create(title="Talk Python")
+    other_podcast = Podcast.objects.create(title="Python Bytes")
+    podcast.subscribers.add(*users)
+
+    Podcast.objects.update(subscriber_count=10)
+
+    assert reconcile_subscriber_counts() == 2
+    assert _subscriber_count(podcast) == 3
+    assert _subscriber_count(other_podcast) == 0
+
+    assert reconcile_subscriber_counts() == 0
+
+
+def test_reconcile_command(users, capsys):
+    podcast = Podcast.objects.create(title="Talk Python")
+    podcast.subscribers.add(*users)
+    Podcast.objects.update(subscriber_count=0)
+
+    call_command("reconcile_subscriber_counts")
+
+    assert capsys.readouterr().out == "Fixed the subscriber count of 1 podcasts\n"
+    assert _subscriber_count(podcast) == 3
@@ -0,0 +1,38 @@
+import asyncio
+
+import pytest
+
+from db.thread_hops import ThreadHops, current_thread_hops, record_thread_hops
+
+
+pytestmark = pytest.mark.asyncio
+
+
+@record_thread_hops
+async def _sleep(seconds):
+    await asyncio.sleep(seconds)
+
+
+@record_thread_hops
+async def _sleep_twice(seconds):
+    await _sleep(seconds)
+    await _sleep(seconds)
+
+
+async def test_records_the_time_spent_in_calls():
+    thread_hops = ThreadHops()
+    token = current_thread_hops.set(thread_hops)
+
+    try:
+        await _sleep_twice(0.05)
+    finally:
+        current_thread_hops.reset(token)
+
+    # nested calls are only recorded once
+    assert 0.1 <= thread_hops.duration < 0.2
+
+
+async def test_doesnt_record_outside_requests():
+    await _sleep(0)
+
+    assert current_thread_hops.get() is None
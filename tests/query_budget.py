@@ -0,0 +1,96 @@
+import re
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+import pytest
+
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+
+from db.data import result_cache
+
+
+# seeds the data for the given size, and returns the variables of the
+# operation (or None)
+Seed = Callable[[int], Optional[Dict[str, Any]]]
+
+
+def normalize_sql(sql: str) -> str:
+    """Replaces the values in a statement, so the same statement run for
+    different rows is grouped together."""
+
+    sql = re.sub(r"'(?:[^']|'')*'", "?", sql)
+    sql = re.sub(r"\b\d+(?:\.\d+)?\b", "?", sql)
+    # lists of values, like in `IN (?, ?, ?)`
+    return re.sub(r"\(\?(?:, \?)*\)", "(...)", sql)
+
+
+def format_queries(queries: List[Dict[str, str]]) -> str:
+    statements = Counter(normalize_sql(query["sql"]) for query in queries)
+
+    return "\n".join(
+        f"{count:>5} × {statement}" for statement, count in statements.most_common()
+    )
+
+
+class QueryBudget:
+    def __init__(self, client: Client):
+        self.client = client
+
+    def __call__(
+        self,
+        query: str,
+        seed: Seed,
+        budget: int,
+        sizes: Sequence[int] = (5, 50),
+        client: Optional[Client] = None,
+    ) -> None:
+        """Runs `query` against the data seeded for each size, and fails if
+        the number of SQL queries depends on the size or is over `budget`."""
+
+        runs = {
+            size: self.run(query, seed, size, client or self.client) for size in sizes
+        }
+        counts = {size: len(queries) for size, queries in runs.items()}
+        largest = max(sizes)
+
+        if len(set(counts.values())) > 1:
+            problem = "The number of SQL queries grows with the data"
+        elif counts[largest] > budget:
+            problem = f"The operation runs more than {budget} SQL queries"
+        else:
+            return
+
+        pytest.fail(
+            f"{problem}: "
+            + ", ".join(f"{count} for {size} rows" for size, count in counts.items())
+            + f"\n\nSQL queries for {largest} rows:\n"
+            + format_queries(runs[largest]),
+            pytrace=False,
+        )
+
+    def run(
+        self, query: str, seed: Seed, size: int, client: Client
+    ) -> List[Dict[str, str]]:
+        # every size starts from the same data
+        with transaction.atomic():
+            variables = seed(size)
+
+            # cached results would hide the queries
+            result_cache.clear()
+
+            with CaptureQueriesContext(connection) as queries:
+                response = client.post(
+                    "/graphql",
+                    {"query": query, "variables": variables or {}},
+                    content_type="application/json",
+                )
+
+            assert "errors" not in response.json(), response.json()
+
+            transaction.set_rollback(True)
+
+        result_cache.clear()
+
+        return queries.captured_queries
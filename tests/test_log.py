@@ -0,0 +1,55 @@
+import io
+import json
+import logging
+
+import pytest
+
+from podcast.log import BackgroundStreamHandler, JSONFormatter
+
+
+@pytest.fixture
+def logger():
+    logger = logging.getLogger("tests.log")
+    logger.propagate = False
+    yield logger
+    logger.handlers.clear()
+
+
+def test_writes_json_in_the_background(logger):
+    stream = io.StringIO()
+    handler = BackgroundStreamHandler(stream)
+    handler.setFormatter(JSONFormatter())
+    logger.addHandler(handler)
+
+    arguments = ["Talk Python"]
+    logger.warning("Slow query for %s", arguments, extra={"duration_ms": 120.5})
+    # the message is formatted when logging, not when it's written
+    arguments.append("Real Python")
+    handler.close()
+
+    data = json.loads(stream.getvalue())
+
+    assert data["level"] == "WARNING"
+    assert data["logger"] == "tests.log"
+    assert data["message"] == "Slow query for ['Talk Python']"
+    assert data["duration_ms"] == 120.5
+
+
+def test_drops_records_when_the_queue_is_full(logger):
+    stream = io.StringIO()
+    handler = BackgroundStreamHandler(stream, max_size=1)
+    logger.addHandler(handler)
+
+    # keeps the thread from taking records out of the queue
+    handler.handler.acquire()
+
+    try:
+        for number in range(5):
+            logger.warning("Message %s", number)
+    finally:
+        handler.handler.release()
+
+    handler.close()
+
+    assert handler.dropped >= 3
+    assert len(stream.getvalue().splitlines()) == 5 - handler.dropped
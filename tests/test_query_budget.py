@@ -0,0 +1,77 @@
+from unittest import mock
+
+import pytest
+
+from query_budget import normalize_sql
+
+from strawberry.dataloader import DataLoader
+
+from api.podcasts.dataloaders import load_first_episodes
+from db.models import Episode, Podcast
+
+
+pytestmark = pytest.mark.django_db
+
+FIND_PODCASTS_QUERY = """
+    query FindPodcasts($first: Int!) {
+        findPodcasts(query: "Podcast", first: $first) {
+            edges {
+                node {
+                    episodes(first: 1) {
+                        edges {
+                            node {
+                                title
+                            }
+                        }
+                    }
+                }
+            }
+        }
+    }
+"""
+
+
+def _seed(size):
+    podcasts = Podcast.objects.bulk_create(
+        Podcast(title=f"Podcast {number}") for number in range(size)
+    )
+    Episode.objects.bulk_create(
+        Episode(podcast=podcast, title="Episode") for podcast in podcasts
+    )
+
+    return {"first": size}
+
+
+def test_normalize_sql():
+    assert normalize_sql(
+        """SELECT * FROM "db_episode" WHERE "podcast_id" IN ('a', 'b''c') """
+        """AND "total_time" > 10 LIMIT 21"""
+    ) == (
+        """SELECT * FROM "db_episode" WHERE "podcast_id" IN (...) """
+        """AND "total_time" > ? LIMIT ?"""
+    )
+
+
+def test_fails_when_queries_grow_with_the_data(assert_query_budget):
+    # loads the episodes one podcast at a time
+    def create_first_episodes_loader():
+        return DataLoader(load_fn=load_first_episodes, max_batch_size=1)
+
+    with mock.patch(
+        "api.views.create_first_episodes_loader", create_first_episodes_loader
+    ), pytest.raises(pytest.fail.Exception) as exc_info:
+        assert_query_budget(FIND_PODCASTS_QUERY, _seed, budget=2)
+
+    message = str(exc_info.value)
+
+    assert "grows with the data: 6 for 5 rows, 51 for 50 rows" in message
+    assert "   50 × SELECT" in message
+
+
+def test_fails_when_over_budget(assert_query_budget):
+    with pytest.raises(pytest.fail.Exception, match="more than 1 SQL queries"):
+        assert_query_budget(FIND_PODCASTS_QUERY, _seed, budget=1)
+
+
+def test_passes_within_budget(assert_query_budget):
+    assert_query_budget(FIND_PODCASTS_QUERY, _seed, budget=2)